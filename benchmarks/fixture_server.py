@@ -0,0 +1,86 @@
+"""
+Local HTTP server serving the static benchmark fixtures.
+"""
+import os
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+class QuietRequestHandler(SimpleHTTPRequestHandler):
+    """
+    Request handler that does not log every request to stderr.
+    """
+    
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer:
+    """
+    Serves a directory over HTTP on a free localhost port from a background thread.
+    
+    Usage:
+        with FixtureServer() as server:
+            driver.get(server.url('forms.html'))
+    """
+    
+    def __init__(self, directory=FIXTURE_DIR, host='127.0.0.1', port=0):
+        """
+        Initialize the server.
+        
+        Args:
+            directory: Directory to serve, defaults to the benchmark fixtures
+            host: Host to bind to
+            port: Port to bind to, 0 picks a free port
+        """
+        self.directory = directory
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+    
+    def start(self):
+        """
+        Start serving.
+        
+        Returns:
+            FixtureServer: The started server
+        """
+        handler = partial(QuietRequestHandler, directory=self.directory)
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name='fixture-server', daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        """
+        Stop serving.
+        """
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+    
+    def url(self, path=''):
+        """
+        Get the URL of a fixture.
+        
+        Args:
+            path: Path of the fixture relative to the served directory
+            
+        Returns:
+            str: The fixture URL
+        """
+        return f"http://{self.host}:{self.port}/{path.lstrip('/')}"
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
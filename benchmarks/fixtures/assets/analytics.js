@@ -0,0 +1,5 @@
+// Stand-in for an analytics tag, records the page view
+(function () {
+    window.analyticsEvents = window.analyticsEvents || [];
+    window.analyticsEvents.push({type: 'pageview', url: window.location.href, time: Date.now()});
+}());
@@ -0,0 +1,95 @@
+"""
+Import time of the framework modules, measured in fresh interpreters.
+
+Usage:
+    python -m benchmarks.import_time [--module features.environment.environment]
+                                     [--repeat 10] [--top 15]
+
+Every repetition imports the module in a new Python process with -X importtime, the
+time behave and every parallel worker pay before the first scenario. The p50/p95/max
+of the total and the modules with the highest cumulative import time are printed, so
+the effect of a change on startup can be compared between commits.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+from utils.stats import summarize
+
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# "import time:   self [us] | cumulative | imported package" lines of -X importtime
+IMPORT_TIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$')
+
+
+def measure_import(module):
+    """
+    Import a module in a fresh interpreter.
+    
+    Args:
+        module: Module name
+        
+    Returns:
+        dict: Module name to cumulative import time in ms, for every module imported
+    """
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=PROJECT_DIR, capture_output=True, text=True,
+    )
+    if process.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{process.stderr[-2000:]}")
+    
+    timings = {}
+    for line in process.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            timings[match.group(4)] = int(match.group(2)) / 1000
+    return timings
+
+
+def main(argv=None):
+    """
+    Command line entry point of the import time benchmark.
+    
+    Args:
+        argv: Optional command line arguments, defaults to sys.argv
+        
+    Returns:
+        int: Exit code
+    """
+    parser = argparse.ArgumentParser(description='Measure the import time of a framework module.')
+    parser.add_argument('--module', default='features.environment.environment',
+                        help='Module to import (default: the behave environment hooks)')
+    parser.add_argument('--repeat', type=int, default=10,
+                        help='Fresh interpreters to import in (default: 10)')
+    parser.add_argument('--top', type=int, default=15, help='Slowest imported modules to list (default: 15)')
+    args = parser.parse_args(argv)
+    
+    # The first import also fills the bytecode cache, so it is not counted
+    measure_import(args.module)
+    runs = [measure_import(args.module) for _ in range(args.repeat)]
+    
+    totals = summarize([run[args.module] for run in runs], digits=1)
+    print(f"{args.module}: p50 {totals['p50']} ms, p95 {totals['p95']} ms, max {totals['max']} ms "
+          f"({args.repeat} runs)")
+    
+    cumulative = {}
+    for run in runs:
+        for name, duration in run.items():
+            cumulative.setdefault(name, []).append(duration)
+    cumulative.pop(args.module, None)
+    slowest = sorted(
+        ((summarize(durations, digits=1)['p50'], name) for name, durations in cumulative.items()),
+        reverse=True,
+    )
+    print(f"{'p50 ms':>10}  module (cumulative)")
+    for duration, name in slowest[:args.top]:
+        print(f"{duration:>10}  {name}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
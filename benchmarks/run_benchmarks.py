@@ -0,0 +1,359 @@
+"""
+Micro-benchmarks of BasePage and helpers operations against the local fixture site.
+
+Usage:
+    python -m benchmarks.run_benchmarks [--browsers chrome firefox] [--iterations 50]
+                                        [--filter wait] [--compare baseline.json]
+
+Every operation runs many times in a headless browser, and the latency distribution
+(p50/p95/max in ms) and throughput (operations per second) are written as JSON to
+reports/benchmarks/benchmark_<RUN_ID>.json. Settings such as WAIT_BACKEND,
+ELEMENT_CACHE_ENABLED, LAUNCH_PROFILE or NETWORK_PROFILE are read from the environment
+as usual and recorded with the results, so runs with different settings or commits can
+be compared with --compare. With a network profile set, the requests and bytes of each
+benchmark are recorded too.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from collections import namedtuple
+from datetime import datetime
+
+import selenium
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.common.by import By
+
+from benchmarks.fixture_server import FixtureServer
+from config import config
+from page_objects.base_page import BasePage
+from utils import helpers
+from utils.driver_factory import DriverFactory
+from utils.stats import summarize
+
+
+# Delay in ms before the delayed fixture element appears
+DELAY_MS = 100
+
+# Settings recorded with the results because they change what is measured
+RECORDED_SETTINGS = (
+    'WAIT_BACKEND', 'ELEMENT_CACHE_ENABLED', 'FORM_FILL_MODE', 'LAUNCH_PROFILE', 'IMPLICIT_WAIT',
+    'NETWORK_PROFILE', 'NETWORK_BLOCK_URLS', 'NETWORK_CACHE', 'NETWORK_DRY_RUN',
+)
+
+
+class FixturePage(BasePage):
+    """
+    Page object for the benchmark fixtures.
+    """
+    
+    TITLE = (By.ID, "title")
+    USERNAME_INPUT = (By.ID, "username")
+    EMAIL_INPUT = (By.ID, "email")
+    AGE_INPUT = (By.ID, "age")
+    NOTES_INPUT = (By.ID, "notes")
+    INCREMENT_BUTTON = (By.ID, "increment")
+    COUNTER = (By.ID, "counter")
+    HOVER_TARGET = (By.ID, "hover-target")
+    DELAYED_ELEMENT = (By.ID, "delayed")
+    FRAME = (By.ID, "frame")
+    FRAME_TEXT = (By.ID, "frame-text")
+    FIRST_ROW = (By.ID, "row-0")
+    LAST_ROW = (By.CSS_SELECTOR, "tr[data-last='true']")
+    LAST_ROW_NAME = (By.CSS_SELECTOR, "tr[data-last='true'] .name")
+    
+    FORM_FIELDS = {
+        'username': USERNAME_INPUT,
+        'email': EMAIL_INPUT,
+        'age': AGE_INPUT,
+        'notes': NOTES_INPUT,
+    }
+    
+    FORM_VALUES = {
+        'username': 'benchmark_user',
+        'email': 'benchmark@example.com',
+        'age': 42,
+        'notes': 'Filled by the benchmark suite',
+    }
+    
+    READ_LOCATORS = (TITLE, USERNAME_INPUT, EMAIL_INPUT, COUNTER)
+
+
+def _read_one_by_one(page):
+    for locator in FixturePage.READ_LOCATORS:
+        page.get_text(locator)
+        page.get_attribute(locator, 'value')
+
+
+def _wait_for_delayed_element(page):
+    page.execute_script(f"scheduleElement({DELAY_MS});")
+    page.wait_for_element(FixturePage.DELAYED_ELEMENT)
+
+
+def _scroll_to_alternate_row(page, iteration):
+    # Alternate between both ends of the table so every call actually scrolls
+    page.scroll_to_element(FixturePage.LAST_ROW if iteration % 2 else FixturePage.FIRST_ROW)
+
+
+def _read_frame_text(page):
+    page.switch_to_frame(FixturePage.FRAME)
+    page.get_text(FixturePage.FRAME_TEXT)
+    page.switch_to_default_content()
+
+
+# A benchmark runs `operation(page, iteration)` on a freshly opened fixture
+Benchmark = namedtuple('Benchmark', ['name', 'fixture', 'operation'])
+
+BENCHMARKS = [
+    Benchmark('page.click', 'forms.html',
+              lambda page, i: page.click(FixturePage.INCREMENT_BUTTON)),
+    Benchmark('page.input_text', 'forms.html',
+              lambda page, i: page.input_text(FixturePage.USERNAME_INPUT, 'benchmark')),
+    Benchmark('page.get_text', 'forms.html',
+              lambda page, i: page.get_text(FixturePage.TITLE)),
+    Benchmark('page.is_element_displayed', 'forms.html',
+              lambda page, i: page.is_element_displayed(FixturePage.TITLE)),
+    Benchmark('page.wait_for_element', 'forms.html',
+              lambda page, i: page.wait_for_element(FixturePage.TITLE)),
+    Benchmark('page.wait_for_element.delayed', 'delayed.html',
+              lambda page, i: _wait_for_delayed_element(page)),
+    Benchmark('page.hover', 'forms.html',
+              lambda page, i: page.hover(FixturePage.HOVER_TARGET)),
+    Benchmark('page.read_elements', 'forms.html',
+              lambda page, i: page.read_elements(FixturePage.READ_LOCATORS, ['value'])),
+    Benchmark('page.read_one_by_one', 'forms.html',
+              lambda page, i: _read_one_by_one(page)),
+    Benchmark('page.fill_form.fast', 'forms.html',
+              lambda page, i: page.fill_form(FixturePage.FORM_VALUES, mode='fast')),
+    Benchmark('page.fill_form.fidelity', 'forms.html',
+              lambda page, i: page.fill_form(FixturePage.FORM_VALUES, mode='fidelity')),
+    Benchmark('page.switch_to_frame', 'iframes.html',
+              lambda page, i: _read_frame_text(page)),
+    Benchmark('page.scroll_to_element.large_dom', 'large_dom.html',
+              lambda page, i: _scroll_to_alternate_row(page, i)),
+    Benchmark('page.get_text.large_dom', 'large_dom.html',
+              lambda page, i: page.get_text(FixturePage.LAST_ROW_NAME)),
+    Benchmark('page.refresh_page.network', 'network.html',
+              lambda page, i: page.refresh_page()),
+    Benchmark('helpers.wait_for_element', 'forms.html',
+              lambda page, i: helpers.wait_for_element(page.driver, FixturePage.TITLE)),
+    Benchmark('helpers.wait_for_element_clickable', 'forms.html',
+              lambda page, i: helpers.wait_for_element_clickable(page.driver, FixturePage.INCREMENT_BUTTON)),
+    Benchmark('helpers.is_element_present', 'forms.html',
+              lambda page, i: helpers.is_element_present(page.driver, FixturePage.TITLE)),
+]
+
+
+def select_benchmarks(filters=None):
+    """
+    Select the benchmarks whose name contains any of the filters.
+    
+    Args:
+        filters: Optional list of substrings, all benchmarks are selected if empty
+        
+    Returns:
+        list: Selected benchmarks
+    """
+    if not filters:
+        return list(BENCHMARKS)
+    return [benchmark for benchmark in BENCHMARKS if any(text in benchmark.name for text in filters)]
+
+
+def run_browser(browser, server, benchmarks, iterations, warmup):
+    """
+    Run benchmarks in one headless browser session.
+    
+    Args:
+        browser: Browser name
+        server (FixtureServer): Running fixture server
+        benchmarks: Benchmarks to run
+        iterations: Timed iterations per benchmark
+        warmup: Untimed iterations run before the timed ones
+        
+    Returns:
+        dict: {benchmark name: latency summary in ms and ops_per_sec, or error}
+    """
+    driver = DriverFactory.get_driver(browser)
+    network_policy = DriverFactory.network_policy
+    results = {}
+    try:
+        page = FixturePage(driver)
+        for benchmark in benchmarks:
+            page.open(server.url(benchmark.fixture))
+            # Drop the requests of the page load so only the timed operations are counted
+            network_policy.collect(driver)
+            durations = []
+            try:
+                for iteration in range(warmup):
+                    benchmark.operation(page, iteration)
+                started = time.perf_counter()
+                for iteration in range(iterations):
+                    start = time.perf_counter()
+                    benchmark.operation(page, iteration)
+                    durations.append((time.perf_counter() - start) * 1000)
+                elapsed = time.perf_counter() - started
+            except WebDriverException as error:
+                results[benchmark.name] = {'error': f"{type(error).__name__}: {error.msg or error}"}
+                print(f"  {benchmark.name}: failed, {results[benchmark.name]['error']}")
+                continue
+            
+            results[benchmark.name] = dict(summarize(durations), ops_per_sec=round(iterations / elapsed, 1))
+            print(f"  {benchmark.name}: p50 {results[benchmark.name]['p50']:.2f} ms, "
+                  f"{results[benchmark.name]['ops_per_sec']} ops/s")
+            network_stats = network_policy.collect(driver)
+            if network_stats and network_stats['requests']:
+                results[benchmark.name]['network'] = network_stats
+                print(f"    network: {network_policy.format_stats(network_stats)}")
+    finally:
+        driver.quit()
+    return results
+
+
+def get_git_commit():
+    """
+    Get the commit the benchmarks run on.
+    
+    Returns:
+        str: Commit hash, or None outside a git checkout
+    """
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True, cwd=os.path.dirname(__file__),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_results(current, baseline, threshold=1.1):
+    """
+    Compare benchmark results with a baseline.
+    
+    Args:
+        current: Results written by this runner
+        baseline: Results of an earlier run
+        threshold: Ratio of the p50s above which a benchmark is flagged as slower
+        
+    Returns:
+        list: One row per browser and benchmark present in both runs, with both p50s,
+            the ratio between them and whether the benchmark regressed
+    """
+    rows = []
+    for browser, results in current['results'].items():
+        for name, result in results.items():
+            base = baseline['results'].get(browser, {}).get(name)
+            if not base or 'error' in result or 'error' in base or not base['p50']:
+                continue
+            ratio = result['p50'] / base['p50']
+            rows.append({
+                'browser': browser,
+                'benchmark': name,
+                'p50': result['p50'],
+                'baseline_p50': base['p50'],
+                'ratio': round(ratio, 3),
+                'regressed': ratio > threshold,
+            })
+    return rows
+
+
+def format_comparison(rows):
+    """
+    Format comparison rows as a text table.
+    
+    Args:
+        rows: Rows returned by compare_results()
+        
+    Returns:
+        str: The comparison
+    """
+    lines = [f"{'browser':<10} {'p50 ms':>10} {'base ms':>10} {'change':>8}  benchmark"]
+    for row in rows:
+        flag = '  SLOWER' if row['regressed'] else ''
+        lines.append(
+            f"{row['browser']:<10} {row['p50']:>10.2f} {row['baseline_p50']:>10.2f} "
+            f"{(row['ratio'] - 1) * 100:>+7.1f}%  {row['benchmark']}{flag}"
+        )
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    """
+    Command line entry point of the benchmark runner.
+    
+    Args:
+        argv: Optional command line arguments, defaults to sys.argv
+        
+    Returns:
+        int: Exit code, 2 if --fail-on-regression is set and a benchmark got slower
+    """
+    parser = argparse.ArgumentParser(description='Benchmark BasePage and helpers operations.')
+    parser.add_argument('--browsers', nargs='+', default=[config.BROWSER],
+                        help='Browsers to benchmark (default: BROWSER from config)')
+    parser.add_argument('-n', '--iterations', type=int, default=50, help='Timed iterations per benchmark')
+    parser.add_argument('--warmup', type=int, default=5, help='Untimed iterations per benchmark')
+    parser.add_argument('-k', '--filter', action='append',
+                        help='Only run benchmarks whose name contains this text')
+    parser.add_argument('-o', '--output',
+                        help='Output path (default: reports/benchmarks/benchmark_<RUN_ID>.json)')
+    parser.add_argument('--compare', help='Results of an earlier run to compare with')
+    parser.add_argument('--threshold', type=float, default=1.1,
+                        help='p50 ratio above which a benchmark is flagged as slower (default: 1.1)')
+    parser.add_argument('--fail-on-regression', action='store_true',
+                        help='Exit with code 2 if any benchmark got slower')
+    parser.add_argument('--list', action='store_true', help='List the benchmarks and exit')
+    args = parser.parse_args(argv)
+    
+    benchmarks = select_benchmarks(args.filter)
+    if args.list or not benchmarks:
+        for benchmark in benchmarks:
+            print(f"{benchmark.name} ({benchmark.fixture})")
+        return 0 if benchmarks else 1
+    
+    # Benchmarks always run headless so results do not depend on the desktop
+    config.HEADLESS = True
+    
+    report = {
+        'meta': {
+            'run_id': config.RUN_ID,
+            'timestamp': datetime.now().isoformat(),
+            'commit': get_git_commit(),
+            'python': platform.python_version(),
+            'selenium': selenium.__version__,
+            'platform': platform.platform(),
+            'iterations': args.iterations,
+            'warmup': args.warmup,
+            'delay_ms': DELAY_MS,
+            'settings': {name: getattr(config, name) for name in RECORDED_SETTINGS},
+        },
+        'results': {},
+    }
+    
+    with FixtureServer() as server:
+        for browser in args.browsers:
+            print(f"Benchmarking {browser}: {len(benchmarks)} benchmarks, {args.iterations} iterations")
+            report['results'][browser] = run_browser(
+                browser, server, benchmarks, args.iterations, args.warmup
+            )
+    
+    output = args.output or os.path.join(
+        config.BASE_REPORT_DIR, 'benchmarks', f"benchmark_{config.RUN_ID}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as output_file:
+        json.dump(report, output_file, indent=2)
+    print(f"Benchmark results saved to: {output}")
+    
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            rows = compare_results(report, json.load(baseline_file), args.threshold)
+        print(format_comparison(rows))
+        if args.fail_on_regression and any(row['regressed'] for row in rows):
+            return 2
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
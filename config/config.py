@@ -1,35 +1,64 @@
 """
 Configuration settings for the test framework.
+
+The settings are declared, parsed and validated in config/settings.py. This module
+exposes them as attributes, e.g. config.BROWSER, loading the settings snapshot on
+first access instead of at import time. Assigning an attribute, e.g.
+config.HEADLESS = True, overrides the setting for the rest of the process, and
+config.override() overrides settings for a block, e.g. in a test:
+
+    with config.override(WORKER_ID='2', WORKER_COUNT=4):
+        ...
 """
-import os
-from dotenv import load_dotenv
-
-# Load environment variables from .env file
-load_dotenv()
-
-# Browser configuration
-BROWSER = os.getenv('BROWSER', 'chrome')  # Default browser
-HEADLESS = os.getenv('HEADLESS', 'False').lower() == 'true'
-BROWSER_WINDOW_SIZE = os.getenv('BROWSER_WINDOW_SIZE', '1920,1080')
-IMPLICIT_WAIT = int(os.getenv('IMPLICIT_WAIT', '10'))
-PAGE_LOAD_TIMEOUT = int(os.getenv('PAGE_LOAD_TIMEOUT', '30'))
-
-# URLs
-BASE_URL = os.getenv('BASE_URL', 'https://example.com')
-
-# Test execution settings
-SCREENSHOT_ON_FAILURE = os.getenv('SCREENSHOT_ON_FAILURE', 'True').lower() == 'true'
-RERUN_FAILED_TESTS = os.getenv('RERUN_FAILED_TESTS', 'True').lower() == 'true'
-MAX_RETRIES = int(os.getenv('MAX_RETRIES', '2'))
-
-# Report settings
-REPORT_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'reports')
-SCREENSHOT_DIR = os.path.join(REPORT_DIR, 'screenshots')
-
-# Ensure directories exist
-os.makedirs(REPORT_DIR, exist_ok=True)
-os.makedirs(SCREENSHOT_DIR, exist_ok=True)
-
-# WebDriver settings
-DRIVER_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'drivers')
-USE_WEBDRIVER_MANAGER = os.getenv('USE_WEBDRIVER_MANAGER', 'True').lower() == 'true'
+from contextlib import contextmanager
+from dataclasses import fields
+
+from config.settings import Settings, get_settings, override_settings, reload_settings
+
+SETTING_NAMES = frozenset(setting_field.name for setting_field in fields(Settings))
+
+
+def __getattr__(name):
+    """
+    Read a setting from the snapshot on first access and keep it as a module attribute,
+    so later reads cost no more than a module constant.
+    """
+    if name not in SETTING_NAMES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(get_settings(), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | SETTING_NAMES)
+
+
+def reload():
+    """
+    Read the settings sources again, discarding values read or assigned so far.
+    """
+    reload_settings()
+    for name in SETTING_NAMES:
+        globals().pop(name, None)
+
+
+@contextmanager
+def override(**values):
+    """
+    Override settings until the block exits, then read them from the sources again.
+    Values read or assigned before the block are discarded, as by reload().
+    
+    Args:
+        **values: Setting names and values, used as they are
+        
+    Raises:
+        SettingsError: If a name is not a setting
+    """
+    previous = override_settings(values)
+    reload()
+    try:
+        yield
+    finally:
+        override_settings(previous, replace=True)
+        reload()
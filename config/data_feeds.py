@@ -0,0 +1,24 @@
+"""
+Data feeds for data-driven scenarios, used with the @data_feed:<name> tag on a
+Scenario Outline, see utils/data_feeds.py.
+
+A feed reads a CSV or JSONL file (path relative to TEST_DATA_DIR) and can select
+records with:
+    where:  field paths and the values they must have
+    filter: callable taking a record and returning True to keep it
+    sample: share of records to keep, picked deterministically with seed
+    limit:  maximum number of records per worker
+    shard:  False to run all records on every parallel worker (default: True)
+"""
+
+DATA_FEEDS = {
+    # Example:
+    # 'adult_users': {
+    #     'path': 'feeds/users.csv',
+    #     'where': {'status': 'active'},
+    #     'filter': lambda record: int(record['age']) >= 18,
+    #     'sample': 0.01,
+    #     'seed': 42,
+    #     'limit': 100,
+    # },
+}
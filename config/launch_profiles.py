@@ -0,0 +1,52 @@
+"""
+Browser launch profiles, selected with LAUNCH_PROFILE in config.
+
+Settings left as None keep the browser's own default.
+"""
+
+LAUNCH_PROFILES = {
+    # Browser defaults, same as before launch profiles existed
+    'default': {
+        'page_load_strategy': None,
+        'load_images': None,
+        'load_fonts': None,
+        'extensions': None,
+        'background_throttling': None,
+        'gpu': None,
+        'headless_mode': 'legacy',
+        'devtools': False,
+    },
+    # Fastest runs: no images or web fonts, returns once the DOM is ready
+    'fast': {
+        'page_load_strategy': 'eager',
+        'load_images': False,
+        'load_fonts': False,
+        'extensions': False,
+        'background_throttling': False,
+        'gpu': False,
+        'headless_mode': 'new',
+        'devtools': False,
+    },
+    # Closest to a real user's browser, for visual checks
+    'fidelity': {
+        'page_load_strategy': 'normal',
+        'load_images': True,
+        'load_fonts': True,
+        'extensions': True,
+        'background_throttling': True,
+        'gpu': True,
+        'headless_mode': 'new',
+        'devtools': False,
+    },
+    # Local debugging with the developer tools open
+    'debug': {
+        'page_load_strategy': 'normal',
+        'load_images': True,
+        'load_fonts': True,
+        'extensions': True,
+        'background_throttling': False,
+        'gpu': True,
+        'headless_mode': 'new',
+        'devtools': True,
+    },
+}
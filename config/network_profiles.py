@@ -0,0 +1,48 @@
+"""
+Network profiles, selected with NETWORK_PROFILE in config.
+
+Profiles apply to Chromium browsers (Chrome and Edge) through the DevTools protocol,
+see utils/network_policy.py. URL patterns use '*' as a wildcard and match the whole
+URL. Resource types are blocked by file extension: image, font, media and stylesheet.
+A cache of None keeps the browser's own default, True forces it on, False off.
+"""
+
+# Third-party requests that no assertion depends on
+TRACKER_URLS = [
+    '*google-analytics.com*',
+    '*googletagmanager.com*',
+    '*doubleclick.net*',
+    '*googlesyndication.com*',
+    '*facebook.net*',
+    '*hotjar.com*',
+    '*segment.io*',
+    '*fonts.googleapis.com*',
+    '*fonts.gstatic.com*',
+]
+
+NETWORK_PROFILES = {
+    # Browser defaults, nothing blocked
+    'default': {
+        'block_urls': [],
+        'block_resource_types': [],
+        'cache': None,
+    },
+    # Analytics, ads and web fonts blocked
+    'lean': {
+        'block_urls': TRACKER_URLS,
+        'block_resource_types': ['font', 'media'],
+        'cache': None,
+    },
+    # Only documents, scripts and API calls: also no images or stylesheets
+    'minimal': {
+        'block_urls': TRACKER_URLS,
+        'block_resource_types': ['image', 'font', 'media', 'stylesheet'],
+        'cache': True,
+    },
+    # Every page load fetched from the network, to measure first visits
+    'cold': {
+        'block_urls': [],
+        'block_resource_types': [],
+        'cache': False,
+    },
+}
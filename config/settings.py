@@ -0,0 +1,386 @@
+"""
+Typed, immutable settings of the test framework.
+
+Settings are read from these sources, each overriding the previous one:
+
+    defaults     the field defaults below
+    .env         the .env file found from the config directory upwards
+    environment  the process environment
+    worker       WORKER_<id>_<NAME> variables for the parallel worker with that WORKER_ID,
+                 e.g. WORKER_2_BROWSER=firefox
+    overrides    values set with override_settings(), e.g. by config.override() in tests
+
+Values are parsed and validated once into a frozen Settings snapshot, so a typo such
+as HEADLESS=ture or BROWSER_WINDOW_SIZE=1920 fails at startup with the variable name
+instead of deep inside a step. Nothing is written: directories are created by the
+code writing into them. Most modules read settings through config/config.py.
+"""
+import os
+from dataclasses import dataclass, field, fields
+from datetime import datetime
+from typing import Optional, Tuple
+
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TRUE_VALUES = ('true', '1', 'yes', 'on')
+FALSE_VALUES = ('false', '0', 'no', 'off')
+
+
+class SettingsError(ValueError):
+    """
+    Raised when a setting has an invalid value.
+    """
+
+
+def setting(default=None, minimum=None, choices=None, derived=None, env=True):
+    """
+    Declare a setting.
+    
+    Args:
+        default: Default value
+        minimum: Optional lowest valid number
+        choices: Optional valid values
+        derived: Optional callable computing the default from the settings declared before,
+            used when the setting is not set
+        env: Whether the setting can be set from .env, the environment or worker overrides
+        
+    Returns:
+        dataclasses.Field: Field of the Settings dataclass
+    """
+    metadata = {'minimum': minimum, 'choices': choices, 'derived': derived, 'env': env}
+    return field(default=default, metadata=metadata)
+
+
+def under(directory_setting, *parts):
+    """
+    Derive a path from a directory setting declared before.
+    
+    Args:
+        directory_setting: Name of the directory setting
+        *parts: Path components joined to the directory
+        
+    Returns:
+        callable: Function for setting(derived=...)
+    """
+    return lambda values: os.path.join(values[directory_setting], *parts)
+
+
+def worker_report_dir(values):
+    """
+    Derive the report directory of the worker, see REPORT_DIR.
+    """
+    if values['WORKER_ID']:
+        return os.path.join(values['BASE_REPORT_DIR'], f"worker_{values['WORKER_ID']}")
+    return values['BASE_REPORT_DIR']
+
+
+def parse_bool(value):
+    """
+    Parse a boolean setting.
+    
+    Args:
+        value: 'true', '1', 'yes' or 'on', or 'false', '0', 'no' or 'off', in any case
+        
+    Returns:
+        bool: Parsed value
+    """
+    value = value.strip().lower()
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    raise ValueError(f"expected one of {', '.join(TRUE_VALUES + FALSE_VALUES)}")
+
+
+def parse_window_size(value):
+    """
+    Parse a window size setting.
+    
+    Args:
+        value: Width and height separated by a comma or an 'x', e.g. '1920,1080'
+        
+    Returns:
+        tuple: Width and height in pixels
+    """
+    parts = value.lower().replace('x', ',').split(',')
+    if len(parts) != 2:
+        raise ValueError("expected <width>,<height>")
+    width, height = (int(part) for part in parts)
+    if width <= 0 or height <= 0:
+        raise ValueError("width and height must be positive")
+    return width, height
+
+
+# Parser of each setting type
+PARSERS = {
+    str: str,
+    Optional[str]: lambda value: value or None,
+    bool: parse_bool,
+    int: int,
+    float: float,
+    Tuple[int, int]: parse_window_size,
+}
+
+
+@dataclass(frozen=True)
+class Settings:
+    """
+    Snapshot of all settings, see load_settings().
+    """
+    
+    # Browser configuration
+    BROWSER: str = 'chrome'  # Default browser, or 'fake' for the in-process fake driver
+    HEADLESS: bool = False
+    BROWSER_WINDOW_SIZE: Tuple[int, int] = (1920, 1080)
+    IMPLICIT_WAIT: int = setting(10, minimum=0)  # Default timeout of explicit waits, implicit waits are off
+    PAGE_LOAD_TIMEOUT: int = setting(30, minimum=1)
+    LAUNCH_PROFILE: str = 'default'  # See config/launch_profiles.py: default, fast, fidelity, debug
+    # When BasePage.open() returns: 'load' (page load strategy only), dom-ready, network-idle or page-defined
+    PAGE_READINESS: str = 'load'
+    NETWORK_IDLE_MS: int = setting(500, minimum=0)  # Quiet period of the 'network-idle' readiness
+    FAKE_DRIVER_ROOT: Optional[str] = None  # Directory of HTML files served by the fake driver
+    
+    # Network policy settings (Chrome and Edge), see config/network_profiles.py
+    NETWORK_PROFILE: str = 'default'  # default, lean, minimal or cold
+    NETWORK_BLOCK_URLS: str = ''  # Extra comma-separated URL patterns to block
+    NETWORK_CACHE: str = setting('', choices=('', 'on', 'off'))  # 'on' or 'off' forces the browser cache
+    NETWORK_DRY_RUN: bool = False  # Only count avoidable requests
+    
+    # URLs
+    BASE_URL: str = 'https://example.com'
+    
+    # Wait and page object settings
+    WAIT_POLL_MIN: float = setting(0.05, minimum=0)  # First poll interval of explicit waits
+    WAIT_POLL_MAX: float = setting(0.5, minimum=0)  # Poll interval the waits back off to
+    WAIT_POLL_BACKOFF: float = setting(1.5, minimum=1)
+    # 'polling', or 'observer' to wait inside the page
+    WAIT_BACKEND: str = setting('polling', choices=('polling', 'observer'))
+    # 'fast' sets values in-page, 'fidelity' types keystrokes
+    FORM_FILL_MODE: str = setting('fidelity', choices=('fast', 'fidelity'))
+    ELEMENT_CACHE_ENABLED: bool = True  # Reuse found elements
+    
+    # Test execution settings
+    SCREENSHOT_ON_FAILURE: bool = True
+    RERUN_FAILED_TESTS: bool = True
+    MAX_RETRIES: int = setting(2, minimum=0)
+    
+    # Parallel execution settings
+    PARALLEL_WORKERS: int = setting(os.cpu_count() or 1, minimum=1)
+    WORKER_ID: Optional[str] = None  # Set by the parallel runner for each worker process
+    WORKER_COUNT: int = setting(1, minimum=1)
+    
+    # Report settings
+    BASE_REPORT_DIR: str = setting(os.path.join(PROJECT_DIR, 'reports'), env=False)
+    # Parallel workers write into their own subdirectory so output never collides
+    REPORT_DIR: str = setting(env=False, derived=worker_report_dir)
+    SCREENSHOT_DIR: str = setting(env=False, derived=under('REPORT_DIR', 'screenshots'))
+    # Identifies the run in timing and profiling reports, shared by all parallel workers
+    RUN_ID: str = setting(derived=lambda values: datetime.now().strftime('%Y%m%d_%H%M%S'))
+    DRIVER_TIMING_ENABLED: bool = False
+    # Trace every WebDriver command per scenario into REPORT_DIR/traces
+    COMMAND_TRACE_ENABLED: bool = False
+    # Append per-step timings to REPORT_DIR/step_timings/<RUN_ID>.jsonl, see utils/step_report.py
+    STEP_PROFILING_ENABLED: bool = False
+    
+    # WebDriver settings
+    DRIVER_PATH: str = setting(os.path.join(PROJECT_DIR, 'drivers'), env=False)
+    USE_WEBDRIVER_MANAGER: bool = True
+    # Resolved driver binaries are recorded in a manifest so later runs can skip webdriver-manager
+    DRIVER_MANIFEST: str = setting(derived=under('DRIVER_PATH', 'manifest.json'))
+    DRIVER_MANIFEST_TTL: int = setting(24, minimum=0)  # Hours before unpinned entries are re-resolved
+    # Optional JSON file pinning driver versions, e.g. {"chrome": "120.0.6099.109"}
+    DRIVER_LOCKFILE: str = setting(derived=under('DRIVER_PATH', 'drivers.lock.json'))
+    
+    # Driver pool settings
+    DRIVER_POOL_ENABLED: bool = False
+    DRIVER_POOL_SIZE: int = setting(1, minimum=0)  # Idle sessions kept per browser
+    DRIVER_POOL_MAX_USES: int = setting(50, minimum=1)  # Scenarios per session before recycling
+    
+    # Browser prelaunch settings (ignored when the driver pool is enabled)
+    PRELAUNCH_ENABLED: bool = False
+    PRELAUNCH_COUNT: int = setting(1, minimum=1)  # Sessions kept ready for upcoming scenarios
+    TEARDOWN_WORKERS: int = setting(2, minimum=1)  # Threads quitting used sessions
+    
+    # Test data settings, see utils/test_data_registry.py
+    TEST_DATA_DIR: str = os.path.join(PROJECT_DIR, 'data')  # JSON and YAML files, one namespace per file
+    # Parsed data files, rebuilt when a file changes
+    TEST_DATA_CACHE: str = setting(derived=under('BASE_REPORT_DIR', 'cache', 'test_data.pickle'))
+    # Rows a @data_feed outline may have per worker, see utils/data_feeds.py
+    DATA_FEED_MAX_ROWS: int = setting(10000, minimum=1)
+    # Seed of the generated test data, see utils/data_factory.py. Printed with RUN_ID and
+    # WORKER_ID for failed scenarios, which generate the same data again when run with them
+    DATA_FACTORY_SEED: str = setting(derived=lambda values: os.urandom(4).hex())
+    
+    # Session cache settings, see utils/session_cache.py
+    SESSION_CACHE_ENABLED: bool = False  # Restore logins
+    SESSION_CACHE_TTL: int = setting(1800, minimum=0)  # Seconds before a login is repeated
+    # Snapshots are shared by all parallel workers of a run and by later runs. They hold
+    # login cookies, so they live outside the reports directory that gets published
+    SESSION_CACHE_DIR: str = os.path.join(PROJECT_DIR, '.cache', 'sessions')
+    
+    # Screenshot settings, see utils/screenshot_pipeline.py
+    SCREENSHOT_FORMAT: str = setting('png', choices=('png', 'webp', 'jpeg'))  # webp and jpeg need Pillow
+    SCREENSHOT_QUALITY: int = setting(80, minimum=1)  # WebP and JPEG quality
+    SCREENSHOT_MAX_WIDTH: int = setting(0, minimum=0)  # Downscale wider screenshots, 0 keeps them
+    SCREENSHOT_WORKERS: int = setting(2, minimum=1)  # Threads encoding and writing screenshots
+    
+    # Artifact store settings, see utils/artifact_store.py
+    ARTIFACT_STORE_ENABLED: bool = True  # Index and evict
+    # Index of the screenshots and traces, shared by all parallel workers and by later runs
+    ARTIFACT_INDEX: str = setting(derived=under('BASE_REPORT_DIR', 'artifacts.sqlite'))
+    ARTIFACT_MAX_TOTAL_MB: float = setting(2048, minimum=0)  # All runs, 0 for no limit
+    ARTIFACT_MAX_RUN_MB: float = setting(512, minimum=0)  # Each run, 0 for no limit
+    ARTIFACT_MAX_AGE_DAYS: float = setting(30, minimum=0)  # 0 keeps artifacts regardless of age
+    ARTIFACT_PACK_RUNS: bool = False  # Zip each run's artifacts
+
+
+def read_env_file(path=None):
+    """
+    Read a .env file without changing the process environment.
+    
+    Args:
+        path: Optional path, defaults to the .env file found from the config directory upwards
+        
+    Returns:
+        dict: Variables of the file, empty if there is none
+    """
+    if path is None:
+        directory = os.path.dirname(os.path.abspath(__file__))
+        while not os.path.exists(os.path.join(directory, '.env')):
+            parent = os.path.dirname(directory)
+            if parent == directory:
+                return {}
+            directory = parent
+        path = os.path.join(directory, '.env')
+    elif not os.path.exists(path):
+        return {}
+    
+    # Imported here so processes that never read settings do not import python-dotenv
+    from dotenv import dotenv_values
+    return {name: value for name, value in dotenv_values(path).items() if value is not None}
+
+
+def load_settings(environ=None, env_file=None, overrides=None):
+    """
+    Parse and validate the settings from all sources.
+    
+    Args:
+        environ: Optional environment variables, defaults to os.environ
+        env_file: Optional .env file, defaults to the .env file found from the config directory upwards
+        overrides: Optional values used as they are instead of the values of all other sources
+        
+    Returns:
+        Settings: Settings snapshot
+        
+    Raises:
+        SettingsError: If a setting has an invalid value
+    """
+    variables = read_env_file(env_file)
+    variables.update(os.environ if environ is None else environ)
+    
+    worker_id = variables.get('WORKER_ID')
+    if worker_id:
+        prefix = f"WORKER_{worker_id}_"
+        variables.update({
+            name[len(prefix):]: value for name, value in list(variables.items()) if name.startswith(prefix)
+        })
+    
+    values = {}
+    for setting_field in fields(Settings):
+        name, metadata = setting_field.name, setting_field.metadata
+        raw = variables.get(name) if metadata.get('env', True) else None
+        if overrides and name in overrides:
+            values[name] = overrides[name]
+        # Set but empty, e.g. RUN_ID= in .env, counts as not set except for text settings
+        # without a derived default, e.g. NETWORK_CACHE=
+        elif raw is not None and (raw.strip() or (setting_field.type is str and not metadata.get('derived'))):
+            values[name] = _parse(name, raw, setting_field.type, metadata)
+        elif metadata.get('derived'):
+            values[name] = metadata['derived'](values)
+        else:
+            values[name] = setting_field.default
+    return Settings(**values)
+
+
+_settings = None
+_overrides = {}
+
+
+def get_settings():
+    """
+    Get the settings snapshot, loading it on first use.
+    
+    Returns:
+        Settings: Settings snapshot
+    """
+    global _settings
+    if _settings is None:
+        _settings = load_settings(overrides=_overrides)
+    return _settings
+
+
+def reload_settings():
+    """
+    Discard the settings snapshot, so the next get_settings() reads the sources again.
+    """
+    global _settings
+    _settings = None
+
+
+def override_settings(values, replace=False):
+    """
+    Set values used instead of the other sources, and discard the snapshot. Settings
+    derived from an overridden one, e.g. REPORT_DIR from BASE_REPORT_DIR, follow it.
+    
+    Args:
+        values: Setting names and values
+        replace: Whether to drop the earlier overrides, e.g. to restore ones returned before
+        
+    Returns:
+        dict: Overrides before the call
+        
+    Raises:
+        SettingsError: If a name is not a setting
+    """
+    unknown = sorted(set(values) - {setting_field.name for setting_field in fields(Settings)})
+    if unknown:
+        raise SettingsError(f"Unknown settings: {', '.join(unknown)}")
+    previous = dict(_overrides)
+    if replace:
+        _overrides.clear()
+    _overrides.update(values)
+    reload_settings()
+    return previous
+
+
+def _parse(name, raw, setting_type, metadata):
+    """
+    Parse and validate a setting.
+    
+    Args:
+        name: Setting name
+        raw: Value as read from a source
+        setting_type: Type annotation of the setting
+        metadata: Field metadata with the constraints
+        
+    Returns:
+        object: Parsed value
+        
+    Raises:
+        SettingsError: If the value is invalid
+    """
+    if setting_type not in (str, Optional[str]):
+        raw = raw.strip()
+    try:
+        value = PARSERS[setting_type](raw)
+    except ValueError as error:
+        raise SettingsError(f"Invalid {name}={raw!r}: {error}") from None
+    
+    minimum = metadata.get('minimum')
+    if minimum is not None and value < minimum:
+        raise SettingsError(f"Invalid {name}={raw!r}: must be at least {minimum}")
+    choices = metadata.get('choices')
+    if choices is not None and value not in choices:
+        raise SettingsError(f"Invalid {name}={raw!r}: expected one of {', '.join(repr(c) for c in choices)}")
+    return value
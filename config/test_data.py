@@ -89,18 +89,21 @@ ENVIRONMENTS = {
 
 def get_user_data(user_type='default_user'):
     """
-    Get user data by user type
+    Get user data by user type, raising TestDataKeyError for unknown types
     """
-    return USER_DATA.get(user_type, USER_DATA['default_user'])
+    from utils.test_data_registry import test_data_registry
+    return test_data_registry.get(f'user.{user_type}')
 
 def get_scenario_data(scenario_name):
     """
-    Get scenario data by scenario name
+    Get scenario data by scenario name, raising TestDataKeyError for unknown scenarios
     """
-    return SCENARIOS.get(scenario_name, {})
+    from utils.test_data_registry import test_data_registry
+    return test_data_registry.get(f'scenario.{scenario_name}')
 
 def get_environment_data(env='dev'):
     """
-    Get environment specific data
+    Get environment specific data, raising TestDataKeyError for unknown environments
     """
-    return ENVIRONMENTS.get(env, ENVIRONMENTS['dev'])
+    from utils.test_data_registry import test_data_registry
+    return test_data_registry.get(f'environment.{env}')
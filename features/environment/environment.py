@@ -1,13 +1,22 @@
 """
 Behave environment hooks.
 """
-import os
 from datetime import datetime
 from behave.model_core import Status
 
 from selenium.common.exceptions import WebDriverException
 
+from utils import data_feeds, run_context
+from utils.artifact_store import artifact_store
+from utils.command_tracer import tracer
+from utils.data_factory import data_factory
 from utils.driver_factory import DriverFactory
+from utils.driver_pool import DriverPool
+from utils.driver_prelauncher import DriverPrelauncher
+from utils.driver_timing import DriverTimingRecorder
+from utils.screenshot_pipeline import screenshot_pipeline
+from utils.step_profiler import StepProfiler
+from utils.test_data_registry import test_data_registry
 from config import config
 
 
@@ -18,9 +27,29 @@ def before_all(context):
     # Set up context attributes
     context.config_data = config
     
-    # Create reports directory if it doesn't exist
-    os.makedirs(config.REPORT_DIR, exist_ok=True)
-    os.makedirs(config.SCREENSHOT_DIR, exist_ok=True)
+    # Record driver creation phase timings if enabled
+    context.driver_timings = None
+    if config.DRIVER_TIMING_ENABLED:
+        context.driver_timings = DriverTimingRecorder()
+        DriverFactory.add_timing_listener(context.driver_timings)
+    
+    # Record step timings if enabled
+    context.step_profiler = StepProfiler() if config.STEP_PROFILING_ENABLED else None
+    
+    # Reuse warm browser sessions or prelaunch them in the background if enabled
+    if config.DRIVER_POOL_ENABLED:
+        context.driver_provider = DriverPool()
+    elif config.PRELAUNCH_ENABLED:
+        context.driver_provider = DriverPrelauncher()
+    else:
+        context.driver_provider = None
+    
+    # Index the test data once, so invalid data files fail the run before the first scenario
+    test_data_registry.load()
+    
+    # Delete the artifacts of earlier runs that are over their age or size budgets
+    if config.ARTIFACT_STORE_ENABLED:
+        artifact_store.enforce_budgets()
     
     # Set up Allure reporting if available
     try:
@@ -36,6 +65,12 @@ def before_feature(context, feature):
     """
     # Log feature start
     print(f"\nFeature: {feature.name}")
+    run_context.update(feature=feature.name)
+    
+    # Fill the Examples of @data_feed outlines with the records of this worker
+    rows = data_feeds.expand_feature(feature)
+    if rows:
+        print(f"Data feed rows: {rows}")
 
 
 def before_scenario(context, scenario):
@@ -44,20 +79,55 @@ def before_scenario(context, scenario):
     """
     # Log scenario start
     print(f"\nScenario: {scenario.name}")
+    run_context.update(scenario=scenario.name, step=None)
     
     # Initialize WebDriver
-    context.driver = DriverFactory.get_driver()
+    if context.driver_provider:
+        context.driver = context.driver_provider.acquire()
+    else:
+        context.driver = DriverFactory.get_driver()
     context.driver.base_url = config.BASE_URL
     
     # Add test data to context
     from config import test_data
     context.test_data = test_data
+    context.feed_record = data_feeds.get_record(scenario)
+    
+    # Generate the scenario's data from its own seed, so a failure can be replayed
+    data_factory.reseed(f"{config.DATA_FACTORY_SEED}:{scenario.location}")
+    context.data_factory = data_factory
+
+
+def before_step(context, step):
+    """
+    Executed before each step.
+    """
+    # Tag traced commands with the step sending them
+    run_context.update(step=f"{step.keyword} {step.name}")
+    
+    if context.step_profiler:
+        context.step_profiler.start(step)
+
+
+def after_step(context, step):
+    """
+    Executed after each step.
+    """
+    if context.step_profiler:
+        context.step_profiler.stop(step, context.feature.name, context.scenario.name)
 
 
 def after_scenario(context, scenario):
     """
     Executed after each scenario.
     """
+    run_context.update(step=None)
+    
+    if scenario.status == Status.failed:
+        # The unique tokens of the generated data also depend on the run and the worker
+        print(f"Generated test data: DATA_FACTORY_SEED={config.DATA_FACTORY_SEED} RUN_ID={config.RUN_ID} "
+              f"WORKER_ID={config.WORKER_ID or ''}")
+    
     # Take screenshot on failure
     if scenario.status == Status.failed and config.SCREENSHOT_ON_FAILURE:
         scenario_name = scenario.name.replace(' ', '_').lower()
@@ -65,15 +135,35 @@ def after_scenario(context, scenario):
         screenshot_name = f"failed_{scenario_name}_{timestamp}"
         
         try:
-            screenshot_path = os.path.join(config.SCREENSHOT_DIR, f"{screenshot_name}.png")
-            context.driver.save_screenshot(screenshot_path)
+            screenshot_path = screenshot_pipeline.capture(
+                context.driver, screenshot_name, on_written=artifact_store.recorder('screenshot')
+            )
             print(f"Screenshot saved to: {screenshot_path}")
         except WebDriverException:
             print("Failed to take screenshot")
     
-    # Quit WebDriver
+    # Write the commands sent by the scenario before the session is reset or quit
+    if config.COMMAND_TRACE_ENABLED:
+        trace_path = tracer.write_scenario_trace(scenario.feature.name, scenario.name)
+        if trace_path:
+            print(f"Command trace saved to: {trace_path}")
+            if config.ARTIFACT_STORE_ENABLED:
+                artifact_store.add(trace_path, 'trace', feature=scenario.feature.name, scenario=scenario.name)
+    
+    # Log the requests of the scenario and those avoided by the network policy
+    network_policy = DriverFactory.network_policy
+    if network_policy.active and getattr(context, 'driver', None):
+        network_stats = network_policy.collect(context.driver)
+        if network_stats:
+            network_policy.write_scenario_stats(scenario.feature.name, scenario.name, network_stats)
+            print(f"Network: {network_policy.format_stats(network_stats)}")
+    
+    # Quit WebDriver, or hand it back to the pool or teardown executor
     if hasattr(context, 'driver') and context.driver:
-        context.driver.quit()
+        if context.driver_provider:
+            context.driver_provider.release(context.driver)
+        else:
+            context.driver.quit()
         context.driver = None
 
 
@@ -93,3 +183,25 @@ def after_all(context):
     if hasattr(context, 'driver') and context.driver:
         context.driver.quit()
         context.driver = None
+    
+    if getattr(context, 'driver_provider', None):
+        context.driver_provider.shutdown()
+    
+    # Wait for the screenshots still being encoded and written
+    screenshot_pipeline.close()
+    
+    if config.ARTIFACT_STORE_ENABLED and config.ARTIFACT_PACK_RUNS:
+        archive_path = artifact_store.pack_run()
+        if archive_path:
+            print(f"Artifacts packed into: {archive_path}")
+    
+    if getattr(context, 'step_profiler', None):
+        context.step_profiler.close()
+        print(f"Step timings saved to: {context.step_profiler.path}")
+    
+    if getattr(context, 'driver_timings', None):
+        DriverFactory.remove_timing_listener(context.driver_timings)
+        print(f"Driver timings saved to: {context.driver_timings.write()}")
+    
+    if config.COMMAND_TRACE_ENABLED:
+        print(f"Command trace summary saved to: {tracer.write_summary()}")
@@ -1,14 +1,28 @@
 """
 Base page object class that all page objects will inherit from.
 """
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import (
+    ElementNotInteractableException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+)
 from selenium.webdriver.common.action_chains import ActionChains
+from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 
 from config import config
+from utils import js_scripts
+from utils.element_cache import ElementCache
 from utils.helpers import take_screenshot
+from utils.readiness import wait_until_ready
+from utils.waits import WaitEngine
+
+
+LOCATOR_STRATEGIES = (
+    By.ID, By.XPATH, By.LINK_TEXT, By.PARTIAL_LINK_TEXT,
+    By.NAME, By.TAG_NAME, By.CLASS_NAME, By.CSS_SELECTOR,
+)
 
 
 class BasePage:
@@ -16,6 +30,12 @@ class BasePage:
     Base page object class with common methods for all pages.
     """
     
+    # Form field name to locator, used by fill_form. Names match the keys in config/test_data.py
+    FORM_FIELDS = {}
+    
+    # Locator of the element signalling the page is usable, for the 'page-defined' readiness
+    READY_LOCATOR = None
+    
     def __init__(self, driver):
         """
         Initialize the base page object.
@@ -24,17 +44,22 @@ class BasePage:
             driver: WebDriver instance
         """
         self.driver = driver
-        self.wait = WebDriverWait(self.driver, config.IMPLICIT_WAIT)
+        self.waits = WaitEngine.for_driver(driver)
+        self.wait = self.waits.get_wait(config.IMPLICIT_WAIT)
+        self.elements = ElementCache.for_driver(driver)
     
-    def open(self, url=None):
+    def open(self, url=None, readiness=None):
         """
-        Open a URL in the browser.
+        Open a URL in the browser and wait until the page is ready, see utils/readiness.py.
         
         Args:
             url: URL to open, defaults to BASE_URL from config
+            readiness: Optional readiness check, defaults to PAGE_READINESS from config
         """
         url = url or config.BASE_URL
+        self.elements.clear()
         self.driver.get(url)
+        wait_until_ready(self, readiness)
         return self
     
     def find_element(self, locator):
@@ -68,8 +93,7 @@ class BasePage:
         Args:
             locator: Tuple of (By, selector)
         """
-        element = self.wait_for_element_clickable(locator)
-        element.click()
+        self._interact(locator, lambda element: element.click(), 'clickable')
         return self
     
     def input_text(self, locator, text):
@@ -80,9 +104,75 @@ class BasePage:
             locator: Tuple of (By, selector)
             text: Text to input
         """
-        element = self.wait_for_element(locator)
-        element.clear()
-        element.send_keys(text)
+        def type_text(element):
+            element.clear()
+            element.send_keys(text)
+        
+        self._interact(locator, type_text)
+        return self
+    
+    def fill_form(self, values, fields=None, mode=None):
+        """
+        Fill many form fields with as few WebDriver round trips as possible.
+        
+        In 'fast' mode all values are set in the page by a single script, which also
+        fires input and change events. In 'fidelity' mode the fields are looked up in
+        a single call and then typed into with real keystrokes.
+        
+        Args:
+            values: Mapping of field to value. Fields are (By, selector) tuples or names
+                looked up in `fields`, so dicts from config/test_data.py can be passed as is.
+                Fields with a None value are skipped.
+            fields: Optional mapping of field name to locator, defaults to FORM_FIELDS
+            mode: 'fast' or 'fidelity', defaults to FORM_FILL_MODE from config
+        """
+        fields = self.FORM_FIELDS if fields is None else fields
+        mode = mode or config.FORM_FILL_MODE
+        
+        locators = []
+        for field, value in values.items():
+            if value is None:
+                continue
+            if isinstance(field, tuple):
+                locator = field
+            elif field in fields:
+                locator = fields[field]
+            else:
+                raise KeyError(f"No locator declared for form field: {field}")
+            locators.append((locator, value))
+        
+        if not locators:
+            return self
+        self.wait_for_element(locators[0][0])
+        
+        if mode == 'fast':
+            missing = self.driver.execute_script(
+                js_scripts.FILL_FORM,
+                [[by, selector, value] for (by, selector), value in locators],
+            )
+            if missing:
+                raise NoSuchElementException(f"Form fields not found: {', '.join(missing)}")
+        elif mode == 'fidelity':
+            elements = self.driver.execute_script(
+                js_scripts.FIND_FIRST_ELEMENTS,
+                [[by, selector] for (by, selector), _ in locators],
+            )
+            missing = [
+                f"{by}={selector}"
+                for ((by, selector), _), element in zip(locators, elements) if element is None
+            ]
+            if missing:
+                raise NoSuchElementException(f"Form fields not found: {', '.join(missing)}")
+            for (_, value), element in zip(locators, elements):
+                if isinstance(value, bool):
+                    if element.is_selected() != value:
+                        element.click()
+                else:
+                    element.clear()
+                    element.send_keys(str(value))
+        else:
+            raise ValueError(f"Unsupported form fill mode: {mode}")
+        
         return self
     
     def get_text(self, locator):
@@ -95,8 +185,7 @@ class BasePage:
         Returns:
             str: Text of the element
         """
-        element = self.wait_for_element(locator)
-        return element.text
+        return self._interact(locator, lambda element: element.text)
     
     def get_attribute(self, locator, attribute):
         """
@@ -109,8 +198,57 @@ class BasePage:
         Returns:
             str: Attribute value
         """
-        element = self.wait_for_element(locator)
-        return element.get_attribute(attribute)
+        return self._interact(locator, lambda element: element.get_attribute(attribute))
+    
+    def read_elements(self, locators, attributes=None):
+        """
+        Read the state of several elements in a single WebDriver round trip.
+        
+        Unlike get_text and get_attribute this does not wait for the elements,
+        it returns a snapshot of the page as it is.
+        
+        Args:
+            locators: List of (By, selector) tuples
+            attributes: Optional list of attribute names to read from each element
+            
+        Returns:
+            list: One dict per locator with the keys found, text, visible, enabled
+                and attributes (a dict of attribute name to value)
+        """
+        locators = [[by, value] for by, value in locators]
+        return self.driver.execute_script(js_scripts.READ_ELEMENTS, locators, list(attributes or []))
+    
+    def read_locators(self, names=None, attributes=None):
+        """
+        Read the state of the page object's declared locators in a single round trip.
+        
+        Args:
+            names: Optional list of locator names, e.g. ['EMAIL_FIELD'], defaults to all declared locators
+            attributes: Optional list of attribute names to read from each element
+            
+        Returns:
+            dict: Locator name to element state, as returned by read_elements
+        """
+        declared = self.get_declared_locators()
+        names = list(names or declared)
+        states = self.read_elements([declared[name] for name in names], attributes)
+        return dict(zip(names, states))
+    
+    @classmethod
+    def get_declared_locators(cls):
+        """
+        Get the locators declared as class attributes of the page object.
+        
+        Returns:
+            dict: Locator name to (By, selector) tuple
+        """
+        locators = {}
+        for klass in reversed(cls.__mro__):
+            for name, value in vars(klass).items():
+                if (name.isupper() and name != 'READY_LOCATOR' and isinstance(value, tuple)
+                        and len(value) == 2 and value[0] in LOCATOR_STRATEGIES):
+                    locators[name] = value
+        return locators
     
     def is_element_displayed(self, locator, timeout=5):
         """
@@ -123,56 +261,63 @@ class BasePage:
         Returns:
             bool: True if the element is displayed, False otherwise
         """
+        if config.ELEMENT_CACHE_ENABLED:
+            element = self.elements.get(locator)
+            try:
+                if element is not None and element.is_displayed():
+                    return True
+            except StaleElementReferenceException:
+                self.elements.invalidate(locator)
+        
         try:
             element = self.wait_for_element(locator, timeout)
-            return element.is_displayed()
         except (TimeoutException, NoSuchElementException):
             return False
+        if config.ELEMENT_CACHE_ENABLED:
+            self.elements.put(locator, element)
+        return element.is_displayed()
     
-    def wait_for_element(self, locator, timeout=None):
+    def wait_for_element(self, locator, timeout=None, backend=None):
         """
         Wait for an element to be present and visible.
         
         Args:
             locator: Tuple of (By, selector)
             timeout: Optional timeout in seconds
+            backend: Optional wait backend, 'polling' or 'observer', defaults to WAIT_BACKEND from config
             
         Returns:
             WebElement: The found element
         """
-        timeout = timeout or config.IMPLICIT_WAIT
-        wait = WebDriverWait(self.driver, timeout)
-        return wait.until(EC.visibility_of_element_located(locator))
+        return self.waits.wait_for_locator(locator, 'visible', timeout, backend)
     
-    def wait_for_element_clickable(self, locator, timeout=None):
+    def wait_for_element_clickable(self, locator, timeout=None, backend=None):
         """
         Wait for an element to be clickable.
         
         Args:
             locator: Tuple of (By, selector)
             timeout: Optional timeout in seconds
+            backend: Optional wait backend, 'polling' or 'observer', defaults to WAIT_BACKEND from config
             
         Returns:
             WebElement: The found element
         """
-        timeout = timeout or config.IMPLICIT_WAIT
-        wait = WebDriverWait(self.driver, timeout)
-        return wait.until(EC.element_to_be_clickable(locator))
+        return self.waits.wait_for_locator(locator, 'clickable', timeout, backend)
     
-    def wait_for_url_contains(self, text, timeout=None):
+    def wait_for_url_contains(self, text, timeout=None, backend=None):
         """
         Wait for the URL to contain specific text.
         
         Args:
             text: Text to wait for in the URL
             timeout: Optional timeout in seconds
+            backend: Optional wait backend, 'polling' or 'observer', defaults to WAIT_BACKEND from config
             
         Returns:
             bool: True if the URL contains the text, False otherwise
         """
-        timeout = timeout or config.IMPLICIT_WAIT
-        wait = WebDriverWait(self.driver, timeout)
-        return wait.until(EC.url_contains(text))
+        return self.waits.wait_for_url_contains(text, timeout, backend)
     
     def hover(self, locator):
         """
@@ -181,8 +326,10 @@ class BasePage:
         Args:
             locator: Tuple of (By, selector)
         """
-        element = self.wait_for_element(locator)
-        ActionChains(self.driver).move_to_element(element).perform()
+        def move_to(element):
+            ActionChains(self.driver).move_to_element(element).perform()
+        
+        self._interact(locator, move_to)
         return self
     
     def scroll_to_element(self, locator):
@@ -192,8 +339,10 @@ class BasePage:
         Args:
             locator: Tuple of (By, selector)
         """
-        element = self.wait_for_element(locator)
-        self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
+        def scroll_into_view(element):
+            self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
+        
+        self._interact(locator, scroll_into_view)
         return self
     
     def take_screenshot(self, name=None):
@@ -230,6 +379,7 @@ class BasePage:
         """
         Refresh the current page.
         """
+        self.elements.clear()
         self.driver.refresh()
         return self
     
@@ -237,6 +387,7 @@ class BasePage:
         """
         Go back to the previous page.
         """
+        self.elements.clear()
         self.driver.back()
         return self
     
@@ -244,6 +395,7 @@ class BasePage:
         """
         Go forward to the next page.
         """
+        self.elements.clear()
         self.driver.forward()
         return self
     
@@ -256,6 +408,7 @@ class BasePage:
         """
         frame = self.wait_for_element(locator)
         self.driver.switch_to.frame(frame)
+        self.elements.enter_frame(frame)
         return self
     
     def switch_to_default_content(self):
@@ -263,6 +416,7 @@ class BasePage:
         Switch back to the default content from an iframe.
         """
         self.driver.switch_to.default_content()
+        self.elements.exit_frames()
         return self
     
     def execute_script(self, script, *args):
@@ -286,8 +440,7 @@ class BasePage:
             locator: Tuple of (By, selector)
             key: Key to press (from selenium.webdriver.common.keys.Keys)
         """
-        element = self.wait_for_element(locator)
-        element.send_keys(key)
+        self._interact(locator, lambda element: element.send_keys(key))
         return self
     
     def press_enter(self, locator):
@@ -307,3 +460,34 @@ class BasePage:
             locator: Tuple of (By, selector)
         """
         return self.press_key(locator, Keys.ESCAPE)
+    
+    def _interact(self, locator, action, state='visible'):
+        """
+        Run an action on an element, reusing the cached element when possible.
+        
+        On a cache hit the find command is skipped. A cached element that is stale, hidden
+        or no longer interactable is dropped, and the element is waited for and found again.
+        
+        Args:
+            locator: Tuple of (By, selector)
+            action: Callable taking the WebElement
+            state: State to wait for when the element is not cached, 'visible' or 'clickable'
+            
+        Returns:
+            The result of the action
+        """
+        if config.ELEMENT_CACHE_ENABLED:
+            element = self.elements.get(locator)
+            if element is not None:
+                try:
+                    # Cached elements must still be in the state the wait would ensure
+                    if element.is_displayed() and (state != 'clickable' or element.is_enabled()):
+                        return action(element)
+                except (StaleElementReferenceException, ElementNotInteractableException):
+                    pass
+                self.elements.invalidate(locator)
+        
+        element = self.waits.wait_for_locator(locator, state)
+        if config.ELEMENT_CACHE_ENABLED:
+            self.elements.put(locator, element)
+        return action(element)
@@ -1,9 +1,12 @@
 """
 Example page object for demonstration purposes.
 """
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
 from selenium.webdriver.common.by import By
+from config import config
 from page_objects.base_page import BasePage
 from utils.helpers import parse_test_data
+from utils.session_cache import session_cache
 
 
 class LoginPage(BasePage):
@@ -15,6 +18,7 @@ class LoginPage(BasePage):
     PASSWORD_INPUT = (By.ID, "password")
     LOGIN_BUTTON = (By.ID, "login-button")
     ERROR_MESSAGE = (By.CSS_SELECTOR, ".error-message")
+    READY_LOCATOR = USERNAME_INPUT
     
     def __init__(self, driver):
         """
@@ -26,11 +30,14 @@ class LoginPage(BasePage):
         super().__init__(driver)
         self.url = "/login"  # Relative URL
     
-    def open(self):
+    def open(self, readiness=None):
         """
         Open the login page.
+        
+        Args:
+            readiness: Optional readiness check, defaults to PAGE_READINESS from config
         """
-        return super().open(f"{self.driver.base_url}{self.url}")
+        return super().open(f"{self.driver.base_url}{self.url}", readiness)
     
     def login(self, username, password):
         """
@@ -49,11 +56,51 @@ class LoginPage(BasePage):
         """
         Login as a specific user type.
         
+        With SESSION_CACHE_ENABLED, the cookies and storage of an earlier login of the
+        user are restored instead, falling back to the login form if they are rejected.
+        
         Args:
             user_type: User type from test_data
         """
         user_data = parse_test_data(user_type)
-        return self.login(user_data['username'], user_data['password'])
+        if not config.SESSION_CACHE_ENABLED:
+            return self.login(user_data['username'], user_data['password'])
+        
+        session_cache.restore_or_login(
+            self.driver,
+            user_type,
+            self.driver.base_url,
+            # Restoring a rejected snapshot navigates away from the login form
+            login=lambda: self.open().login(user_data['username'], user_data['password']),
+            validate=lambda driver: self.is_logged_in(),
+            username=user_data['username'],
+        )
+        return self
+    
+    def is_logged_in(self, timeout=5):
+        """
+        Check if the browser is past the login page, waiting for a submitted login to
+        finish, i.e. for the login form to disappear.
+        
+        Args:
+            timeout: Timeout in seconds
+            
+        Returns:
+            bool: True if the login form is not displayed, False otherwise
+        """
+        try:
+            return self.waits.until_not(self._is_login_form_displayed, timeout)
+        except TimeoutException:
+            return False
+    
+    def _is_login_form_displayed(self, driver):
+        """
+        Check if the login form is displayed, a form torn down while it is checked counts as gone.
+        """
+        try:
+            return any(element.is_displayed() for element in driver.find_elements(*self.USERNAME_INPUT))
+        except StaleElementReferenceException:
+            return False
     
     def get_error_message(self):
         """
@@ -83,6 +130,7 @@ class DashboardPage(BasePage):
     LOGOUT_BUTTON = (By.ID, "logout-button")
     USER_PROFILE = (By.ID, "user-profile")
     AGE_RESTRICTED_CONTENT = (By.ID, "age-restricted-content")
+    READY_LOCATOR = WELCOME_MESSAGE
     
     def __init__(self, driver):
         """
@@ -94,11 +142,14 @@ class DashboardPage(BasePage):
         super().__init__(driver)
         self.url = "/dashboard"  # Relative URL
     
-    def open(self):
+    def open(self, readiness=None):
         """
         Open the dashboard page.
+        
+        Args:
+            readiness: Optional readiness check, defaults to PAGE_READINESS from config
         """
-        return super().open(f"{self.driver.base_url}{self.url}")
+        return super().open(f"{self.driver.base_url}{self.url}", readiness)
     
     def get_welcome_message(self):
         """
@@ -143,6 +194,13 @@ class ProfilePage(BasePage):
     AGE_FIELD = (By.ID, "profile-age")
     SAVE_BUTTON = (By.ID, "save-profile")
     SUCCESS_MESSAGE = (By.CSS_SELECTOR, ".success-message")
+    READY_LOCATOR = USERNAME_FIELD
+    
+    FORM_FIELDS = {
+        'username': USERNAME_FIELD,
+        'email': EMAIL_FIELD,
+        'age': AGE_FIELD,
+    }
     
     def __init__(self, driver):
         """
@@ -154,11 +212,14 @@ class ProfilePage(BasePage):
         super().__init__(driver)
         self.url = "/profile"  # Relative URL
     
-    def open(self):
+    def open(self, readiness=None):
         """
         Open the profile page.
+        
+        Args:
+            readiness: Optional readiness check, defaults to PAGE_READINESS from config
         """
-        return super().open(f"{self.driver.base_url}{self.url}")
+        return super().open(f"{self.driver.base_url}{self.url}", readiness)
     
     def get_username(self):
         """
@@ -187,6 +248,18 @@ class ProfilePage(BasePage):
         """
         return self.get_attribute(self.AGE_FIELD, "value")
     
+    def get_profile(self):
+        """
+        Get the username, email and age from the profile in a single round trip.
+        
+        Returns:
+            dict: Profile values with the keys username, email and age
+        """
+        self.wait_for_element(self.USERNAME_FIELD)
+        fields = {'username': 'USERNAME_FIELD', 'email': 'EMAIL_FIELD', 'age': 'AGE_FIELD'}
+        states = self.read_locators(list(fields.values()), attributes=['value'])
+        return {key: states[name]['attributes'].get('value') for key, name in fields.items()}
+    
     def update_profile(self, username=None, email=None, age=None):
         """
         Update the profile with the provided information.
@@ -196,12 +269,11 @@ class ProfilePage(BasePage):
             email: Optional new email
             age: Optional new age
         """
-        if username:
-            self.input_text(self.USERNAME_FIELD, username)
-        if email:
-            self.input_text(self.EMAIL_FIELD, email)
-        if age:
-            self.input_text(self.AGE_FIELD, str(age))
+        self.fill_form({
+            'username': username or None,
+            'email': email or None,
+            'age': age or None,
+        })
         
         self.click(self.SAVE_BUTTON)
         return self
@@ -214,3 +286,71 @@ class ProfilePage(BasePage):
             bool: True if a success message is displayed, False otherwise
         """
         return self.is_element_displayed(self.SUCCESS_MESSAGE)
+
+
+class RegistrationPage(BasePage):
+    """
+    Registration page object.
+    """
+    # Locators
+    FIRST_NAME_INPUT = (By.ID, "first-name")
+    LAST_NAME_INPUT = (By.ID, "last-name")
+    PHONE_INPUT = (By.ID, "phone")
+    ADDRESS_INPUT = (By.ID, "address")
+    CITY_INPUT = (By.ID, "city")
+    ZIP_CODE_INPUT = (By.ID, "zip-code")
+    COUNTRY_INPUT = (By.ID, "country")
+    REGISTER_BUTTON = (By.ID, "register-button")
+    SUCCESS_MESSAGE = (By.CSS_SELECTOR, ".success-message")
+    READY_LOCATOR = FIRST_NAME_INPUT
+    
+    # Keys match FORM_DATA['registration'] in config/test_data.py
+    FORM_FIELDS = {
+        'first_name': FIRST_NAME_INPUT,
+        'last_name': LAST_NAME_INPUT,
+        'phone': PHONE_INPUT,
+        'address': ADDRESS_INPUT,
+        'city': CITY_INPUT,
+        'zip_code': ZIP_CODE_INPUT,
+        'country': COUNTRY_INPUT,
+    }
+    
+    def __init__(self, driver):
+        """
+        Initialize the registration page object.
+        
+        Args:
+            driver: WebDriver instance
+        """
+        super().__init__(driver)
+        self.url = "/register"  # Relative URL
+    
+    def open(self, readiness=None):
+        """
+        Open the registration page.
+        
+        Args:
+            readiness: Optional readiness check, defaults to PAGE_READINESS from config
+        """
+        return super().open(f"{self.driver.base_url}{self.url}", readiness)
+    
+    def register(self, form_key='registration', mode=None):
+        """
+        Fill in and submit the registration form.
+        
+        Args:
+            form_key: Form data key from test_data
+            mode: Optional form fill mode, 'fast' or 'fidelity'
+        """
+        self.fill_form(parse_test_data(form_key), mode=mode)
+        self.click(self.REGISTER_BUTTON)
+        return self
+    
+    def is_success_message_displayed(self):
+        """
+        Check if a success message is displayed.
+        
+        Returns:
+            bool: True if a success message is displayed, False otherwise
+        """
+        return self.is_element_displayed(self.SUCCESS_MESSAGE)
@@ -0,0 +1,48 @@
+"""
+Tests of the per-scenario command traces in utils/command_tracer.py.
+"""
+import json
+import threading
+
+import pytest
+
+from config import config
+from utils import run_context
+from utils.command_tracer import CommandTracer
+
+
+@pytest.fixture
+def tracer(tmp_path):
+    with config.override(BASE_REPORT_DIR=str(tmp_path), RUN_ID='run'):
+        yield CommandTracer()
+    run_context.update(feature=None, scenario=None, step=None)
+
+
+def read_commands(path):
+    with open(path) as trace_file:
+        return [json.loads(line).get('command') for line in trace_file][1:]
+
+
+def test_trace_holds_only_the_commands_of_the_scenario(tracer):
+    run_context.update(feature='Login', scenario='Valid user', step='Given a user')
+    tracer.record('get', {'url': 'http://app'}, 0.01)
+    # A teardown thread quitting the previous scenario's session
+    thread = threading.Thread(target=tracer.record, args=('quit', {}, 0.02))
+    thread.start()
+    thread.join()
+    
+    path = tracer.write_scenario_trace('Login', 'Valid user')
+    
+    assert read_commands(path) == ['get']
+    assert tracer.summary()['commands'].keys() == {'get', 'quit'}
+
+
+def test_scenarios_with_the_same_name_get_their_own_trace(tracer):
+    run_context.update(feature='Login', scenario='Valid user', step=None)
+    paths = []
+    for command in ('get', 'refresh'):
+        tracer.record(command, {}, 0.01)
+        paths.append(tracer.write_scenario_trace('Login', 'Valid user'))
+    
+    assert paths[0] != paths[1]
+    assert [read_commands(path) for path in paths] == [['get'], ['refresh']]
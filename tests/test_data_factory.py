@@ -0,0 +1,54 @@
+"""
+Tests of the test data factory in utils/data_factory.py.
+"""
+import collections
+
+from config import config
+from utils import data_factory
+from utils.data_factory import DataFactory
+
+
+def test_same_seed_generates_the_same_data():
+    first = DataFactory(seed='run:features/login.feature:12', namespace='n')
+    second = DataFactory(seed='run:features/login.feature:12', namespace='n')
+    
+    assert first.users(50) == second.users(50)
+    assert first.forms(5) == second.forms(5)
+
+
+def test_data_does_not_depend_on_earlier_scenarios(monkeypatch):
+    factory = DataFactory(seed='replay-base:features/a.feature:3')
+    for location in range(20):
+        factory.reseed(f'replay-base:features/b.feature:{location}')
+        factory.users(3)
+    factory.reseed('replay-base:features/c.feature:7')
+    after_others = factory.users(3)
+    
+    # A fresh process, running only the failed scenario
+    monkeypatch.setattr(data_factory, '_seed_uses', collections.Counter())
+    alone = DataFactory(seed='replay-base:features/c.feature:7').users(3)
+    
+    assert alone == after_others
+
+
+def test_tokens_are_unique_across_scenarios_and_workers():
+    usernames = set()
+    for worker in ('0', '1', '2'):
+        with config.override(WORKER_ID=worker, RUN_ID='same-run'):
+            for location in range(10):
+                factory = DataFactory(seed=f'same-seed:features/a.feature:{location}')
+                usernames.update(user['username'] for user in factory.users(100))
+            # The same scenario again, e.g. retried, in the same process
+            retried = DataFactory(seed='same-seed:features/a.feature:0')
+            usernames.update(user['username'] for user in retried.users(100))
+    
+    assert len(usernames) == 3 * 11 * 100
+
+
+def test_text_uses_only_the_alphabet():
+    factory = DataFactory(seed='alphabet')
+    
+    assert set(factory.text(10000, 'abc')) == set('abc')
+    assert len(factory.text(37)) == 37
+    assert factory.text(0) == ''
+    assert [len(text) for text in factory.texts(4, 6)] == [6, 6, 6, 6]
@@ -0,0 +1,208 @@
+"""
+Tests of the streaming data feeds in utils/data_feeds.py.
+"""
+import json
+
+import pytest
+from behave.parser import parse_feature
+
+from config import config
+from utils import test_data_registry
+from utils.data_feeds import DataFeed, expand_feature, expand_outline, get_feed, get_record
+from utils.helpers import parse_test_data
+
+
+FEATURE = """
+Feature: Users
+  Scenario: Plain
+    Given nothing
+  @data_feed:users.csv
+  Scenario Outline: User <name>
+    Given user "<name>" aged "<age>"
+    Examples:
+      | name | age |
+"""
+
+
+def write_csv(path, rows, bom=False):
+    """
+    Write a name,age CSV file, lines of varying length so shard boundaries fall inside records.
+    """
+    with open(path, 'w', encoding='utf-8-sig' if bom else 'utf-8', newline='') as csv_file:
+        csv_file.write('name,age\n')
+        for index in range(rows):
+            csv_file.write(f'u{index},{20 + index % 50}\n')
+    return str(path)
+
+
+def write_jsonl(path, rows):
+    """
+    Write a JSONL file of nested records.
+    """
+    with open(path, 'w', encoding='utf-8') as jsonl_file:
+        for index in range(rows):
+            city = 'Berlin' if index % 3 else 'Paris'
+            record = {'id': index, 'address': {'city': city}, 'tags': ['x'] * (index % 7)}
+            jsonl_file.write(json.dumps(record) + '\n')
+    return str(path)
+
+
+@pytest.mark.parametrize('bom', [False, True])
+def test_csv_records_with_and_without_bom(tmp_path, bom):
+    path = write_csv(tmp_path / 'users.csv', 10, bom=bom)
+    records = list(DataFeed(path))
+    
+    assert records[0] == {'name': 'u0', 'age': '20'}
+    assert [record['name'] for record in records] == [f'u{index}' for index in range(10)]
+
+
+@pytest.mark.parametrize('bom', [False, True])
+def test_first_csv_shard_starts_at_the_first_record(tmp_path, bom):
+    path = write_csv(tmp_path / 'users.csv', 10, bom=bom)
+    
+    assert next(iter(DataFeed(path).shard(0, 3))) == {'name': 'u0', 'age': '20'}
+
+
+@pytest.mark.parametrize('count', [1, 2, 3, 7, 16, 64])
+@pytest.mark.parametrize('bom', [False, True])
+def test_csv_shards_hold_every_record_once(tmp_path, count, bom):
+    path = write_csv(tmp_path / 'users.csv', 1001, bom=bom)
+    
+    shards = [[record['name'] for record in DataFeed(path).shard(index, count)] for index in range(count)]
+    
+    assert [name for shard in shards for name in shard] == [f'u{index}' for index in range(1001)]
+
+
+@pytest.mark.parametrize('count', [1, 2, 5, 13, 40])
+def test_jsonl_shards_hold_every_record_once(tmp_path, count):
+    path = write_jsonl(tmp_path / 'users.jsonl', 500)
+    
+    ids = [record['id'] for index in range(count) for record in DataFeed(path).shard(index, count)]
+    
+    assert ids == list(range(500))
+
+
+def test_shards_of_files_smaller_than_the_shard_count(tmp_path):
+    path = write_csv(tmp_path / 'users.csv', 2)
+    empty = tmp_path / 'empty.jsonl'
+    empty.write_text('')
+    
+    assert [record['name'] for index in range(8) for record in DataFeed(path).shard(index, 8)] == ['u0', 'u1']
+    assert [record for index in range(3) for record in DataFeed(str(empty)).shard(index, 3)] == []
+
+
+def test_sample_picks_the_same_records_whatever_the_sharding(tmp_path):
+    path = write_jsonl(tmp_path / 'users.jsonl', 2000)
+    
+    sample = [record['id'] for record in DataFeed(path).sample(0.1, seed=7)]
+    sharded = [
+        record['id'] for index in range(4) for record in DataFeed(path).sample(0.1, seed=7).shard(index, 4)
+    ]
+    
+    assert sharded == sample
+    assert 100 < len(sample) < 300
+    assert sample != [record['id'] for record in DataFeed(path).sample(0.1, seed=8)]
+    assert list(DataFeed(path).sample(0)) == []
+    assert len(list(DataFeed(path).sample(1))) == 2000
+
+
+def test_sample_rate_must_be_a_share(tmp_path):
+    with pytest.raises(ValueError):
+        DataFeed(write_jsonl(tmp_path / 'users.jsonl', 1)).sample(1.5)
+
+
+def test_where_filter_and_limit(tmp_path):
+    path = write_jsonl(tmp_path / 'users.jsonl', 100)
+    feed = DataFeed(path)
+    
+    assert all(record['address']['city'] == 'Paris' for record in feed.where(address__city='Paris'))
+    assert len(list(feed.where(address__city='Paris'))) == 34
+    assert [record['id'] for record in feed.where(id='3')] == [3]
+    assert [record['id'] for record in feed.filter(lambda record: record['id'] > 95)] == [96, 97, 98, 99]
+    assert [record['id'] for record in feed.where(address__city='Berlin').limit(3)] == [1, 2, 4]
+    assert len(list(feed.where(address__city='Paris'))) == 34
+
+
+def test_get_feed_shards_over_the_workers(tmp_path):
+    write_csv(tmp_path / 'users.csv', 30)
+    
+    with config.override(TEST_DATA_DIR=str(tmp_path)):
+        names = [record['name'] for index in range(3) for record in get_feed('users.csv', index, 3)]
+        with pytest.raises(test_data_registry.TestDataKeyError):
+            get_feed('missing.csv')
+    
+    assert names == [f'u{index}' for index in range(30)]
+
+
+def test_parse_test_data_streams_feeds_and_reads_record_fields(tmp_path):
+    path = write_jsonl(tmp_path / 'users.jsonl', 10)
+    
+    with config.override(TEST_DATA_DIR=str(tmp_path), WORKER_ID='1', WORKER_COUNT=2):
+        records = list(parse_test_data('feed.users.jsonl'))
+    
+    assert records == list(DataFeed(path).shard(1, 2))
+    record = next(record for record in records if record['id'] == 6)
+    assert parse_test_data('address.city', record) == 'Paris'
+    assert parse_test_data('tags.5', record) == 'x'
+    assert parse_test_data('id', record) == 6
+    with pytest.raises(test_data_registry.TestDataKeyError):
+        parse_test_data('address.street', record)
+
+
+def test_data_files_cannot_use_the_feed_namespace(tmp_path):
+    (tmp_path / 'feed.json').write_text('{"users": {}}')
+    registry = test_data_registry.TestDataRegistry(str(tmp_path), str(tmp_path / 'cache.pickle'))
+    
+    with pytest.raises(test_data_registry.TestDataError):
+        registry.get('user.minor_user')
+
+
+@pytest.mark.parametrize('bom', [False, True])
+def test_expand_feature_fills_the_examples_of_feed_outlines(tmp_path, bom):
+    write_csv(tmp_path / 'users.csv', 10, bom=bom)
+    feature = parse_feature(FEATURE)
+    
+    with config.override(TEST_DATA_DIR=str(tmp_path), WORKER_ID=None, WORKER_COUNT=1):
+        assert expand_feature(feature) == 10
+    
+    outline = feature.scenarios[1]
+    scenarios = outline.scenarios
+    # behave 1.3 appends the row to the names of generated scenarios
+    assert scenarios[0].name.startswith('User u0') and scenarios[1].name.startswith('User u1')
+    assert scenarios[0].steps[0].name == 'user "u0" aged "20"'
+    assert get_record(scenarios[9]) == {'name': 'u9', 'age': '29'}
+    assert get_record(feature.scenarios[0]) is None
+    # Filled tables are left alone when the feature runs again
+    with config.override(TEST_DATA_DIR=str(tmp_path), WORKER_ID=None, WORKER_COUNT=1):
+        assert expand_feature(feature) == 0
+
+
+def test_expand_outline_shards_over_the_workers(tmp_path):
+    path = write_csv(tmp_path / 'users.csv', 25)
+    names = []
+    for index in range(4):
+        outline = parse_feature(FEATURE).scenarios[1]
+        expand_outline(outline, DataFeed(path).shard(index, 4))
+        names.extend(get_record(scenario)['name'] for scenario in outline.scenarios)
+    
+    assert names == [f'u{index}' for index in range(25)]
+
+
+def test_expand_outline_refuses_more_rows_than_the_maximum(tmp_path):
+    path = write_csv(tmp_path / 'users.csv', 11)
+    outline = parse_feature(FEATURE).scenarios[1]
+    
+    assert expand_outline(outline, DataFeed(path).limit(10), max_rows=10) == 10
+    with pytest.raises(test_data_registry.TestDataError):
+        expand_outline(parse_feature(FEATURE).scenarios[1], DataFeed(path), max_rows=10)
+
+
+def test_expand_outline_refuses_several_empty_tables(tmp_path):
+    path = write_csv(tmp_path / 'users.csv', 3)
+    outline = parse_feature(FEATURE + """
+    Examples: Again
+      | name |
+""").scenarios[1]
+    
+    with pytest.raises(test_data_registry.TestDataError):
+        expand_outline(outline, DataFeed(path))
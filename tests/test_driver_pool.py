@@ -0,0 +1,70 @@
+"""
+Tests of the browser state reset of pooled sessions in utils/driver_pool.py.
+"""
+import pytest
+
+from utils.driver_factory import DriverFactory
+from utils.driver_pool import DriverPool
+from utils.fake_driver import FakeDriver
+
+
+ROUTES = {'http://a.test/': '<p>A</p>', 'http://b.test/': '<p>B</p>'}
+
+
+class ChromiumFakeDriver(FakeDriver):
+    """
+    Fake driver answering the DevTools commands used by the reset.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cdp_commands = []
+    
+    def execute_cdp_cmd(self, cmd, cmd_args):
+        self.cdp_commands.append((cmd, cmd_args))
+        if cmd == 'Page.getNavigationHistory':
+            return {'entries': [{'url': url} for url in self._history]}
+        return {}
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    def get_driver(browser):
+        driver_class = ChromiumFakeDriver if browser == 'chrome' else FakeDriver
+        return driver_class(ROUTES, allow_network=False)
+    monkeypatch.setattr(DriverFactory, 'get_driver', get_driver)
+    return DriverPool(size=1, max_uses=10)
+
+
+def test_session_of_one_origin_is_reused_with_its_storage_cleared(pool):
+    driver = pool.acquire('fake')
+    driver.get('http://a.test/')
+    driver.storage['local', 'http://a.test']['token'] = 'secret'
+    
+    pool.release(driver)
+    
+    assert pool.acquire('fake') is driver
+    assert driver.current_url == 'about:blank'
+    assert not driver.storage['local', 'http://a.test']
+
+
+def test_session_that_visited_another_origin_is_recycled(pool):
+    driver = pool.acquire('fake')
+    driver.get('http://a.test/')
+    driver.get('http://b.test/')
+    
+    pool.release(driver)
+    
+    assert pool.acquire('fake') is not driver
+
+
+def test_chromium_clears_every_visited_origin(pool):
+    driver = pool.acquire('chrome')
+    driver.get('http://a.test/')
+    driver.get('http://b.test/')
+    
+    pool.release(driver)
+    
+    cleared = {args['origin'] for cmd, args in driver.cdp_commands if cmd == 'Storage.clearDataForOrigin'}
+    assert cleared == {'http://a.test', 'http://b.test'}
+    assert pool.acquire('chrome') is driver
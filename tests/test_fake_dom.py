@@ -0,0 +1,86 @@
+"""
+Tests of the parsed DOM of the fake driver in utils/fake_dom.py.
+"""
+import pytest
+from selenium.common.exceptions import InvalidSelectorException
+from selenium.webdriver.common.by import By
+
+from utils.fake_dom import parse_document
+
+
+HTML = (
+    '<html><head><title>Shop</title><style>p { color: red }</style></head><body>'
+    '<div id="main" class="box wide">'
+    '<p class="intro">Hello <b>world</b></p>'
+    '<p data-role="note" hidden>Hidden note</p>'
+    '<ul><li>One</li><li class="x">Two</li><li>Three</li></ul>'
+    '<a href="/cart" name="cart">Your cart (2)</a>'
+    '</div>'
+    '<form><fieldset disabled><input name="locked"></fieldset>'
+    '<input type="hidden" name="token" value="t"><input type="checkbox" name="news" checked></form>'
+    '<span style="display: none"><em id="nested">Nested</em></span>'
+    '<span style="visibility:hidden">Invisible</span><span style="opacity: 0">Transparent</span>'
+    '</body></html>'
+)
+
+
+@pytest.fixture(scope='module')
+def document():
+    return parse_document(HTML, 'http://shop.test/')
+
+
+def texts(elements):
+    return [element.rendered_text() for element in elements]
+
+
+@pytest.mark.parametrize('by, value, expected', [
+    (By.ID, 'main', ['div']),
+    (By.NAME, 'cart', ['a']),
+    (By.CLASS_NAME, 'wide', ['div']),
+    (By.TAG_NAME, 'li', ['li', 'li', 'li']),
+    (By.LINK_TEXT, 'Your cart (2)', ['a']),
+    (By.PARTIAL_LINK_TEXT, 'cart', ['a']),
+    (By.CSS_SELECTOR, 'div#main > p.intro', ['p']),
+    (By.CSS_SELECTOR, '[data-role=note], ul li:nth-child(2)', ['p', 'li']),
+    (By.CSS_SELECTOR, 'input:checked', ['input']),
+    (By.XPATH, '//ul/li[2]', ['li']),
+    (By.XPATH, "//a[contains(text(), 'cart')]", ['a']),
+    (By.XPATH, "//li[@class='x' or text()='Three']", ['li', 'li']),
+])
+def test_locator_strategies(document, by, value, expected):
+    assert [element.tag for element in document.find_all(by, value)] == expected
+
+
+def test_xpath_position_and_text_predicates(document):
+    assert texts(document.find_all(By.XPATH, '//li[last()]')) == ['Three']
+    assert texts(document.find_all(By.XPATH, "//li[starts-with(., 'T')]")) == ['Two', 'Three']
+
+
+def test_invalid_selectors_raise(document):
+    with pytest.raises(InvalidSelectorException):
+        document.find_all(By.CSS_SELECTOR, 'p[')
+
+
+@pytest.mark.parametrize('selector, displayed', [
+    ('p.intro', True),
+    ('[data-role=note]', False),
+    ('#nested', False),
+    ('input[name=token]', False),
+    ('span[style*=visibility]', False),
+    ('span[style*=opacity]', False),
+    ('title', False),
+])
+def test_visibility_follows_hidden_attributes_inline_styles_and_types(document, selector, displayed):
+    assert document.find_all(By.CSS_SELECTOR, selector)[0].is_displayed() is displayed
+
+
+def test_rendered_text_skips_hidden_content(document):
+    main = document.find_all(By.ID, 'main')[0]
+    
+    assert main.rendered_text() == 'Hello world\nOne\nTwo\nThree\nYour cart (2)'
+    assert document.title == 'Shop'
+
+
+def test_disabled_fieldsets_disable_their_controls(document):
+    assert not document.find_all(By.NAME, 'locked')[0].is_enabled()
+    assert document.find_all(By.CSS_SELECTOR, 'input:disabled')[0].attrs['name'] == 'locked'
@@ -0,0 +1,115 @@
+"""
+Tests of the in-process fake WebDriver in utils/fake_driver.py.
+"""
+import pytest
+from selenium.common.exceptions import (
+    ElementNotInteractableException,
+    NoSuchElementException,
+    NoSuchFrameException,
+    StaleElementReferenceException,
+)
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+
+from utils.fake_driver import FakeDriver, Redirect
+
+
+FORM = (
+    '<form action="/search" method="{method}">'
+    '<input name="q" value="old"><label for="news">News</label><input type="checkbox" id="news" name="news">'
+    '<select name="size"><option>S</option><option selected>M</option></select>'
+    '<input name="secret" style="display:none"><button>Go</button>'
+    '</form>'
+)
+
+
+@pytest.fixture
+def requests():
+    return []
+
+
+@pytest.fixture
+def driver(requests):
+    def search(request):
+        requests.append(request)
+        return f'<p id="result">{request.method} {sorted({**request.query, **request.form}.items())}</p>'
+    
+    return FakeDriver({
+        'http://app.test/get': FORM.format(method='get'),
+        'http://app.test/post': FORM.format(method='post'),
+        '/search': search,
+        '/old': lambda request: Redirect('/get'),
+        '/frames': '<iframe name="inner" src="/inner"></iframe><iframe srcdoc="<p id=doc>Doc</p>"></iframe>',
+        '/inner': '<p id="inside">Inside</p><iframe id="deeper" srcdoc="<b>Deeper</b>"></iframe>',
+    }, allow_network=False)
+
+
+@pytest.mark.parametrize('method', ['get', 'post'])
+def test_forms_submit_their_fields(driver, requests, method):
+    driver.get(f'http://app.test/{method}')
+    driver.find_element(By.NAME, 'q').clear()
+    driver.find_element(By.NAME, 'q').send_keys('shoes')
+    driver.find_element(By.CSS_SELECTOR, 'label').click()
+    driver.find_element(By.TAG_NAME, 'button').click()
+    
+    assert requests[-1].method == method.upper()
+    assert requests[-1].path == '/search'
+    fields = {**requests[-1].query, **requests[-1].form}
+    assert fields == {'q': 'shoes', 'news': 'on', 'size': 'M', 'secret': ''}
+
+
+def test_enter_submits_the_form_and_old_elements_turn_stale(driver, requests):
+    driver.get('http://app.test/get')
+    field = driver.find_element(By.NAME, 'q')
+    field.send_keys(Keys.BACKSPACE * 3, 'hats', Keys.ENTER)
+    
+    assert requests[-1].query['q'] == 'hats'
+    assert driver.current_url.startswith('http://app.test/search?')
+    with pytest.raises(StaleElementReferenceException):
+        field.get_attribute('value')
+
+
+def test_hidden_elements_cannot_be_used(driver):
+    driver.get('http://app.test/get')
+    
+    with pytest.raises(ElementNotInteractableException):
+        driver.find_element(By.NAME, 'secret').send_keys('x')
+    with pytest.raises(NoSuchElementException):
+        driver.find_element(By.ID, 'missing')
+
+
+def test_redirects_and_history(driver):
+    driver.get('http://app.test/old')
+    driver.get('http://app.test/frames')
+    driver.back()
+    
+    assert driver.current_url == 'http://app.test/get'
+    driver.forward()
+    assert driver.current_url == 'http://app.test/frames'
+
+
+def test_frames_switch_by_name_index_and_element(driver):
+    driver.get('http://app.test/frames')
+    
+    driver.switch_to.frame('inner')
+    assert driver.find_element(By.ID, 'inside').text == 'Inside'
+    driver.switch_to.frame(driver.find_element(By.ID, 'deeper'))
+    assert driver.find_element(By.TAG_NAME, 'b').text == 'Deeper'
+    driver.switch_to.parent_frame()
+    assert driver.find_elements(By.TAG_NAME, 'b') == []
+    driver.switch_to.default_content()
+    driver.switch_to.frame(1)
+    assert driver.find_element(By.ID, 'doc').text == 'Doc'
+    with pytest.raises(NoSuchFrameException):
+        driver.switch_to.frame('missing')
+
+
+def test_cookies_are_kept_per_driver_and_sent_to_routes(driver, requests):
+    driver.get('http://app.test/get')
+    driver.add_cookie({'name': 'sid', 'value': 'abc'})
+    driver.find_element(By.TAG_NAME, 'button').click()
+    
+    assert driver.get_cookie('sid')['domain'] == 'app.test'
+    assert requests[-1].cookies == {'sid': 'abc'}
+    driver.delete_cookie('sid')
+    assert driver.get_cookies() == []
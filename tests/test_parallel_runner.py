@@ -0,0 +1,82 @@
+"""
+End-to-end tests of the parallel runner in utils/parallel_runner.py, with behave
+workers on the fake browser.
+"""
+import json
+import os
+
+from config import config
+from config.settings import PROJECT_DIR
+from utils import parallel_runner
+
+
+FEATURE = """
+Feature: Users
+  Scenario: Plain
+    Then the scenario runs
+  @data_feed:users.csv
+  Scenario Outline: User <name>
+    Given user "<name>"
+    Examples:
+      | name |
+  Scenario: Plain two
+    Then the scenario runs
+"""
+
+ENVIRONMENT = f"""
+import sys
+sys.modules['allure_behave.hooks'] = None  # Allure reporting is not under test
+sys.path.insert(0, {os.path.join(PROJECT_DIR, 'features', 'environment')!r})
+from environment import *
+"""
+
+STEPS = """
+from behave import given, then
+@given('user "{name}"')
+def step_user(context, name):
+    assert context.feed_record == {'name': name}
+@then('the scenario runs')
+def step_runs(context):
+    pass
+"""
+
+
+def write_project(root):
+    """
+    Write a features directory using the project's environment hooks, and its data feed.
+    """
+    (root / 'features' / 'steps').mkdir(parents=True)
+    (root / 'features' / 'users.feature').write_text(FEATURE)
+    (root / 'features' / 'environment.py').write_text(ENVIRONMENT)
+    (root / 'features' / 'steps' / 'steps.py').write_text(STEPS)
+    (root / 'data').mkdir()
+    (root / 'data' / 'users.csv').write_text('name\nu0\nu1\nu2\nu3\n')
+
+
+def test_each_scenario_of_a_feed_feature_runs_once(tmp_path, monkeypatch):
+    write_project(tmp_path)
+    monkeypatch.setenv('PYTHONPATH', PROJECT_DIR)
+    monkeypatch.setenv('BROWSER', 'fake')
+    monkeypatch.setenv('TEST_DATA_DIR', str(tmp_path / 'data'))
+    monkeypatch.setenv('TEST_DATA_CACHE', str(tmp_path / 'test_data.pickle'))
+    monkeypatch.setenv('ARTIFACT_STORE_ENABLED', 'false')
+    
+    with config.override(BASE_REPORT_DIR=str(tmp_path / 'reports')):
+        exit_code = parallel_runner.main([str(tmp_path / 'features'), '--workers', '2'])
+    
+    assert exit_code == 0
+    with open(tmp_path / 'reports' / 'results.json') as results_file:
+        elements = [element for feature in json.load(results_file) for element in feature['elements']]
+    # behave appends the row to the names of generated scenarios
+    names = sorted(element['name'].split(' -- ')[0] for element in elements)
+    assert names == ['Plain', 'Plain two', 'User u0', 'User u1', 'User u2', 'User u3']
+    assert {element['status'] for element in elements} == {'passed'}
+
+
+def test_feed_features_are_not_split_into_locations(tmp_path):
+    write_project(tmp_path)
+    (tmp_path / 'features' / 'plain.feature').write_text('Feature: Plain\n  Scenario: One\n    Then it runs\n')
+    features = str(tmp_path / 'features')
+    
+    assert parallel_runner.collect_work_items([features], 'scenario') == [f'{features}/plain.feature:2']
+    assert parallel_runner.collect_feed_features([features]) == [f'{features}/users.feature']
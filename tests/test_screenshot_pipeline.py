@@ -0,0 +1,63 @@
+"""
+Tests of the screenshot pipeline in utils/screenshot_pipeline.py.
+"""
+import os
+
+from utils import screenshot_pipeline
+from utils.screenshot_pipeline import ScreenshotPipeline
+
+
+def submit(pipeline, png, name, directory):
+    """
+    Submit a screenshot and wait for it, returning its path and the on_written calls.
+    """
+    written = []
+    path = pipeline.submit(png, name, str(directory), lambda *args: written.append(args))
+    pipeline.flush()
+    return path, written
+
+
+def test_duplicates_share_the_file_of_the_first_screenshot(tmp_path):
+    pipeline = ScreenshotPipeline('png', max_width=0, workers=2)
+    
+    first, _ = submit(pipeline, b'frame', 'first', tmp_path)
+    second, written = submit(pipeline, b'frame', 'second', tmp_path)
+    
+    assert second == first
+    assert written == [(first, 0, True)]
+    assert sorted(os.listdir(tmp_path)) == ['first.png', 'index.jsonl']
+
+
+def test_duplicate_of_a_deleted_file_writes_it_again(tmp_path):
+    pipeline = ScreenshotPipeline('png', max_width=0, workers=2)
+    first, _ = submit(pipeline, b'frame', 'first', tmp_path)
+    os.remove(first)
+    
+    second, written = submit(pipeline, b'frame', 'second', tmp_path)
+    
+    assert written == [(second, 5, False)]
+    with open(second, 'rb') as image_file:
+        assert image_file.read() == b'frame'
+
+
+def test_duplicate_of_a_failed_write_writes_it_again(tmp_path, monkeypatch):
+    pipeline = ScreenshotPipeline('png', max_width=0, workers=1)
+    monkeypatch.setattr(pipeline, '_encode', lambda png, image_format: 1 / 0)
+    submit(pipeline, b'frame', 'first', tmp_path)
+    monkeypatch.undo()
+    
+    second, written = submit(pipeline, b'frame', 'second', tmp_path)
+    
+    assert len(pipeline.errors) == 1
+    assert written == [(second, 5, False)]
+    assert os.path.exists(second)
+
+
+def test_remembered_screenshots_are_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(screenshot_pipeline, 'MAX_STORED', 3)
+    pipeline = ScreenshotPipeline('png', max_width=0, workers=2)
+    
+    for index in range(10):
+        submit(pipeline, b'frame %d' % index, f'frame_{index}', tmp_path)
+    
+    assert len(pipeline._stored) == 3
@@ -0,0 +1,23 @@
+"""
+Tests of the session cache in utils/session_cache.py.
+"""
+import os
+import stat
+
+from config import config
+from config.settings import PROJECT_DIR
+from utils.session_cache import SessionCache
+
+
+def test_snapshots_are_kept_private_and_out_of_the_reports(tmp_path):
+    cache = SessionCache(str(tmp_path / 'sessions'))
+    snapshot = {'user_type': 'default_user', 'base_url': 'http://app', 'username': 'alice',
+                'captured_at': 0, 'cookies': [{'name': 'sid', 'value': 'secret'}]}
+    
+    cache.save(snapshot)
+    
+    path = cache._path('default_user', 'http://app', 'alice')
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert stat.S_IMODE(os.stat(tmp_path / 'sessions').st_mode) & 0o077 == 0
+    assert os.path.commonpath([config.SESSION_CACHE_DIR, config.BASE_REPORT_DIR]) != config.BASE_REPORT_DIR
+    assert os.path.commonpath([config.SESSION_CACHE_DIR, PROJECT_DIR]) == PROJECT_DIR
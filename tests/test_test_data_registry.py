@@ -0,0 +1,17 @@
+"""
+Tests of the test data registry in utils/test_data_registry.py.
+"""
+import pytest
+
+from config import config
+from utils import test_data_registry
+
+
+def test_shared_registry_follows_the_configured_directory(tmp_path):
+    (tmp_path / 'shop.json').write_text('{"item": {"price": 3}}')
+    
+    with config.override(TEST_DATA_DIR=str(tmp_path), TEST_DATA_CACHE=str(tmp_path / 'cache.pickle')):
+        assert test_data_registry.test_data_registry.get('shop.item') == {'price': 3}
+    
+    with pytest.raises(test_data_registry.TestDataKeyError):
+        test_data_registry.test_data_registry.get('shop.item')
@@ -0,0 +1,36 @@
+"""
+Tests of the explicit wait engine in utils/waits.py, on the fake driver.
+"""
+import time
+
+import pytest
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+
+from utils.fake_driver import FakeDriver
+from utils.waits import WaitEngine
+
+
+@pytest.fixture
+def engine():
+    driver = FakeDriver()
+    driver.route('/page', '<p id="message">Hello</p>')
+    driver.get('http://app/page')
+    return WaitEngine.for_driver(driver)
+
+
+def test_waits_reuse_the_wait_of_their_timeout(engine):
+    for _ in range(200):
+        engine.wait_for_locator((By.ID, 'message'), 'visible', backend='polling')
+        engine.wait_for_locator((By.ID, 'message'), 'present', timeout=3, backend='polling')
+        engine.wait_for_url_contains('/page', backend='polling')
+    
+    assert set(engine._waits) == {engine.get_wait().timeout, 3}
+
+
+def test_polling_stops_at_the_deadline_of_the_wait(engine):
+    start = time.monotonic()
+    with pytest.raises(TimeoutException, match='within 0.3 seconds'):
+        engine.wait_for_locator((By.ID, 'missing'), timeout=0.3, backend='polling')
+    
+    assert 0.3 <= time.monotonic() - start < 0.6
@@ -0,0 +1,478 @@
+"""
+Index and size budgets for the artifacts written to the reports directory.
+
+Screenshots and command traces are registered in a SQLite index (ARTIFACT_INDEX) with
+their run, worker, feature, scenario, type, size and timestamps, so reports can look
+them up without listing the directories. The index is shared by the parallel workers
+and by later runs, and keeps the reports directory within its budgets:
+
+    ARTIFACT_MAX_AGE_DAYS  artifacts created longer ago are deleted
+    ARTIFACT_MAX_RUN_MB    the least recently used artifacts of a run over it are deleted
+    ARTIFACT_MAX_TOTAL_MB  the least recently used artifacts over it are deleted, those
+                           of earlier runs first
+
+With ARTIFACT_PACK_RUNS, each worker packs the artifacts of its run into a single zip
+archive in archives/ at the end of the run. Packed artifacts stay in the index and are
+read with ArtifactStore.read(). Files that were never registered are not touched.
+
+Usage:
+    python -m utils.artifact_store list --run 20240101_120000 --type screenshot
+    python -m utils.artifact_store gc
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import threading
+import time
+import zipfile
+from contextlib import contextmanager
+
+from config import config
+from utils import run_context
+
+
+# Extensions of formats that are already compressed and stored in archives as they are
+COMPRESSED_EXTENSIONS = ('.png', '.webp', '.jpg', '.jpeg', '.gif', '.zip', '.gz', '.webm', '.mp4')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    path TEXT NOT NULL,
+    archive TEXT,
+    run_id TEXT NOT NULL,
+    worker TEXT,
+    feature TEXT,
+    scenario TEXT,
+    type TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS artifacts_run ON artifacts (run_id, worker);
+CREATE INDEX IF NOT EXISTS artifacts_scenario ON artifacts (scenario);
+CREATE INDEX IF NOT EXISTS artifacts_unit ON artifacts (COALESCE(archive, path));
+"""
+
+# Files are deleted together with the archive they are packed into, so eviction works
+# on units: an unpacked file, or an archive with all its members
+UNIT = 'COALESCE(archive, path)'
+
+
+class ArtifactStore:
+    """
+    SQLite index of report artifacts enforcing size and age budgets.
+    """
+    
+    def __init__(self, index_path=None, root=None, max_total_mb=None, max_run_mb=None, max_age_days=None):
+        """
+        Initialize the artifact store.
+        
+        Args:
+            index_path: Optional SQLite file, defaults to ARTIFACT_INDEX from config
+            root: Directory artifact paths are stored relative to, defaults to BASE_REPORT_DIR
+            max_total_mb: Size budget of all artifacts, 0 for none, defaults to ARTIFACT_MAX_TOTAL_MB
+            max_run_mb: Size budget of each run, 0 for none, defaults to ARTIFACT_MAX_RUN_MB
+            max_age_days: Age at which artifacts are deleted, 0 for none, defaults to ARTIFACT_MAX_AGE_DAYS
+            
+        Budgets and paths not given follow config as it changes, e.g. in config.override().
+        """
+        self._index_path = index_path
+        self._root = root
+        self._max_total_mb = max_total_mb
+        self._max_run_mb = max_run_mb
+        self._max_age_days = max_age_days
+        self._schema_lock = threading.Lock()
+        self._schema_ready = set()
+    
+    @property
+    def index_path(self):
+        """
+        SQLite file of the index.
+        """
+        return self._index_path or config.ARTIFACT_INDEX
+    
+    @property
+    def root(self):
+        """
+        Directory artifact paths are stored relative to.
+        """
+        return self._root or config.BASE_REPORT_DIR
+    
+    @property
+    def max_total_bytes(self):
+        """
+        Size budget of all artifacts in bytes, 0 for none.
+        """
+        max_total_mb = config.ARTIFACT_MAX_TOTAL_MB if self._max_total_mb is None else self._max_total_mb
+        return int(max_total_mb * 1024 * 1024)
+    
+    @property
+    def max_run_bytes(self):
+        """
+        Size budget of each run in bytes, 0 for none.
+        """
+        max_run_mb = config.ARTIFACT_MAX_RUN_MB if self._max_run_mb is None else self._max_run_mb
+        return int(max_run_mb * 1024 * 1024)
+    
+    @property
+    def max_age_days(self):
+        """
+        Age in days at which artifacts are deleted, 0 for none.
+        """
+        return config.ARTIFACT_MAX_AGE_DAYS if self._max_age_days is None else self._max_age_days
+    
+    def add(self, path, artifact_type, size=None, feature=None, scenario=None, run_id=None):
+        """
+        Register a file written to the reports directory, then evict artifacts if a
+        size budget is exceeded.
+        
+        Args:
+            path: Path to the file
+            artifact_type: Type of artifact, e.g. 'screenshot' or 'trace'
+            size: Optional size in bytes, read from the file by default
+            feature: Optional feature name, defaults to the current feature
+            scenario: Optional scenario name, defaults to the current scenario
+            run_id: Optional run id, defaults to RUN_ID from config
+        """
+        if size is None:
+            size = os.path.getsize(path)
+        if feature is None and scenario is None:
+            current = run_context.current()
+            feature, scenario = current['feature'], current['scenario']
+        run_id = run_id or config.RUN_ID
+        now = time.time()
+        
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT INTO artifacts (path, run_id, worker, feature, scenario, type, size, created, "
+                "accessed) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (self._relative(path), run_id, config.WORKER_ID, feature, scenario, artifact_type,
+                 size, now, now),
+            )
+            total, run_total = connection.execute(
+                "SELECT COALESCE(SUM(size), 0), COALESCE(SUM(CASE WHEN run_id = ? THEN size END), 0) "
+                "FROM artifacts",
+                (run_id,),
+            ).fetchone()
+        
+        if (self.max_total_bytes and total > self.max_total_bytes) or \
+                (self.max_run_bytes and run_total > self.max_run_bytes):
+            self.enforce_budgets()
+    
+    def recorder(self, artifact_type):
+        """
+        Get a callback registering a file once the screenshot pipeline wrote it, tagged
+        with the feature and scenario running now.
+        
+        Args:
+            artifact_type: Type of artifact
+            
+        Returns:
+            callable: Callback for ScreenshotPipeline.capture(on_written=...), or None if
+                the artifact store is disabled
+        """
+        if not config.ARTIFACT_STORE_ENABLED:
+            return None
+        current = run_context.current()
+        run_id = config.RUN_ID
+        
+        def record(path, size, duplicate):
+            # Duplicates share the file of the first screenshot and add nothing to the budgets
+            size = 0 if duplicate else size
+            self.add(path, artifact_type, size, current['feature'], current['scenario'], run_id)
+        return record
+    
+    def find(self, run_id=None, feature=None, scenario=None, artifact_type=None, worker=None, touch=True):
+        """
+        Look up artifacts in the index.
+        
+        Args:
+            run_id: Optional run id
+            feature: Optional feature name
+            scenario: Optional scenario name
+            artifact_type: Optional type of artifact
+            worker: Optional worker id
+            touch: Whether to mark the artifacts as used for the least-recently-used eviction
+            
+        Returns:
+            list: Artifact dicts, oldest first. 'archive' is the absolute path of the archive
+                the file is packed into, or None; 'path' is the member name in the archive if
+                packed, the absolute path of the file otherwise
+        """
+        filters = {
+            'run_id': run_id,
+            'feature': feature,
+            'scenario': scenario,
+            'type': artifact_type,
+            'worker': worker,
+        }
+        filters = {column: value for column, value in filters.items() if value is not None}
+        where = ' AND '.join(f"{column} = ?" for column in filters) or '1'
+        
+        with self._connect() as connection:
+            connection.row_factory = sqlite3.Row
+            rows = connection.execute(
+                f"SELECT rowid AS id, * FROM artifacts WHERE {where} ORDER BY created, rowid",
+                tuple(filters.values()),
+            ).fetchall()
+            if touch and rows:
+                connection.execute(
+                    f"UPDATE artifacts SET accessed = ? WHERE {where}", (time.time(), *filters.values())
+                )
+        
+        artifacts = []
+        for row in rows:
+            artifact = dict(row)
+            if artifact['archive']:
+                artifact['archive'] = self._absolute(artifact['archive'])
+            else:
+                artifact['path'] = self._absolute(artifact['path'])
+            artifacts.append(artifact)
+        return artifacts
+    
+    def read(self, artifact):
+        """
+        Read an artifact, from its archive if it was packed.
+        
+        Args:
+            artifact (dict): Artifact as returned by find()
+            
+        Returns:
+            bytes: Content of the artifact
+        """
+        if artifact['archive']:
+            with zipfile.ZipFile(artifact['archive']) as archive:
+                return archive.read(artifact['path'])
+        with open(artifact['path'], 'rb') as artifact_file:
+            return artifact_file.read()
+    
+    def enforce_budgets(self, current_run=None):
+        """
+        Delete artifacts that are too old, then the least recently used ones of runs
+        over the run budget and of all runs over the total budget.
+        
+        Args:
+            current_run: Optional run evicted last for the total budget, defaults to RUN_ID
+            
+        Returns:
+            int: Number of bytes freed
+        """
+        current_run = current_run or config.RUN_ID
+        freed = 0
+        with self._connect() as connection:
+            # One worker evicts at a time, so the budgets are not enforced twice
+            connection.execute("BEGIN IMMEDIATE")
+            units = connection.execute(
+                f"SELECT {UNIT}, run_id, SUM(size), MAX(created), MAX(accessed) FROM artifacts "
+                f"GROUP BY {UNIT} ORDER BY run_id = ?, MAX(accessed)",
+                (current_run,),
+            ).fetchall()
+            
+            evicted = set()
+            if self.max_age_days:
+                cutoff = time.time() - self.max_age_days * 86400
+                evicted.update(unit for unit, _, _, created, _ in units if created < cutoff)
+            
+            if self.max_run_bytes:
+                run_totals = {}
+                for unit, run_id, size, _, _ in units:
+                    if unit not in evicted:
+                        run_totals[run_id] = run_totals.get(run_id, 0) + size
+                for unit, run_id, size, _, _ in sorted(units, key=lambda row: row[4]):
+                    if unit not in evicted and run_totals[run_id] > self.max_run_bytes:
+                        evicted.add(unit)
+                        run_totals[run_id] -= size
+            
+            if self.max_total_bytes:
+                total = sum(size for unit, _, size, _, _ in units if unit not in evicted)
+                for unit, _, size, _, _ in units:
+                    if total <= self.max_total_bytes:
+                        break
+                    if unit not in evicted:
+                        evicted.add(unit)
+                        total -= size
+            
+            for unit, _, size, _, _ in units:
+                if unit in evicted:
+                    self._remove(unit)
+                    freed += size
+            connection.executemany(f"DELETE FROM artifacts WHERE {UNIT} = ?", [(unit,) for unit in evicted])
+        return freed
+    
+    def pack_run(self, run_id=None, worker=None):
+        """
+        Pack the unpacked artifacts of a run into a zip archive and delete the files.
+        
+        Args:
+            run_id: Optional run id, defaults to RUN_ID from config
+            worker: Optional worker id, defaults to WORKER_ID from config
+            
+        Returns:
+            str: Path to the archive, or None if there was nothing to pack
+        """
+        run_id = run_id or config.RUN_ID
+        worker = worker or config.WORKER_ID
+        name = f"{run_id}_worker_{worker}.zip" if worker else f"{run_id}.zip"
+        archive_path = os.path.join('archives', name)
+        
+        with self._connect() as connection:
+            paths = [row[0] for row in connection.execute(
+                "SELECT DISTINCT path FROM artifacts WHERE run_id = ? AND worker IS ? AND archive IS NULL",
+                (run_id, worker),
+            )]
+            if not paths:
+                return None
+            
+            os.makedirs(os.path.dirname(self._absolute(archive_path)), exist_ok=True)
+            packed = {}
+            with zipfile.ZipFile(self._absolute(archive_path), 'a') as archive:
+                for path in paths:
+                    source = self._absolute(path)
+                    # Files outside the root stay where they are
+                    if os.path.isabs(path) or not os.path.exists(source):
+                        continue
+                    compression = zipfile.ZIP_STORED if path.lower().endswith(COMPRESSED_EXTENSIONS) \
+                        else zipfile.ZIP_DEFLATED
+                    archive.write(source, path, compression)
+                    packed[path] = archive.getinfo(path).compress_size
+            
+            for path in paths:
+                if os.path.isabs(path):
+                    continue
+                if path not in packed:
+                    # Deleted outside the store
+                    connection.execute("DELETE FROM artifacts WHERE path = ? AND archive IS NULL", (path,))
+                    continue
+                # Duplicates keep a size of 0, so the archive is counted once
+                connection.execute(
+                    "UPDATE artifacts SET archive = ?, size = CASE WHEN size > 0 THEN ? ELSE 0 END "
+                    "WHERE path = ? AND archive IS NULL",
+                    (archive_path, packed[path], path),
+                )
+        
+        for path in packed:
+            self._remove(path)
+        return self._absolute(archive_path)
+    
+    def usage(self):
+        """
+        Get the size of the indexed artifacts per run.
+        
+        Returns:
+            dict: Run id to a dict with the number of artifacts and their size in bytes
+        """
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT run_id, COUNT(*), SUM(size) FROM artifacts GROUP BY run_id ORDER BY run_id"
+            ).fetchall()
+        return {run_id: {'artifacts': count, 'bytes': size} for run_id, count, size in rows}
+    
+    @contextmanager
+    def _connect(self):
+        """
+        Open a connection to the index, creating it on first use. Each call gets its own
+        connection, so writer threads and worker processes can use the store concurrently.
+        
+        Yields:
+            sqlite3.Connection: Connection committed and closed when the block exits
+        """
+        index_path = os.path.abspath(self.index_path)
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        connection = sqlite3.connect(index_path, timeout=30)
+        try:
+            if index_path not in self._schema_ready:
+                with self._schema_lock:
+                    if index_path not in self._schema_ready:
+                        # WAL lets readers look up artifacts while another worker writes
+                        connection.execute("PRAGMA journal_mode=WAL")
+                        connection.executescript(SCHEMA)
+                        self._schema_ready.add(index_path)
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+    
+    def _remove(self, unit):
+        """
+        Delete the file of an evicted unit.
+        
+        Args:
+            unit: Path of a file or archive, relative to the root
+        """
+        try:
+            os.remove(self._absolute(unit))
+        except FileNotFoundError:
+            pass
+    
+    def _relative(self, path):
+        """
+        Path stored in the index: relative to the root if inside it, absolute otherwise.
+        """
+        path = os.path.abspath(path)
+        relative = os.path.relpath(path, os.path.abspath(self.root))
+        return path if relative.startswith(os.pardir) else relative
+    
+    def _absolute(self, path):
+        """
+        Absolute path of a path stored in the index.
+        """
+        return os.path.join(self.root, path)
+
+
+artifact_store = ArtifactStore()
+
+
+def main(argv=None):
+    """
+    Command line entry point of the artifact store.
+    
+    Args:
+        argv: Optional command line arguments, defaults to sys.argv
+        
+    Returns:
+        int: Exit code
+    """
+    parser = argparse.ArgumentParser(
+        description='List, evict and pack the artifacts in the reports directory.'
+    )
+    parser.add_argument('command', choices=['list', 'usage', 'gc', 'pack'],
+                        help='list artifacts, show the size per run, enforce the budgets or pack a run')
+    parser.add_argument('--run', help='Run to list or pack (default for pack: the latest run)')
+    parser.add_argument('--scenario', help='Scenario to list')
+    parser.add_argument('--type', help='Type of artifact to list, e.g. screenshot or trace')
+    args = parser.parse_args(argv)
+    
+    if not os.path.exists(artifact_store.index_path):
+        print("No artifact index found")
+        return 1
+    
+    if args.command == 'list':
+        artifacts = artifact_store.find(args.run, None, args.scenario, args.type, touch=False)
+        for artifact in artifacts:
+            location = artifact['path']
+            if artifact['archive']:
+                location = f"{artifact['archive']}:{location}"
+            print(f"{artifact['run_id']}  {artifact['type']:<10} {artifact['size']:>10}  "
+                  f"{artifact['scenario'] or '-'}  {location}")
+    elif args.command == 'usage':
+        for run_id, usage in artifact_store.usage().items():
+            print(f"{run_id}  {usage['artifacts']:>6} artifact(s)  {usage['bytes'] / 1024 / 1024:>9.1f} MB")
+    elif args.command == 'gc':
+        freed = artifact_store.enforce_budgets()
+        print(f"Freed {freed / 1024 / 1024:.1f} MB")
+    else:
+        run_ids = list(artifact_store.usage())
+        run_id = args.run or (run_ids[-1] if run_ids else None)
+        if run_id is None:
+            print("No artifacts to pack")
+            return 1
+        workers = {artifact['worker'] for artifact in artifact_store.find(run_id, touch=False)}
+        for worker in sorted(workers, key=str):
+            archive = artifact_store.pack_run(run_id, worker)
+            if archive:
+                print(f"Packed {run_id} into {archive}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
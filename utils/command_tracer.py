@@ -0,0 +1,240 @@
+"""
+Wire-level tracing of the WebDriver commands sent by a scenario.
+"""
+import itertools
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+
+from config import config
+from utils import run_context
+from utils.stats import summarize
+
+
+# Command parameters that can hold typed text, secrets or script arguments, including
+# the key sequences of performActions
+REDACTED_PARAMS = {'text', 'value', 'args', 'cookie', 'password', 'actions'}
+
+# Commands whose 'value' parameter is a locator, which is kept in the trace
+FIND_COMMANDS = {'findElement', 'findElements', 'findChildElement', 'findChildElements'}
+
+# Longer string parameters (e.g. scripts) are truncated in the trace
+MAX_PARAM_LENGTH = 120
+
+
+class CommandTracer:
+    """
+    Records every command sent through a driver's command executor.
+    
+    Each command is recorded with its name, redacted parameters, latency, result size
+    and the feature, scenario and step it was sent from. Records are written to one
+    trace file per scenario, and aggregated into a run summary.
+    """
+    
+    def __init__(self):
+        """
+        Initialize the tracer.
+        """
+        self._records = []
+        self._durations = defaultdict(list)
+        self._step_counts = defaultdict(int)
+        self._lock = threading.Lock()
+    
+    def install(self, driver):
+        """
+        Wrap the command executor of a driver so its commands are traced.
+        
+        Args:
+            driver: WebDriver instance
+            
+        Returns:
+            WebDriver: The same driver
+        """
+        executor = getattr(driver, 'command_executor', None)
+        if executor is None or getattr(executor, 'command_tracer', None) is self:
+            return driver
+        
+        execute = executor.execute
+        
+        def traced_execute(command, params):
+            start = time.perf_counter()
+            response, error = None, None
+            try:
+                response = execute(command, params)
+                return response
+            except Exception as exception:
+                error = type(exception).__name__
+                raise
+            finally:
+                self.record(command, params, time.perf_counter() - start, response, error)
+        
+        executor.execute = traced_execute
+        executor.command_tracer = self
+        return driver
+    
+    def record(self, command, params, duration, response=None, error=None):
+        """
+        Record a command.
+        
+        Args:
+            command: WebDriver command name, e.g. findElement
+            params: Command parameters
+            duration: Latency in seconds
+            response: Optional response of the command
+            error: Optional name of the exception raised by the command
+        """
+        context = run_context.current()
+        record = {
+            'command': command,
+            'ms': round(duration * 1000, 3),
+            'bytes': self._result_size(response),
+            'step': context['step'],
+            'params': self._redact(command, params),
+        }
+        if error:
+            record['error'] = error
+        
+        with self._lock:
+            self._records.append((context['feature'], context['scenario'], record))
+            self._durations[command].append(record['ms'])
+            if context['step']:
+                self._step_counts[(context['feature'], context['scenario'], context['step'])] += 1
+    
+    def write_scenario_trace(self, feature, scenario):
+        """
+        Write the commands the scenario sent since the last call to a new trace file.
+        Commands sent outside the scenario, e.g. by prelauncher or teardown threads, are
+        left out of the trace.
+        
+        Args:
+            feature: Feature name
+            scenario: Scenario name
+            
+        Returns:
+            str: Path to the trace file, or None if no commands were recorded
+        """
+        with self._lock:
+            records, self._records = self._records, []
+        records = [record for (record_feature, record_scenario, record) in records
+                   if (record_feature, record_scenario) == (feature, scenario)]
+        if not records:
+            return None
+        
+        trace_dir = os.path.join(config.REPORT_DIR, 'traces', config.RUN_ID)
+        os.makedirs(trace_dir, exist_ok=True)
+        name = f"{self._file_name(feature)}__{self._file_name(scenario)}"
+        
+        # Scenarios with the same name and retried scenarios get numbered files
+        for number in itertools.count(1):
+            path = os.path.join(trace_dir, f"{name}.jsonl" if number == 1 else f"{name}__{number}.jsonl")
+            try:
+                trace_file = open(path, 'x')
+                break
+            except FileExistsError:
+                continue
+        
+        with trace_file:
+            trace_file.write(json.dumps({'feature': feature, 'scenario': scenario, 'commands': len(records)}) + '\n')
+            for record in records:
+                trace_file.write(json.dumps(record, separators=(',', ':'), default=str) + '\n')
+        return path
+    
+    def summary(self, top=10):
+        """
+        Aggregate the commands recorded during the run.
+        
+        Args:
+            top: Number of entries in each top list
+            
+        Returns:
+            dict: Latency per command, the slowest and most frequent commands,
+                and the steps sending the most commands
+        """
+        with self._lock:
+            commands = {command: summarize(durations) for command, durations in self._durations.items()}
+            step_counts = sorted(self._step_counts.items(), key=lambda item: item[1], reverse=True)
+        
+        return {
+            'commands': commands,
+            'slowest_commands': sorted(commands, key=lambda command: commands[command]['p95'], reverse=True)[:top],
+            'most_frequent_commands': sorted(commands, key=lambda command: commands[command]['count'], reverse=True)[:top],
+            'busiest_steps': [
+                {'feature': feature, 'scenario': scenario, 'step': step, 'commands': count}
+                for (feature, scenario, step), count in step_counts[:top]
+            ],
+        }
+    
+    def write_summary(self, path=None, top=10):
+        """
+        Write the run summary as JSON.
+        
+        Args:
+            path: Optional output path, defaults to command_trace_summary_<RUN_ID>.json in REPORT_DIR
+            top: Number of entries in each top list
+            
+        Returns:
+            str: Path to the summary
+        """
+        path = path or os.path.join(config.REPORT_DIR, f"command_trace_summary_{config.RUN_ID}.json")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as summary_file:
+            json.dump(self.summary(top), summary_file, indent=2)
+        return path
+    
+    @staticmethod
+    def _redact(command, params):
+        """
+        Redact sensitive parameters and truncate long ones.
+        
+        Args:
+            command: WebDriver command name
+            params: Command parameters
+            
+        Returns:
+            dict: Parameters that are safe to write to a trace
+        """
+        redacted = {}
+        for name, value in (params or {}).items():
+            if name == 'sessionId':
+                continue
+            if name in REDACTED_PARAMS and not (name == 'value' and command in FIND_COMMANDS):
+                value = '<redacted>'
+            elif isinstance(value, str) and len(value) > MAX_PARAM_LENGTH:
+                value = f"{value[:MAX_PARAM_LENGTH]}... ({len(value)} chars)"
+            redacted[name] = value
+        return redacted
+    
+    @staticmethod
+    def _result_size(response):
+        """
+        Get the size of a command result.
+        
+        Args:
+            response: Response of the command
+            
+        Returns:
+            int: Size of the serialized result value in bytes
+        """
+        if not isinstance(response, dict) or response.get('value') is None:
+            return 0
+        return len(json.dumps(response['value'], default=str))
+    
+    @staticmethod
+    def _file_name(name):
+        """
+        Turn a feature or scenario name into a file name.
+        
+        Args:
+            name: Feature or scenario name
+            
+        Returns:
+            str: Lowercase name with unsafe characters replaced
+        """
+        return re.sub(r'[^a-z0-9_-]+', '_', (name or 'unnamed').lower()).strip('_')[:80]
+
+
+# Tracer shared by every driver of the run, installed by DriverFactory when COMMAND_TRACE_ENABLED is set
+tracer = CommandTracer()
@@ -0,0 +1,243 @@
+"""
+Seedable generator of unique test data.
+
+The factory generates users, products and registration forms shaped like USER_DATA,
+PRODUCT_DATA and FORM_DATA in config/test_data.py, one at a time or in batches:
+
+    user = data_factory.user(age=15)
+    products = data_factory.products(10000)
+
+Random text is cut from one byte buffer per batch (rejection sampled and mapped to the
+alphabet with bytes.translate), drawn from a Random seeded with DATA_FACTORY_SEED and
+the scenario.
+
+Values that must be unique (usernames, emails, product names and form addresses)
+contain a token made of a hash of the run, the worker, a namespace derived from the
+seed and a counter. Workers never share a token, and scenarios have different seeds,
+so the tokens are unique across parallel workers without a shared lock. A seed used
+again in the same process, e.g. by a retried scenario, gets a new namespace.
+
+Nothing depends on the scenarios that ran before, so a failed scenario generates the
+same data when run alone with the DATA_FACTORY_SEED, RUN_ID and WORKER_ID printed on
+failure.
+"""
+import collections
+import functools
+import hashlib
+import itertools
+import random
+import string
+
+from config import config
+
+
+LOWERCASE = string.ascii_lowercase
+ALPHANUMERIC = string.ascii_letters + string.digits
+
+COUNTRIES = (
+    'Germany', 'France', 'Spain', 'Italy', 'Netherlands', 'United Kingdom', 'United States', 'Canada',
+)
+STREET_SUFFIXES = ('Street', 'Avenue', 'Road', 'Lane', 'Way')
+
+# Number of times each seed was used in this process
+_seed_uses = collections.Counter()
+
+
+@functools.lru_cache(maxsize=None)
+def _translation(alphabet):
+    """
+    Get the bytes.translate() table mapping random bytes to an alphabet, and the bytes
+    to drop so that every character is equally likely.
+    """
+    size = len(alphabet)
+    limit = 256 - 256 % size
+    table = bytes(ord(alphabet[byte % size]) if byte < limit else 0 for byte in range(256))
+    return table, bytes(range(limit, 256))
+
+
+class DataFactory:
+    """
+    Generator of random, unique and reproducible test data.
+    """
+    
+    def __init__(self, seed=None, namespace=None):
+        """
+        Initialize the factory.
+        
+        Args:
+            seed: Optional seed, defaults to DATA_FACTORY_SEED from config
+            namespace: Optional namespace of the unique tokens, defaults to one derived
+                from the seed
+        """
+        self.reseed(seed, namespace)
+    
+    def reseed(self, seed=None, namespace=None):
+        """
+        Start generating from a new seed, in the namespace of unique tokens of the seed.
+        
+        Args:
+            seed: Optional seed, defaults to DATA_FACTORY_SEED from config
+            namespace: Optional namespace of the unique tokens, defaults to one derived
+                from the seed, e.g. the scenario
+        """
+        self.seed = str(config.DATA_FACTORY_SEED if seed is None else seed)
+        if namespace is None:
+            namespace = hashlib.blake2b(self.seed.encode('utf-8'), digest_size=6).hexdigest()
+            uses = _seed_uses[self.seed]
+            _seed_uses[self.seed] += 1
+            if uses:
+                namespace = f"{namespace}r{uses:x}"
+        self.namespace = str(namespace)
+        self._random = random.Random(self.seed)
+        self._counter = itertools.count()
+        run_hash = hashlib.blake2b(config.RUN_ID.encode('utf-8'), digest_size=4).hexdigest()
+        self._token_prefix = f"{run_hash}{config.WORKER_ID or 0}x{self.namespace}x"
+    
+    def unique_tokens(self, count):
+        """
+        Get tokens no other factory of the run generates.
+        
+        Args:
+            count: Number of tokens
+            
+        Returns:
+            list: Tokens of lowercase letters and digits
+        """
+        return [f"{self._token_prefix}{next(self._counter):x}" for _ in range(count)]
+    
+    def text(self, length, alphabet=ALPHANUMERIC):
+        """
+        Generate random text.
+        
+        Args:
+            length: Number of characters
+            alphabet: Latin-1 characters to choose from, at most 256
+            
+        Returns:
+            str: Random text
+        """
+        if not length:
+            return ''
+        table, rejected = _translation(alphabet)
+        chunks = []
+        missing = length
+        while missing > 0:
+            chunk = self._random.randbytes(missing + missing // 8 + 16).translate(table, rejected)
+            chunks.append(chunk)
+            missing -= len(chunk)
+        return b''.join(chunks)[:length].decode('latin-1')
+    
+    def texts(self, count, length, alphabet=ALPHANUMERIC):
+        """
+        Generate a batch of random texts from one buffer.
+        
+        Args:
+            count: Number of texts
+            length: Number of characters of each text
+            alphabet: Characters to choose from
+            
+        Returns:
+            list: Random texts
+        """
+        text = self.text(count * length, alphabet)
+        return [text[index:index + length] for index in range(0, count * length, length)]
+    
+    def user(self, **fields):
+        """
+        Generate a user like USER_DATA. Fields given as arguments are used as they are.
+        """
+        return self.users(1, **fields)[0]
+    
+    def users(self, count, **fields):
+        """
+        Generate users like USER_DATA, with unique usernames and emails.
+        
+        Args:
+            count: Number of users
+            **fields: Values used for every user, e.g. age=15
+            
+        Returns:
+            list: User records
+        """
+        names = self.texts(count, 6, LOWERCASE)
+        passwords = self.texts(count, 12)
+        users = []
+        for name, password, token in zip(names, passwords, self.unique_tokens(count)):
+            username = f"{name}_{token}"
+            users.append({
+                'username': username,
+                'password': password,
+                'email': f"{username}@example.com",
+                'age': self._random.randint(18, 80),
+                **fields,
+            })
+        return users
+    
+    def product(self, **fields):
+        """
+        Generate a product like PRODUCT_DATA. Fields given as arguments are used as they are.
+        """
+        return self.products(1, **fields)[0]
+    
+    def products(self, count, **fields):
+        """
+        Generate products like PRODUCT_DATA, with unique names.
+        
+        Args:
+            count: Number of products
+            **fields: Values used for every product, e.g. quantity=1
+            
+        Returns:
+            list: Product records
+        """
+        names = self.texts(count, 8, LOWERCASE)
+        return [
+            {
+                'name': f"Product {name.capitalize()} {token}",
+                'price': self._random.randrange(100, 100000) / 100,
+                'quantity': self._random.randint(1, 10),
+                **fields,
+            }
+            for name, token in zip(names, self.unique_tokens(count))
+        ]
+    
+    def form(self, **fields):
+        """
+        Generate a registration form like FORM_DATA. Fields given as arguments are used as they are.
+        """
+        return self.forms(1, **fields)[0]
+    
+    def forms(self, count, **fields):
+        """
+        Generate registration forms like FORM_DATA, with unique addresses.
+        
+        Args:
+            count: Number of forms
+            **fields: Values used for every form, e.g. country='Germany'
+            
+        Returns:
+            list: Form records
+        """
+        words = self.texts(count * 4, 7, LOWERCASE)
+        phones = self.texts(count, 10, string.digits)
+        zip_codes = self.texts(count, 5, string.digits)
+        forms = []
+        for index, token in enumerate(self.unique_tokens(count)):
+            first_name, last_name, street, city = (
+                word.capitalize() for word in words[index * 4:index * 4 + 4]
+            )
+            forms.append({
+                'first_name': first_name,
+                'last_name': last_name,
+                'phone': phones[index],
+                'address': f"{self._random.randint(1, 9999)} {street} "
+                           f"{self._random.choice(STREET_SUFFIXES)}, Unit {token}",
+                'city': city,
+                'zip_code': zip_codes[index],
+                'country': self._random.choice(COUNTRIES),
+                **fields,
+            })
+        return forms
+
+
+data_factory = DataFactory()
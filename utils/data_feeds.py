@@ -0,0 +1,423 @@
+"""
+Streaming data feeds for data-driven scenarios.
+
+A feed reads records one at a time from a CSV or JSONL file, so large data sets are
+never loaded into memory. Feeds can be filtered, sampled, limited and sharded:
+
+    feed = DataFeed('feeds/users.csv').where(country='DE').sample(0.01).limit(100)
+    for record in feed.shard(worker_index, worker_count):
+        ...
+
+Shards are byte ranges of the file: each worker seeks to its own range and only reads
+the lines starting in it, so records must not contain line breaks. Sampling hashes
+the raw line with the seed, so the same records are picked whatever the number of
+workers, and lines that are not picked are never parsed.
+
+Scenario Outlines tagged @data_feed:<name> run once per record of the feed named in
+config/data_feeds.py (or of the file <name> in TEST_DATA_DIR). Before the feature
+runs, the Examples table without rows gets a row per record of the worker's shard,
+with the table headings as field paths (e.g. 'address.city') read with
+get_nested_value(). The whole record is available in the steps as context.feed_record,
+and its fields with parse_test_data('address.city', context.feed_record). Steps can
+also stream a feed themselves, e.g. parse_test_data('feed.adult_users').
+
+behave resolves file:line locations before the Examples are filled, when a feed
+outline has no scenarios yet, so feed outlines are selected by name (behave --name)
+rather than by location. The parallel runner gives features with feed outlines to
+every worker, which runs its shard of the feeds and its share of the other scenarios.
+
+The file is streamed, but behave builds every scenario of an outline up front and
+keeps its results until the end of the run, so the rows of the worker's shard are
+held in memory. An outline with more than DATA_FEED_MAX_ROWS rows per worker fails;
+use 'limit' or 'sample' to run a subset of a large data set:
+
+    @data_feed:adult_users
+    Scenario Outline: Log in as <username>
+      When I log in as "<username>" with "<password>"
+      Then I should see "<address.city>" on the profile page
+
+      Examples:
+        | username | password | address.city |
+"""
+import csv
+import hashlib
+import json
+import os
+
+from behave.model import Row, ScenarioOutline
+
+from config import config
+from config.data_feeds import DATA_FEEDS
+from utils.helpers import get_nested_value
+from utils.test_data_registry import TestDataError, TestDataKeyError
+
+
+# File extension to feed format
+FEED_FORMATS = {
+    '.csv': 'csv',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+}
+
+FEED_TAG_PREFIX = 'data_feed:'
+
+
+class DataFeed:
+    """
+    Lazily read, filtered, sampled and sharded records of a CSV or JSONL file.
+    
+    The selection methods return a new feed, so a feed can be refined step by step.
+    """
+    
+    def __init__(self, path, feed_format=None):
+        """
+        Initialize the feed.
+        
+        Args:
+            path: CSV or JSONL file, relative paths are looked up in TEST_DATA_DIR
+            feed_format: Optional 'csv' or 'jsonl', defaults to the format of the file extension
+        """
+        if not os.path.isabs(path) and not os.path.exists(path):
+            path = os.path.join(config.TEST_DATA_DIR, path)
+        self.path = path
+        self.feed_format = feed_format or FEED_FORMATS.get(os.path.splitext(path)[1].lower())
+        if self.feed_format not in FEED_FORMATS.values():
+            raise ValueError(f"Unsupported data feed format: {path}")
+        
+        self.predicates = []
+        self.rate = None
+        self.seed = 0
+        self.shard_index, self.shard_count = 0, 1
+        self.max_records = None
+    
+    def filter(self, predicate):
+        """
+        Keep the records a predicate accepts.
+        
+        Args:
+            predicate: Callable taking a record and returning True to keep it
+            
+        Returns:
+            DataFeed: New feed
+        """
+        return self._copy(predicates=self.predicates + [predicate])
+    
+    def where(self, **fields):
+        """
+        Keep the records whose fields have the given values. CSV values are strings, so
+        values are also compared as strings.
+        
+        Args:
+            **fields: Field paths (dots written as '__', e.g. address__city) and values
+            
+        Returns:
+            DataFeed: New feed
+        """
+        expected = {path.replace('__', '.'): value for path, value in fields.items()}
+        
+        def matches(record):
+            for path, value in expected.items():
+                actual = get_nested_value(record, path)
+                if actual != value and str(actual) != str(value):
+                    return False
+            return True
+        return self.filter(matches)
+    
+    def sample(self, rate, seed=0):
+        """
+        Keep a deterministic sample of the records.
+        
+        Args:
+            rate: Share of records to keep, between 0 and 1
+            seed: Seed picking a different sample
+            
+        Returns:
+            DataFeed: New feed
+        """
+        if not 0 <= rate <= 1:
+            raise ValueError(f"Sample rate must be between 0 and 1: {rate}")
+        return self._copy(rate=rate, seed=seed)
+    
+    def shard(self, index, count):
+        """
+        Keep only the records of one shard of the file.
+        
+        Args:
+            index: Shard index, from 0 to count - 1
+            count: Number of shards
+            
+        Returns:
+            DataFeed: New feed
+        """
+        if not 0 <= index < count:
+            raise ValueError(f"Invalid shard {index} of {count}")
+        return self._copy(shard_index=index, shard_count=count)
+    
+    def limit(self, count):
+        """
+        Stop after a number of records, counted after filtering and within the shard.
+        
+        Args:
+            count: Maximum number of records
+            
+        Returns:
+            DataFeed: New feed
+        """
+        return self._copy(max_records=count)
+    
+    def __iter__(self):
+        """
+        Read the selected records.
+        
+        Yields:
+            dict: Record, with string values for CSV files
+        """
+        if self.max_records == 0:
+            return
+        returned = 0
+        for record in self._records():
+            if all(predicate(record) for predicate in self.predicates):
+                yield record
+                returned += 1
+                if self.max_records is not None and returned >= self.max_records:
+                    return
+    
+    def _records(self):
+        """
+        Parse the sampled lines of the shard.
+        
+        Yields:
+            dict: Record
+        """
+        with open(self.path, 'rb') as feed_file:
+            if self.feed_format == 'csv':
+                header = feed_file.readline().decode('utf-8-sig')
+                fieldnames = next(csv.reader([header]), [])
+                data_start = feed_file.tell()
+                lines = (line.decode('utf-8') for line in self._lines(feed_file, data_start))
+                for values in csv.reader(lines):
+                    if values:
+                        yield dict(zip(fieldnames, values))
+            else:
+                for line in self._lines(feed_file, 0):
+                    if line.strip():
+                        yield json.loads(line)
+    
+    def _lines(self, feed_file, data_start):
+        """
+        Read the sampled lines starting in the byte range of the shard.
+        
+        Args:
+            feed_file: File opened in binary mode
+            data_start: Offset of the first record, after the CSV header
+            
+        Yields:
+            bytes: Line
+        """
+        size = os.fstat(feed_file.fileno()).st_size
+        span = size - data_start
+        start = data_start + span * self.shard_index // self.shard_count
+        end = data_start + span * (self.shard_index + 1) // self.shard_count
+        
+        position = start
+        feed_file.seek(start)
+        if start > data_start:
+            # The line running into the range belongs to the previous shard
+            feed_file.seek(start - 1)
+            position = start - 1 + len(feed_file.readline())
+        
+        key = str(self.seed).encode('utf-8')
+        threshold = None if self.rate is None else int(self.rate * 2 ** 64)
+        while position < end:
+            line = feed_file.readline()
+            if not line:
+                return
+            position += len(line)
+            if threshold is not None:
+                digest = hashlib.blake2b(line.rstrip(b'\r\n'), digest_size=8, key=key).digest()
+                if int.from_bytes(digest, 'big') >= threshold:
+                    continue
+            yield line
+    
+    def _copy(self, **changes):
+        feed = DataFeed.__new__(DataFeed)
+        feed.__dict__.update(self.__dict__)
+        feed.__dict__.update(changes)
+        return feed
+
+
+def get_feed(name, worker_index=None, worker_count=None):
+    """
+    Get a feed defined in config/data_feeds.py, or a feed of the file <name> in
+    TEST_DATA_DIR, sharded over the parallel workers.
+    
+    Args:
+        name: Feed name or file name
+        worker_index: Optional shard index, defaults to WORKER_ID from config
+        worker_count: Optional number of shards, defaults to WORKER_COUNT from config
+        
+    Returns:
+        DataFeed: Feed of the worker's shard
+        
+    Raises:
+        TestDataKeyError: If there is no feed or file with that name
+    """
+    definition = DATA_FEEDS.get(name)
+    if definition is None:
+        if os.path.splitext(name)[1].lower() not in FEED_FORMATS or \
+                not os.path.exists(os.path.join(config.TEST_DATA_DIR, name)):
+            raise TestDataKeyError(f"Unknown data feed: {name}")
+        definition = {'path': name}
+    
+    feed = DataFeed(definition['path'], definition.get('format'))
+    if definition.get('where'):
+        feed = feed.where(**definition['where'])
+    if definition.get('filter'):
+        feed = feed.filter(definition['filter'])
+    if definition.get('sample') is not None:
+        feed = feed.sample(definition['sample'], definition.get('seed', 0))
+    if definition.get('shard', True):
+        if worker_index is None:
+            worker_index = int(config.WORKER_ID or 0)
+        feed = feed.shard(worker_index, worker_count or config.WORKER_COUNT)
+    if definition.get('limit') is not None:
+        feed = feed.limit(definition['limit'])
+    return feed
+
+
+def get_feed_name(scenario):
+    """
+    Get the feed a scenario is tagged with.
+    
+    Args:
+        scenario: Behave scenario or scenario outline
+        
+    Returns:
+        str: Feed name, or None if the scenario is not tagged with @data_feed:<name>
+    """
+    for tag in scenario.tags:
+        if tag.startswith(FEED_TAG_PREFIX):
+            return tag[len(FEED_TAG_PREFIX):]
+    return None
+
+
+def expand_feature(feature):
+    """
+    Fill the Examples table without rows of the feature's @data_feed outlines with
+    the records of the worker's shard of their feeds.
+    
+    The parallel runner gives a feature with @data_feed outlines to every worker, so
+    the other scenarios of the feature are distributed round-robin over the workers,
+    and each worker removes the scenarios of the others.
+    
+    Args:
+        feature: Behave feature
+        
+    Returns:
+        int: Number of rows added
+    """
+    added = 0
+    has_feeds = False
+    for scenario in feature.walk_scenarios(with_outlines=True):
+        name = get_feed_name(scenario)
+        if isinstance(scenario, ScenarioOutline) and name:
+            has_feeds = True
+            added += expand_outline(scenario, get_feed(name))
+    if has_feeds:
+        _keep_worker_scenarios(feature)
+    return added
+
+
+def _keep_worker_scenarios(feature):
+    """
+    Remove the scenarios of a feature that run on other workers, all but the
+    @data_feed outlines and every WORKER_COUNT-th other scenario.
+    """
+    if getattr(feature, 'worker_scenarios_kept', False):
+        return
+    worker_index = int(config.WORKER_ID or 0)
+    kept = []
+    others = 0
+    for scenario in feature.scenarios:
+        if isinstance(scenario, ScenarioOutline) and get_feed_name(scenario):
+            kept.append(scenario)
+            continue
+        if others % config.WORKER_COUNT == worker_index:
+            kept.append(scenario)
+        others += 1
+    feature.scenarios = kept
+    feature.worker_scenarios_kept = True
+
+
+def expand_outline(outline, feed, max_rows=None):
+    """
+    Fill the Examples table without rows of a scenario outline with a row per record.
+    Examples tables with rows are left as they are.
+    
+    Args:
+        outline: Behave scenario outline
+        feed: Records to add
+        max_rows: Optional maximum number of rows, defaults to DATA_FEED_MAX_ROWS from config
+        
+    Returns:
+        int: Number of rows added
+        
+    Raises:
+        TestDataError: If the outline has several Examples tables without rows, or the feed
+            has more records than max_rows
+    """
+    tables = [
+        example.table for example in outline.examples
+        if example.table is not None and not example.table.rows
+    ]
+    if not tables:
+        return 0
+    if len(tables) > 1:
+        # Each table would run every record again
+        raise TestDataError(
+            f"Data feed outline '{outline.name}' has {len(tables)} Examples tables without rows, "
+            f"the feed fills only one"
+        )
+    
+    table = tables[0]
+    max_rows = max_rows or config.DATA_FEED_MAX_ROWS
+    for record in feed:
+        if len(table.rows) >= max_rows:
+            raise TestDataError(
+                f"Data feed of '{outline.name}' has more than {max_rows} records for this worker, "
+                f"select fewer with 'limit' or 'sample' or raise DATA_FEED_MAX_ROWS"
+            )
+        row = Row(table.headings, [_cell(get_nested_value(record, path)) for path in table.headings],
+                  table.line + len(table.rows) + 1)
+        row.feed_record = record
+        table.rows.append(row)
+    table.modified = True
+    
+    # Rebuild the scenarios of the outline from the filled table
+    outline._scenarios = []
+    return len(table.rows)
+
+
+def get_record(scenario):
+    """
+    Get the feed record a scenario was generated from.
+    
+    Args:
+        scenario: Behave scenario
+        
+    Returns:
+        dict: Record, or None if the scenario does not come from a data feed
+    """
+    row = getattr(scenario, '_row', None)
+    return getattr(row, 'feed_record', None)
+
+
+def _cell(value):
+    """
+    Format a record value as an Examples table cell.
+    """
+    if value is None:
+        return ''
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return str(value)
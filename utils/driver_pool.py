@@ -0,0 +1,213 @@
+"""
+WebDriver pool that keeps warm browser sessions between scenarios.
+"""
+import threading
+from collections import defaultdict, deque
+from urllib.parse import urlsplit
+
+from selenium.common.exceptions import WebDriverException
+
+from config import config
+from utils import js_scripts
+from utils.driver_factory import DriverFactory
+from utils.element_cache import ElementCache
+
+
+class DriverPool:
+    """
+    Pool of reusable WebDriver sessions, kept per browser type.
+    
+    Drivers are handed out by acquire() and given back with release(). On release the
+    session is reset and kept warm for the next scenario, or quit if it has reached
+    its maximum number of uses or the reset failed.
+    """
+    
+    def __init__(self, size=None, max_uses=None):
+        """
+        Initialize the driver pool.
+        
+        Args:
+            size: Idle sessions to keep per browser, defaults to DRIVER_POOL_SIZE from config
+            max_uses: Uses before a session is recycled, defaults to DRIVER_POOL_MAX_USES from config
+        """
+        self.size = size or config.DRIVER_POOL_SIZE
+        self.max_uses = max_uses or config.DRIVER_POOL_MAX_USES
+        self._idle = defaultdict(deque)
+        self._lock = threading.Lock()
+    
+    def acquire(self, browser=None):
+        """
+        Get a driver from the pool, launching a new one if no warm session is idle.
+        
+        Args:
+            browser (str, optional): Browser name. Defaults to None, which uses the browser from config.
+            
+        Returns:
+            WebDriver: A WebDriver instance.
+        """
+        browser = (browser or config.BROWSER).lower()
+        
+        with self._lock:
+            idle = self._idle[browser]
+            driver = idle.popleft() if idle else None
+        
+        if driver is None:
+            driver = DriverFactory.get_driver(browser)
+            driver.pool_browser = browser
+            driver.pool_uses = 0
+            self._track_origins(driver)
+        
+        driver.pool_uses += 1
+        return driver
+    
+    def release(self, driver):
+        """
+        Return a driver to the pool.
+        
+        The session is reset for the next scenario. It is quit instead when it has been
+        used max_uses times, when the reset fails or when the pool is already full.
+        
+        Args:
+            driver (WebDriver): Driver previously returned by acquire().
+        """
+        browser = getattr(driver, 'pool_browser', None)
+        if browser is None or driver.pool_uses >= self.max_uses or not self.reset_driver(driver):
+            self._quit(driver)
+            return
+        
+        with self._lock:
+            idle = self._idle[browser]
+            if len(idle) < self.size:
+                idle.append(driver)
+                return
+        
+        self._quit(driver)
+    
+    def shutdown(self):
+        """
+        Quit every idle session held by the pool.
+        """
+        with self._lock:
+            drivers = [driver for idle in self._idle.values() for driver in idle]
+            self._idle.clear()
+        
+        for driver in drivers:
+            self._quit(driver)
+    
+    @staticmethod
+    def reset_driver(driver):
+        """
+        Reset browser state so the session can be reused by another scenario.
+        
+        Closes extra windows and leaves any frame, then clears cookies, local and
+        session storage and navigates to a blank page. Chromium clears the storage of
+        every origin the session visited through the DevTools protocol. Other browsers
+        can only clear the loaded origin, so sessions that visited another origin are
+        recycled instead.
+        
+        Args:
+            driver (WebDriver): WebDriver instance to reset.
+            
+        Returns:
+            bool: True if the session was reset, False if it should be recycled.
+        """
+        chromium = hasattr(driver, 'execute_cdp_cmd')
+        origins = getattr(driver, 'pool_origins', set())
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                origins.update(DriverPool._window_origins(driver, chromium))
+                driver.close()
+            driver.switch_to.window(handles[0])
+            driver.switch_to.default_content()
+            origins.update(DriverPool._window_origins(driver, chromium))
+            
+            if chromium:
+                for origin in origins:
+                    driver.execute_cdp_cmd(
+                        'Storage.clearDataForOrigin', {'origin': origin, 'storageTypes': 'all'}
+                    )
+                # Also drops cookies set for other domains, e.g. by embedded frames
+                driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+            else:
+                if not origins <= {DriverPool._origin(driver.current_url)}:
+                    return False
+                # Storage can only be cleared for the origin that is currently loaded
+                driver.execute_script(js_scripts.CLEAR_STORAGE)
+                driver.delete_all_cookies()
+            
+            driver.get('about:blank')
+            origins.clear()
+            ElementCache.for_driver(driver).clear()
+        except WebDriverException:
+            return False
+        
+        return True
+    
+    @staticmethod
+    def _track_origins(driver):
+        """
+        Record the origins a driver navigates to with get() in driver.pool_origins.
+        
+        Args:
+            driver (WebDriver): WebDriver instance
+        """
+        driver.pool_origins = set()
+        get = driver.get
+        
+        def tracked_get(url):
+            origin = DriverPool._origin(url)
+            if origin:
+                driver.pool_origins.add(origin)
+            return get(url)
+        
+        driver.get = tracked_get
+    
+    @staticmethod
+    def _window_origins(driver, chromium):
+        """
+        Get the origins the current window visited: the loaded one, and on Chromium
+        every entry of its history, including pages reached through links.
+        
+        Args:
+            driver (WebDriver): WebDriver instance
+            chromium (bool): Whether the driver speaks the DevTools protocol
+            
+        Returns:
+            set: Origins, e.g. 'https://example.com'
+        """
+        urls = [driver.current_url]
+        if chromium:
+            history = driver.execute_cdp_cmd('Page.getNavigationHistory', {})
+            urls.extend(entry['url'] for entry in history.get('entries', []))
+        return {origin for origin in map(DriverPool._origin, urls) if origin}
+    
+    @staticmethod
+    def _origin(url):
+        """
+        Get the origin of a URL.
+        
+        Args:
+            url: URL
+            
+        Returns:
+            str: Origin, or None for URLs without web storage such as about:blank
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.netloc:
+            return None
+        return f"{parts.scheme}://{parts.netloc}"
+    
+    @staticmethod
+    def _quit(driver):
+        """
+        Quit a driver, ignoring sessions that are already gone.
+        
+        Args:
+            driver (WebDriver): WebDriver instance to quit.
+        """
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass
@@ -0,0 +1,137 @@
+"""
+Speculative browser prelaunch that hides launch and quit latency from scenarios.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from selenium.common.exceptions import WebDriverException
+
+from config import config
+from utils.driver_factory import DriverFactory
+
+
+class DriverPrelauncher:
+    """
+    Keeps browser sessions launched ahead of time and quits used ones in the background.
+    
+    A launcher thread keeps up to `count` fresh sessions ready, so the next scenario
+    starts while the current one is still running. Drivers given back with release()
+    are quit by a teardown executor instead of on the scenario's critical path.
+    """
+    
+    # Consecutive launch failures after which the launcher stops and acquire() launches directly
+    MAX_LAUNCH_FAILURES = 3
+    
+    def __init__(self, browser=None, count=None, teardown_workers=None):
+        """
+        Initialize the prelauncher and start the launcher thread.
+        
+        Args:
+            browser (str, optional): Browser name. Defaults to None, which uses the browser from config.
+            count: Sessions to keep ready, defaults to PRELAUNCH_COUNT from config
+            teardown_workers: Threads quitting used sessions, defaults to TEARDOWN_WORKERS from config
+        """
+        self.browser = (browser or config.BROWSER).lower()
+        self.count = count or config.PRELAUNCH_COUNT
+        self._ready = deque()
+        self._launching = 0
+        self._failures = 0
+        self._stopped = False
+        self._condition = threading.Condition()
+        self._teardown = ThreadPoolExecutor(
+            max_workers=teardown_workers or config.TEARDOWN_WORKERS,
+            thread_name_prefix='driver-teardown',
+        )
+        self._launcher = threading.Thread(target=self._run, name='driver-prelauncher', daemon=True)
+        self._launcher.start()
+    
+    def acquire(self):
+        """
+        Get a ready driver, waiting for a launch in progress instead of starting a second one.
+        
+        Falls back to launching a driver directly if none is ready or being launched.
+        
+        Returns:
+            WebDriver: A WebDriver instance.
+        """
+        with self._condition:
+            while not self._ready and self._launching and not self._stopped:
+                self._condition.wait()
+            driver = self._ready.popleft() if self._ready else None
+            # Wake the launcher so it replaces the session that was taken
+            self._condition.notify_all()
+        
+        if driver is None:
+            driver = DriverFactory.get_driver(self.browser)
+        return driver
+    
+    def release(self, driver):
+        """
+        Quit a driver in the background.
+        
+        Args:
+            driver (WebDriver): Driver to quit.
+        """
+        self._teardown.submit(self._quit, driver)
+    
+    def shutdown(self):
+        """
+        Stop the launcher, quit every ready session and wait for pending teardowns.
+        """
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        self._launcher.join()
+        
+        while self._ready:
+            self.release(self._ready.popleft())
+        self._teardown.shutdown(wait=True)
+    
+    def _run(self):
+        """
+        Launcher thread loop that keeps `count` sessions ready.
+        """
+        while True:
+            with self._condition:
+                while not self._stopped and len(self._ready) + self._launching >= self.count:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+                self._launching += 1
+            
+            try:
+                driver = DriverFactory.get_driver(self.browser)
+            except Exception as error:
+                print(f"Failed to prelaunch {self.browser} driver: {error}")
+                driver = None
+            
+            with self._condition:
+                self._launching -= 1
+                if driver is None:
+                    self._failures += 1
+                    if self._failures >= self.MAX_LAUNCH_FAILURES:
+                        self._stopped = True
+                elif self._stopped:
+                    self.release(driver)
+                else:
+                    self._failures = 0
+                    self._ready.append(driver)
+                self._condition.notify_all()
+            
+            if driver is None:
+                time.sleep(1)
+    
+    @staticmethod
+    def _quit(driver):
+        """
+        Quit a driver, ignoring sessions that are already gone.
+        
+        Args:
+            driver (WebDriver): WebDriver instance to quit.
+        """
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass
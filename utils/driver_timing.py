@@ -0,0 +1,141 @@
+"""
+Phase-level timing of WebDriver creation.
+"""
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+from config import config
+from utils.stats import summarize
+
+
+class PhaseTimer:
+    """
+    Records how long each phase of a driver creation takes.
+    """
+    
+    def __init__(self, browser):
+        """
+        Initialize the phase timer.
+        
+        Args:
+            browser: Name of the browser being created
+        """
+        self.browser = browser
+        self.phases = {}
+        self._started = time.perf_counter()
+    
+    @contextmanager
+    def phase(self, name):
+        """
+        Time the enclosed block as a phase. Repeated phases are added up.
+        
+        Args:
+            name: Phase name
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0) + time.perf_counter() - start
+    
+    def wrap(self, name, func):
+        """
+        Wrap a callable so every call is timed as a phase.
+        
+        Args:
+            name: Phase name
+            func: Callable to wrap
+            
+        Returns:
+            callable: The wrapped callable
+        """
+        def timed(*args, **kwargs):
+            with self.phase(name):
+                return func(*args, **kwargs)
+        return timed
+    
+    def record(self):
+        """
+        Get the timings recorded so far.
+        
+        Returns:
+            dict: Browser, timestamp, total and per-phase durations in milliseconds
+        """
+        return {
+            'browser': self.browser,
+            'timestamp': datetime.now().isoformat(),
+            'total_ms': round((time.perf_counter() - self._started) * 1000, 3),
+            'phases': {name: round(duration * 1000, 3) for name, duration in self.phases.items()},
+        }
+
+
+class DriverTimingRecorder:
+    """
+    Timing listener that collects driver creation timings and writes them to a JSON report.
+    
+    Register it with DriverFactory.add_timing_listener().
+    """
+    
+    def __init__(self):
+        """
+        Initialize the recorder.
+        """
+        self.records = []
+        self._lock = threading.Lock()
+    
+    def __call__(self, record):
+        """
+        Collect the timing record of a driver creation.
+        
+        Args:
+            record: Record produced by PhaseTimer.record()
+        """
+        with self._lock:
+            self.records.append(record)
+    
+    def summary(self):
+        """
+        Summarize the total and per-phase durations per browser.
+        
+        Returns:
+            dict: {browser: {phase: {count, mean, p50, p95, max}}}
+        """
+        durations = defaultdict(lambda: defaultdict(list))
+        with self._lock:
+            for record in self.records:
+                durations[record['browser']]['total'].append(record['total_ms'])
+                for name, duration in record['phases'].items():
+                    durations[record['browser']][name].append(duration)
+        
+        return {
+            browser: {name: summarize(values) for name, values in phases.items()}
+            for browser, phases in durations.items()
+        }
+    
+    def write(self, path=None):
+        """
+        Write the records and the summary as JSON.
+        
+        Args:
+            path: Optional output path, defaults to driver_timings_<RUN_ID>.json in REPORT_DIR
+            
+        Returns:
+            str: Path to the written report
+        """
+        path = path or os.path.join(config.REPORT_DIR, f"driver_timings_{config.RUN_ID}.json")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        
+        with self._lock:
+            records = list(self.records)
+        with open(path, 'w') as report_file:
+            json.dump({
+                'run_id': config.RUN_ID,
+                'records': records,
+                'summary': self.summary(),
+            }, report_file, indent=2)
+        return path
@@ -0,0 +1,94 @@
+"""
+Per-driver cache of located elements, so repeated interactions skip the find command.
+"""
+
+
+class ElementCache:
+    """
+    Cache of WebElements keyed by frame context and locator.
+    
+    The cache belongs to the driver, so every page object using the driver shares it.
+    Navigations clear it, entering a frame clears that frame's entries, and callers
+    drop single entries when an element turns out to be stale.
+    """
+    
+    def __init__(self):
+        """
+        Initialize an empty cache in the top-level browsing context.
+        """
+        self.frame_path = ()
+        self._elements = {}
+    
+    @staticmethod
+    def for_driver(driver):
+        """
+        Get the element cache of a driver, creating it on first use.
+        
+        Args:
+            driver: WebDriver instance
+            
+        Returns:
+            ElementCache: The driver's element cache
+        """
+        cache = getattr(driver, 'element_cache', None)
+        if cache is None:
+            cache = ElementCache()
+            driver.element_cache = cache
+        return cache
+    
+    def get(self, locator):
+        """
+        Get the cached element of a locator in the current frame context.
+        
+        Args:
+            locator: Tuple of (By, selector)
+            
+        Returns:
+            WebElement: The cached element, or None
+        """
+        return self._elements.get((self.frame_path, tuple(locator)))
+    
+    def put(self, locator, element):
+        """
+        Cache the element of a locator in the current frame context.
+        
+        Args:
+            locator: Tuple of (By, selector)
+            element: WebElement found for the locator
+        """
+        self._elements[(self.frame_path, tuple(locator))] = element
+    
+    def invalidate(self, locator):
+        """
+        Drop the cached element of a locator in the current frame context.
+        
+        Args:
+            locator: Tuple of (By, selector)
+        """
+        self._elements.pop((self.frame_path, tuple(locator)), None)
+    
+    def clear(self):
+        """
+        Drop every cached element, e.g. after a navigation.
+        """
+        self._elements.clear()
+        self.frame_path = ()
+    
+    def enter_frame(self, frame):
+        """
+        Switch the cache to a child frame, dropping that frame's old entries.
+        
+        Args:
+            frame: WebElement of the frame being switched to
+        """
+        self.frame_path += (getattr(frame, 'id', frame),)
+        self._elements = {
+            key: element for key, element in self._elements.items()
+            if key[0][:len(self.frame_path)] != self.frame_path
+        }
+    
+    def exit_frames(self):
+        """
+        Switch the cache back to the top-level browsing context.
+        """
+        self.frame_path = ()
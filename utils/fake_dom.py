@@ -0,0 +1,1031 @@
+"""
+Parsed HTML DOM model used by the in-process fake WebDriver (utils/fake_driver.py).
+
+Documents are parsed with html.parser. Elements can be located with every strategy of
+Selenium's By: CSS selectors (type, id, class, attribute, combinators and common
+pseudo-classes) and a subset of XPath (child and descendant steps with attribute,
+text, contains/starts-with and position predicates). Stylesheets and scripts are not
+evaluated, so only the hidden attribute, inline styles and the element type decide
+whether an element is displayed.
+"""
+import itertools
+import re
+from functools import lru_cache
+from html import escape
+from html.parser import HTMLParser
+
+from selenium.common.exceptions import InvalidSelectorException
+from selenium.webdriver.common.by import By
+
+
+VOID_ELEMENTS = frozenset({
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr',
+})
+
+# Elements whose content is never rendered
+NON_RENDERED_ELEMENTS = frozenset({
+    'head', 'script', 'style', 'template', 'title', 'meta', 'link', 'noscript',
+})
+
+# Elements rendered on their own line by innerText
+BLOCK_ELEMENTS = frozenset({
+    'address', 'article', 'aside', 'blockquote', 'dd', 'div', 'dl', 'dt', 'fieldset', 'figure', 'footer',
+    'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'li', 'main', 'nav', 'ol', 'p', 'pre',
+    'section', 'table', 'tr', 'ul',
+})
+
+# Open elements that are closed by the start tag of another element
+IMPLIED_END_TAGS = {
+    'p': BLOCK_ELEMENTS,
+    'li': {'li'},
+    'dt': {'dt', 'dd'},
+    'dd': {'dt', 'dd'},
+    'option': {'option', 'optgroup'},
+    'tr': {'tr'},
+    'td': {'td', 'th', 'tr'},
+    'th': {'td', 'th', 'tr'},
+}
+
+# Attributes reported as 'true' or None by get_attribute
+BOOLEAN_ATTRIBUTES = frozenset({
+    'async', 'autofocus', 'autoplay', 'checked', 'controls', 'default', 'defer', 'disabled', 'hidden',
+    'loop', 'multiple', 'muted', 'novalidate', 'open', 'readonly', 'required', 'reversed', 'selected',
+})
+
+# Input types that do not hold typed text
+NON_TEXT_INPUTS = frozenset({'checkbox', 'radio', 'submit', 'button', 'reset', 'image', 'file', 'hidden'})
+
+_order = itertools.count()
+
+
+class Element:
+    """
+    An element of a parsed document.
+    
+    Form state (value, checkedness, selectedness) starts from the attributes and is
+    kept separately once changed, like the corresponding DOM properties.
+    """
+    
+    def __init__(self, tag, attrs=None, document=None, parent=None):
+        """
+        Initialize the element.
+        
+        Args:
+            tag: Lowercase tag name
+            attrs: Attribute name to value
+            document: Document the element belongs to
+            parent: Parent element
+        """
+        self.tag = tag
+        self.attrs = dict(attrs or {})
+        self.document = document
+        self.parent = parent
+        self.children = []
+        self.order = next(_order)
+        self._value = None
+        self._checked = None
+        self._selected = None
+    
+    def __repr__(self):
+        return f"<{self.tag}{''.join(f' {name}={value!r}' for name, value in self.attrs.items())}>"
+    
+    # Tree traversal
+    
+    def element_children(self):
+        """
+        Get the child elements, without text.
+        """
+        return [child for child in self.children if isinstance(child, Element)]
+    
+    def iter_descendants(self):
+        """
+        Iterate over the descendant elements in document order.
+        """
+        stack = list(reversed(self.element_children()))
+        while stack:
+            element = stack.pop()
+            yield element
+            stack.extend(reversed(element.element_children()))
+    
+    def ancestors(self):
+        """
+        Iterate over the ancestor elements, closest first.
+        """
+        element = self.parent
+        while element is not None and element.tag != '#document':
+            yield element
+            element = element.parent
+    
+    def closest(self, tag):
+        """
+        Get the element itself or its closest ancestor with a tag name.
+        """
+        if self.tag == tag:
+            return self
+        return next((element for element in self.ancestors() if element.tag == tag), None)
+    
+    def is_connected(self):
+        """
+        Check if the element is still part of the active document.
+        """
+        element = self
+        while element.parent is not None:
+            element = element.parent
+        return element is self.document and self.document.active
+    
+    # Text
+    
+    def text_content(self):
+        """
+        Get the text of all descendants, like textContent.
+        """
+        return ''.join(
+            child if isinstance(child, str) else child.text_content() for child in self.children
+        )
+    
+    def own_text(self):
+        """
+        Get the text of the direct text children.
+        """
+        return ''.join(child for child in self.children if isinstance(child, str))
+    
+    def rendered_text(self):
+        """
+        Get the rendered text of the element, like WebElement.text.
+        
+        Text of hidden descendants is left out, whitespace is collapsed and block
+        elements are put on their own line.
+        """
+        if not self.is_displayed():
+            return ''
+        if self.tag == 'pre':
+            return self.text_content().strip('\n')
+        
+        parts = []
+        self._collect_rendered_text(parts)
+        lines = (re.sub(r'[ \t\r\f\v]+', ' ', line).strip() for line in ''.join(parts).split('\n'))
+        return '\n'.join(line for line in lines if line)
+    
+    def _collect_rendered_text(self, parts):
+        for child in self.children:
+            if isinstance(child, str):
+                parts.append(child.replace('\n', ' '))
+            elif child.tag == 'br':
+                parts.append('\n')
+            elif not child._is_hidden():
+                block = child.tag in BLOCK_ELEMENTS
+                if block:
+                    parts.append('\n')
+                child._collect_rendered_text(parts)
+                if block:
+                    parts.append('\n')
+    
+    # Rendering state
+    
+    def _is_hidden(self):
+        if self.tag in NON_RENDERED_ELEMENTS or 'hidden' in self.attrs:
+            return True
+        if self.tag == 'input' and self.attrs.get('type', '').lower() == 'hidden':
+            return True
+        style = self.attrs.get('style', '').replace(' ', '').lower()
+        return 'display:none' in style or 'visibility:hidden' in style or 'opacity:0;' in style + ';'
+    
+    def is_displayed(self):
+        """
+        Check if the element is rendered, based on its type, hidden attribute and inline styles.
+        """
+        if self.tag == 'option':
+            select = self.closest('select')
+            return select is None or select.is_displayed()
+        return not self._is_hidden() and not any(element._is_hidden() for element in self.ancestors())
+    
+    def is_enabled(self):
+        """
+        Check if the element is not disabled, directly or by a disabled fieldset.
+        """
+        if 'disabled' in self.attrs:
+            return False
+        return not any(
+            element.tag == 'fieldset' and 'disabled' in element.attrs for element in self.ancestors()
+        )
+    
+    # Form state
+    
+    @property
+    def input_type(self):
+        """
+        Lowercase type of an input element.
+        """
+        return self.attrs.get('type', 'text').lower() if self.tag == 'input' else None
+    
+    @property
+    def value(self):
+        """
+        Current value of a form control, like the value property.
+        """
+        if self.tag == 'select':
+            selected = [option for option in self.options() if option.selected]
+            return selected[0].value if selected else ''
+        if self._value is not None:
+            return self._value
+        if self.tag == 'textarea':
+            return self.text_content()
+        if self.tag == 'option':
+            return self.attrs.get('value', re.sub(r'\s+', ' ', self.text_content()).strip())
+        if self.input_type in ('checkbox', 'radio'):
+            return self.attrs.get('value', 'on')
+        return self.attrs.get('value', '')
+    
+    @value.setter
+    def value(self, value):
+        if self.tag == 'select':
+            for option in self.options():
+                option.selected = option.value == value
+        else:
+            self._value = value
+    
+    @property
+    def checked(self):
+        """
+        Checkedness of a checkbox or radio button.
+        """
+        return 'checked' in self.attrs if self._checked is None else self._checked
+    
+    @checked.setter
+    def checked(self, checked):
+        self._checked = bool(checked)
+        if checked and self.input_type == 'radio':
+            for other in self.radio_group():
+                if other is not self:
+                    other._checked = False
+    
+    @property
+    def selected(self):
+        """
+        Selectedness of an option, the first option is selected by default.
+        """
+        if self._selected is not None:
+            return self._selected
+        select = self.closest('select')
+        if 'selected' in self.attrs or select is None:
+            return 'selected' in self.attrs
+        options = select.options()
+        explicit = any(option._selected or 'selected' in option.attrs for option in options)
+        return not explicit and 'multiple' not in select.attrs and bool(options) and options[0] is self
+    
+    @selected.setter
+    def selected(self, selected):
+        select = self.closest('select')
+        if selected and select is not None and 'multiple' not in select.attrs:
+            for option in select.options():
+                option._selected = False
+        self._selected = bool(selected)
+    
+    def options(self):
+        """
+        Get the options of a select element.
+        """
+        return [element for element in self.iter_descendants() if element.tag == 'option']
+    
+    def radio_group(self):
+        """
+        Get the radio buttons sharing the name of this one in the same form.
+        """
+        name = self.attrs.get('name')
+        if not name:
+            return [self]
+        root = self.form() or self.document
+        return [
+            element for element in root.iter_descendants()
+            if element.input_type == 'radio' and element.attrs.get('name') == name
+        ]
+    
+    def form(self):
+        """
+        Get the form the element belongs to.
+        """
+        form_id = self.attrs.get('form')
+        if form_id and self.document is not None:
+            return next(
+                (element for element in self.document.iter_descendants()
+                 if element.tag == 'form' and element.attrs.get('id') == form_id),
+                None,
+            )
+        return self.closest('form')
+    
+    def form_data(self):
+        """
+        Get the submitted values of a form element.
+        
+        Returns:
+            dict: Control name to value, the last value wins for repeated names
+        """
+        data = {}
+        for element in self.iter_descendants():
+            name = element.attrs.get('name')
+            if not name or not element.is_enabled() or element.tag not in ('input', 'select', 'textarea'):
+                continue
+            if element.input_type in ('checkbox', 'radio'):
+                if element.checked:
+                    data[name] = element.value
+            elif element.input_type not in ('submit', 'button', 'reset', 'image'):
+                data[name] = element.value
+        return data
+    
+    # Serialization
+    
+    def outer_html(self):
+        """
+        Serialize the element and its descendants.
+        """
+        attrs = ''.join(f' {name}="{escape(value or "", quote=True)}"' for name, value in self.attrs.items())
+        if self.tag in VOID_ELEMENTS:
+            return f"<{self.tag}{attrs}>"
+        return f"<{self.tag}{attrs}>{self.inner_html()}</{self.tag}>"
+    
+    def inner_html(self):
+        """
+        Serialize the descendants of the element.
+        """
+        raw = self.tag in ('script', 'style')
+        return ''.join(
+            (child if raw else escape(child, quote=False)) if isinstance(child, str) else child.outer_html()
+            for child in self.children
+        )
+
+
+class Document(Element):
+    """
+    A parsed HTML document.
+    """
+    
+    def __init__(self, url='about:blank'):
+        """
+        Initialize an empty document.
+        
+        Args:
+            url: URL the document was loaded from
+        """
+        super().__init__('#document')
+        self.document = self
+        self.url = url
+        self.active = True
+    
+    @property
+    def title(self):
+        """
+        Text of the first title element.
+        """
+        title = next((element for element in self.iter_descendants() if element.tag == 'title'), None)
+        return re.sub(r'\s+', ' ', title.text_content()).strip() if title else ''
+    
+    @property
+    def body(self):
+        """
+        The body element, or the document itself if there is none.
+        """
+        return next((element for element in self.iter_descendants() if element.tag == 'body'), self)
+    
+    def find_all(self, by, value, root=None):
+        """
+        Find the elements matching a Selenium locator.
+        
+        Args:
+            by: Locator strategy, one of Selenium's By values
+            value: Selector
+            root: Optional element to search under, defaults to the whole document
+            
+        Returns:
+            list: Matching elements in document order
+        """
+        return find_all(root or self, by, value)
+
+
+class DocumentParser(HTMLParser):
+    """
+    Builds a Document from HTML, closing elements the way browsers imply them.
+    """
+    
+    def __init__(self, document):
+        super().__init__(convert_charrefs=True)
+        self.document = document
+        self.stack = [document]
+    
+    def handle_starttag(self, tag, attrs):
+        implied = IMPLIED_END_TAGS.get(self.stack[-1].tag)
+        if implied and tag in implied:
+            self.stack.pop()
+        element = Element(tag, {name: '' if value is None else value for name, value in attrs},
+                          self.document, self.stack[-1])
+        self.stack[-1].children.append(element)
+        if tag not in VOID_ELEMENTS:
+            self.stack.append(element)
+    
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS and self.stack[-1].tag == tag:
+            self.stack.pop()
+    
+    def handle_endtag(self, tag):
+        # Ignore stray end tags, and close any elements left open inside the closed one
+        for index in range(len(self.stack) - 1, 0, -1):
+            if self.stack[index].tag == tag:
+                del self.stack[index:]
+                return
+    
+    def handle_data(self, data):
+        self.stack[-1].children.append(data)
+
+
+def parse_document(html, url='about:blank'):
+    """
+    Parse HTML into a Document.
+    
+    Args:
+        html: HTML source
+        url: URL the document was loaded from
+        
+    Returns:
+        Document: The parsed document
+    """
+    document = Document(url)
+    parser = DocumentParser(document)
+    parser.feed(html or '')
+    parser.close()
+    return document
+
+
+# Locator strategies
+
+def find_all(root, by, value):
+    """
+    Find the elements under a root element matching a Selenium locator.
+    
+    Args:
+        root: Element or Document to search under
+        by: Locator strategy, one of Selenium's By values
+        value: Selector
+        
+    Returns:
+        list: Matching elements in document order
+        
+    Raises:
+        InvalidSelectorException: If the strategy or selector is not supported
+    """
+    if by == By.ID:
+        return [element for element in root.iter_descendants() if element.attrs.get('id') == value]
+    if by == By.NAME:
+        return [element for element in root.iter_descendants() if element.attrs.get('name') == value]
+    if by == By.CLASS_NAME:
+        return [
+            element for element in root.iter_descendants() if value in element.attrs.get('class', '').split()
+        ]
+    if by == By.TAG_NAME:
+        return [element for element in root.iter_descendants() if element.tag == value.lower()]
+    if by in (By.LINK_TEXT, By.PARTIAL_LINK_TEXT):
+        links = (element for element in root.iter_descendants() if element.tag == 'a')
+        if by == By.LINK_TEXT:
+            return [link for link in links if link.rendered_text().strip() == value]
+        return [link for link in links if value in link.rendered_text()]
+    if by == By.CSS_SELECTOR:
+        selectors = compile_css(value)
+        return [
+            element for element in root.iter_descendants()
+            if any(_matches_complex(element, selector, len(selector) - 1) for selector in selectors)
+        ]
+    if by == By.XPATH:
+        return evaluate_xpath(root, value)
+    raise InvalidSelectorException(f"Unsupported locator strategy: {by}")
+
+
+# CSS selectors
+
+_CSS_TOKEN = re.compile(r"""
+    (?P<combinator>\s*[>+~]\s*|\s+)
+  | (?P<tag>\*|[a-zA-Z][\w-]*)
+  | \#(?P<id>(?:[\w-]|\\.)+)
+  | \.(?P<cls>(?:[\w-]|\\.)+)
+  | \[\s*(?P<attr>[\w:-]+)\s*
+        (?:(?P<op>[~|^$*]?=)\s*(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<bare>[^\]\s]+)))?\s*\]
+  | :(?P<pseudo>[\w-]+)(?:\((?P<arg>[^()]*(?:\([^()]*\))?[^()]*)\))?
+""", re.VERBOSE)
+
+_PSEUDO_CLASSES = frozenset({
+    'first-child', 'last-child', 'only-child', 'nth-child', 'nth-last-child', 'first-of-type', 'last-of-type',
+    'checked', 'disabled', 'enabled', 'selected', 'not', 'empty', 'root',
+})
+
+
+def _unescape_css(text):
+    return re.sub(r'\\(.)', r'\1', text)
+
+
+def _split_selector_list(selector):
+    parts, depth, quote, current = [], 0, None, ''
+    for char in selector:
+        if quote:
+            quote = None if char == quote else quote
+        elif char in '"\'':
+            quote = char
+        elif char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            parts.append(current)
+            current = ''
+            continue
+        current += char
+    parts.append(current)
+    return [part.strip() for part in parts]
+
+
+@lru_cache(maxsize=512)
+def compile_css(selector):
+    """
+    Compile a CSS selector list.
+    
+    Args:
+        selector: CSS selector, e.g. "form#login input[name='user'], .error-message"
+        
+    Returns:
+        tuple: One complex selector per selector in the list, each a tuple alternating
+            compound selectors and combinators
+            
+    Raises:
+        InvalidSelectorException: If the selector uses unsupported syntax
+    """
+    complex_selectors = []
+    for text in _split_selector_list(selector):
+        if not text:
+            raise InvalidSelectorException(f"Invalid CSS selector: {selector!r}")
+        parts = [_new_compound()]
+        position = 0
+        while position < len(text):
+            match = _CSS_TOKEN.match(text, position)
+            if not match:
+                raise InvalidSelectorException(f"Unsupported CSS selector: {selector!r}")
+            position = match.end()
+            compound = parts[-1]
+            if match.group('combinator') is not None:
+                if _is_empty_compound(compound):
+                    raise InvalidSelectorException(f"Invalid CSS selector: {selector!r}")
+                parts.extend([match.group('combinator').strip() or ' ', _new_compound()])
+            elif match.group('tag'):
+                compound['tag'] = match.group('tag').lower()
+            elif match.group('id'):
+                compound['ids'].append(_unescape_css(match.group('id')))
+            elif match.group('cls'):
+                compound['classes'].append(_unescape_css(match.group('cls')))
+            elif match.group('attr'):
+                attr_value = next((match.group(group) for group in ('dq', 'sq', 'bare')
+                                   if match.group(group) is not None), None)
+                compound['attrs'].append((match.group('attr').lower(), match.group('op'), attr_value))
+            else:
+                pseudo = match.group('pseudo').lower()
+                if pseudo not in _PSEUDO_CLASSES:
+                    raise InvalidSelectorException(f"Unsupported CSS pseudo-class: :{pseudo}")
+                argument = match.group('arg')
+                if pseudo == 'not':
+                    argument = compile_css(argument)
+                compound['pseudos'].append((pseudo, argument))
+        if _is_empty_compound(parts[-1]):
+            raise InvalidSelectorException(f"Invalid CSS selector: {selector!r}")
+        complex_selectors.append(tuple(parts))
+    return tuple(complex_selectors)
+
+
+def _new_compound():
+    return {'tag': None, 'ids': [], 'classes': [], 'attrs': [], 'pseudos': []}
+
+
+def _is_empty_compound(compound):
+    return not any(compound[key] for key in ('tag', 'ids', 'classes', 'attrs', 'pseudos'))
+
+
+def _matches_complex(element, parts, index):
+    if not _matches_compound(element, parts[index]):
+        return False
+    if index == 0:
+        return True
+    
+    combinator = parts[index - 1]
+    if combinator == '>':
+        parent = element.parent
+        return parent is not None and parent.tag != '#document' and _matches_complex(parent, parts, index - 2)
+    if combinator == ' ':
+        return any(_matches_complex(ancestor, parts, index - 2) for ancestor in element.ancestors())
+    
+    siblings = element.parent.element_children() if element.parent is not None else [element]
+    previous = siblings[:siblings.index(element)]
+    if combinator == '+':
+        return bool(previous) and _matches_complex(previous[-1], parts, index - 2)
+    return any(_matches_complex(sibling, parts, index - 2) for sibling in previous)
+
+
+def _matches_compound(element, compound):
+    if compound['tag'] not in (None, '*') and element.tag != compound['tag']:
+        return False
+    if any(element.attrs.get('id') != element_id for element_id in compound['ids']):
+        return False
+    classes = element.attrs.get('class', '').split()
+    if any(name not in classes for name in compound['classes']):
+        return False
+    for name, op, expected in compound['attrs']:
+        if name not in element.attrs:
+            return False
+        if op and not _matches_attribute(element.attrs[name], op, expected):
+            return False
+    return all(_matches_pseudo(element, pseudo, argument) for pseudo, argument in compound['pseudos'])
+
+
+def _matches_attribute(actual, op, expected):
+    if op == '=':
+        return actual == expected
+    if op == '~=':
+        return expected in actual.split()
+    if op == '|=':
+        return actual == expected or actual.startswith(f"{expected}-")
+    if op == '^=':
+        return bool(expected) and actual.startswith(expected)
+    if op == '$=':
+        return bool(expected) and actual.endswith(expected)
+    return bool(expected) and expected in actual
+
+
+def _matches_pseudo(element, pseudo, argument):
+    if pseudo == 'not':
+        return not any(_matches_complex(element, selector, len(selector) - 1) for selector in argument)
+    if pseudo == 'checked':
+        return element.checked if element.input_type in ('checkbox', 'radio') else (
+            element.tag == 'option' and element.selected)
+    if pseudo == 'selected':
+        return element.tag == 'option' and element.selected
+    if pseudo == 'disabled':
+        return not element.is_enabled()
+    if pseudo == 'enabled':
+        return element.is_enabled()
+    if pseudo == 'empty':
+        return not element.children
+    if pseudo == 'root':
+        return element.parent is not None and element.parent.tag == '#document'
+    
+    siblings = element.parent.element_children() if element.parent is not None else [element]
+    if pseudo.endswith('of-type'):
+        siblings = [sibling for sibling in siblings if sibling.tag == element.tag]
+    position = siblings.index(element) + 1
+    if pseudo in ('first-child', 'first-of-type'):
+        return position == 1
+    if pseudo in ('last-child', 'last-of-type'):
+        return position == len(siblings)
+    if pseudo == 'only-child':
+        return len(siblings) == 1
+    if pseudo == 'nth-last-child':
+        position = len(siblings) - position + 1
+    return _matches_nth(position, argument or '')
+
+
+def _matches_nth(position, expression):
+    expression = expression.replace(' ', '').lower()
+    if expression == 'odd':
+        expression = '2n+1'
+    elif expression == 'even':
+        expression = '2n'
+    match = re.fullmatch(r'(?:([+-]?\d*)n)?([+-]?\d+)?', expression)
+    if not expression or not match:
+        raise InvalidSelectorException(f"Unsupported :nth-child expression: {expression!r}")
+    step_text, offset_text = match.groups()
+    offset = int(offset_text or 0)
+    if step_text is None:
+        return position == offset
+    step = int(step_text + '1' if step_text in ('', '+', '-') else step_text)
+    if step == 0:
+        return position == offset
+    return (position - offset) % step == 0 and (position - offset) // step >= 0
+
+
+# XPath subset
+
+_XPATH_TOKEN = re.compile(r"""
+    \s*(?:
+        (?P<string>"[^"]*"|'[^']*')
+      | (?P<number>\d+(?:\.\d+)?)
+      | (?P<op>!=|<=|>=|=|<|>)
+      | (?P<function>[a-z][\w-]*)\s*\(
+      | (?P<attr>@[\w:-]+|@\*)
+      | (?P<keyword>and|or)\b
+      | (?P<punct>[(),])
+      | (?P<dot>\.)
+    )
+""", re.VERBOSE)
+
+
+# Functions called without arguments, tokenized as a whole
+_XPATH_NO_ARGUMENT_CALLS = ('text', 'last', 'position', 'normalize-space')
+
+_XPATH_FUNCTIONS = frozenset({'contains', 'starts-with', 'not', 'normalize-space', 'string-length', 'translate'})
+
+
+def _split_xpath_steps(path):
+    steps, depth, quote, current, position = [], 0, None, '', 0
+    while position < len(path):
+        char = path[position]
+        if quote:
+            quote = None if char == quote else quote
+        elif char in '"\'':
+            quote = char
+        elif char == '[':
+            depth += 1
+        elif char == ']':
+            depth -= 1
+        elif char == '/' and depth == 0:
+            axis = 'descendant' if path.startswith('//', position) else 'child'
+            steps.append(current)
+            current = axis
+            position += 2 if axis == 'descendant' else 1
+            continue
+        current += char
+        position += 1
+    steps.append(current)
+    return steps
+
+
+@lru_cache(maxsize=512)
+def compile_xpath(path):
+    """
+    Compile an XPath expression of the supported subset.
+    
+    Args:
+        path: XPath expression, e.g. "//form[@id='login']//button[contains(text(), 'Log in')]"
+        
+    Returns:
+        tuple: (absolute, steps), where each step is (axis, node test, predicates)
+        
+    Raises:
+        InvalidSelectorException: If the expression uses unsupported syntax
+    """
+    path = path.strip()
+    if path.startswith('(') or '|' in re.sub(r'"[^"]*"|\'[^\']*\'', '', path):
+        raise InvalidSelectorException(f"Unsupported XPath expression: {path!r}")
+    
+    raw_steps = _split_xpath_steps(path)
+    absolute = raw_steps[0] == ''
+    if absolute:
+        raw_steps = raw_steps[1:]
+    else:
+        raw_steps[0] = 'child' + raw_steps[0]
+    
+    steps = []
+    for raw in raw_steps:
+        axis = 'descendant' if raw.startswith('descendant') else 'child'
+        raw = raw[len(axis):]
+        match = re.fullmatch(r'\s*(\.\.|\.|\*|[a-zA-Z][\w-]*|text\(\))\s*((?:\[.*\])?)\s*', raw, re.DOTALL)
+        if not match or match.group(1) == 'text()':
+            raise InvalidSelectorException(f"Unsupported XPath expression: {path!r}")
+        steps.append((axis, match.group(1).lower(), tuple(_parse_predicates(match.group(2), path))))
+    return absolute, tuple(steps)
+
+
+def _parse_predicates(text, path):
+    predicates, depth, quote, start = [], 0, None, None
+    for index, char in enumerate(text):
+        if quote:
+            quote = None if char == quote else quote
+        elif char in '"\'':
+            quote = char
+        elif char == '[':
+            if depth == 0:
+                start = index + 1
+            depth += 1
+        elif char == ']':
+            depth -= 1
+            if depth == 0:
+                predicates.append(_XPathExpressionParser(text[start:index], path).parse())
+    return predicates
+
+
+class _XPathExpressionParser:
+    """
+    Recursive descent parser for predicate expressions.
+    """
+    
+    def __init__(self, text, path):
+        self.path = path
+        self.tokens = []
+        position, text = 0, text.strip()
+        while position < len(text):
+            name = next(
+                (name for name in _XPATH_NO_ARGUMENT_CALLS if text.startswith(f"{name}()", position)), None
+            )
+            if name:
+                self.tokens.append(('call0', name))
+                position += len(name) + 2
+                continue
+            match = _XPATH_TOKEN.match(text, position)
+            if not match or match.end() == position:
+                raise InvalidSelectorException(f"Unsupported XPath expression: {path!r}")
+            kind = match.lastgroup
+            self.tokens.append((kind, match.group(kind)))
+            position = match.end()
+            while position < len(text) and text[position].isspace():
+                position += 1
+        self.index = 0
+    
+    def parse(self):
+        expression = self._or()
+        if self.index != len(self.tokens):
+            raise InvalidSelectorException(f"Unsupported XPath expression: {self.path!r}")
+        return expression
+    
+    def _peek(self):
+        return self.tokens[self.index] if self.index < len(self.tokens) else (None, None)
+    
+    def _take(self, kind=None, value=None):
+        token = self._peek()
+        if token[0] is None or (kind and token[0] != kind) or (value and token[1] != value):
+            raise InvalidSelectorException(f"Unsupported XPath expression: {self.path!r}")
+        self.index += 1
+        return token
+    
+    def _or(self):
+        expression = self._and()
+        while self._peek() == ('keyword', 'or'):
+            self._take()
+            expression = ('or', expression, self._and())
+        return expression
+    
+    def _and(self):
+        expression = self._comparison()
+        while self._peek() == ('keyword', 'and'):
+            self._take()
+            expression = ('and', expression, self._comparison())
+        return expression
+    
+    def _comparison(self):
+        left = self._value()
+        if self._peek()[0] == 'op':
+            op = self._take()[1]
+            return ('compare', op, left, self._value())
+        return left
+    
+    def _value(self):
+        kind, value = self._peek()
+        if kind == 'string':
+            self._take()
+            return ('literal', value[1:-1])
+        if kind == 'number':
+            self._take()
+            return ('number', float(value))
+        if kind == 'attr':
+            self._take()
+            return ('attr', value[1:].lower())
+        if kind == 'dot':
+            self._take()
+            return ('string-value',)
+        if kind == 'call0':
+            self._take()
+            return ('call', value, ())
+        if kind == 'function':
+            self._take()
+            arguments = []
+            if self._peek() != ('punct', ')'):
+                arguments.append(self._or())
+                while self._peek() == ('punct', ','):
+                    self._take()
+                    arguments.append(self._or())
+            self._take('punct', ')')
+            if value not in _XPATH_FUNCTIONS:
+                raise InvalidSelectorException(f"Unsupported XPath function: {value}()")
+            return ('call', value, tuple(arguments))
+        if (kind, value) == ('punct', '('):
+            self._take()
+            expression = self._or()
+            self._take('punct', ')')
+            return expression
+        raise InvalidSelectorException(f"Unsupported XPath expression: {self.path!r}")
+
+
+def evaluate_xpath(root, path):
+    """
+    Evaluate an XPath expression of the supported subset.
+    
+    Args:
+        root: Context element, absolute paths are evaluated from its document
+        path: XPath expression
+        
+    Returns:
+        list: Matching elements in document order
+    """
+    absolute, steps = compile_xpath(path)
+    context = [root.document if absolute else root]
+    
+    for axis, test, predicates in steps:
+        if test == '.':
+            continue
+        if test == '..':
+            parents = {id(node.parent): node.parent for node in context
+                       if node.parent is not None and node.parent.tag != '#document'}
+            context = sorted(parents.values(), key=lambda node: node.order)
+            continue
+        
+        parents = context
+        if axis == 'descendant':
+            parents = {}
+            for node in context:
+                parents[id(node)] = node
+                for descendant in node.iter_descendants():
+                    parents[id(descendant)] = descendant
+            parents = parents.values()
+        
+        matched = {}
+        for parent in parents:
+            candidates = [child for child in parent.element_children() if test == '*' or child.tag == test]
+            for predicate in predicates:
+                candidates = [
+                    candidate for position, candidate in enumerate(candidates, 1)
+                    if _predicate_holds(predicate, candidate, position, len(candidates))
+                ]
+            for candidate in candidates:
+                matched[id(candidate)] = candidate
+        context = sorted(matched.values(), key=lambda node: node.order)
+    
+    return [node for node in context if node is not root.document]
+
+
+def _predicate_holds(predicate, node, position, size):
+    value = _evaluate(predicate, node, position, size)
+    if predicate[0] == 'number' or isinstance(value, float):
+        return position == value
+    return _to_boolean(value)
+
+
+def _evaluate(expression, node, position, size):
+    kind = expression[0]
+    if kind == 'literal':
+        return expression[1]
+    if kind == 'number':
+        return expression[1]
+    if kind == 'attr':
+        return node.attrs.get(expression[1])
+    if kind == 'string-value':
+        return node.text_content()
+    if kind == 'and':
+        return (_to_boolean(_evaluate(expression[1], node, position, size))
+                and _to_boolean(_evaluate(expression[2], node, position, size)))
+    if kind == 'or':
+        return (_to_boolean(_evaluate(expression[1], node, position, size))
+                or _to_boolean(_evaluate(expression[2], node, position, size)))
+    if kind == 'compare':
+        _, op, left, right = expression
+        return _compare(op, _evaluate(left, node, position, size), _evaluate(right, node, position, size))
+    
+    _, name, arguments = expression
+    values = [_evaluate(argument, node, position, size) for argument in arguments]
+    if name == 'text':
+        return node.own_text()
+    if name == 'position':
+        return float(position)
+    if name == 'last':
+        return float(size)
+    if name == 'not':
+        return not _to_boolean(values[0])
+    if name == 'normalize-space':
+        text = _to_string(values[0]) if values else node.text_content()
+        return ' '.join(text.split())
+    if name == 'string-length':
+        return float(len(_to_string(values[0]) if values else node.text_content()))
+    if name == 'translate':
+        source, old, new = (_to_string(value) for value in values)
+        table = {ord(char): (new[index] if index < len(new) else None) for index, char in enumerate(old)}
+        return source.translate(table)
+    text, search = _to_string(values[0]), _to_string(values[1])
+    return search in text if name == 'contains' else text.startswith(search)
+
+
+def _to_string(value):
+    if value is None:
+        return ''
+    if isinstance(value, float):
+        return str(int(value)) if value.is_integer() else str(value)
+    return str(value)
+
+
+def _to_boolean(value):
+    if isinstance(value, float):
+        return value != 0
+    return bool(value)
+
+
+def _compare(op, left, right):
+    if left is None or right is None:
+        return False
+    if isinstance(left, float) or isinstance(right, float) or op in ('<', '<=', '>', '>='):
+        try:
+            left, right = float(left), float(right)
+        except ValueError:
+            return False
+    return {
+        '=': left == right, '!=': left != right,
+        '<': left < right, '<=': left <= right,
+        '>': left > right, '>=': left >= right,
+    }[op]
@@ -0,0 +1,1310 @@
+"""
+In-process fake WebDriver for browserless page-object runs.
+
+FakeDriver implements the subset of the WebDriver API used by BasePage and the
+utilities: finding elements, clicking, typing, attributes, navigation and history,
+frames, cookies, screenshots and the scripts in utils/js_scripts.py. It runs on top
+of the parsed DOM model in utils/fake_dom.py, so page-object logic can be checked in
+milliseconds without a browser. Page JavaScript and stylesheets are not run.
+
+Pages are served, in order, by routes registered with route() or register_route(),
+HTML files under FAKE_DRIVER_ROOT, and data:, file: and http(s) URLs. Select the
+driver with BROWSER=fake.
+
+Usage:
+    driver = FakeDriver()
+    driver.route('/login', '<input id="username"><button id="login-button">Log in</button>')
+    driver.route('/dashboard', lambda request: f'<p class="welcome-message">Hi {request.query["user"]}</p>')
+"""
+import base64
+import os
+import re
+import struct
+import urllib.error
+import urllib.request
+import uuid
+import zlib
+from collections import defaultdict, namedtuple
+from urllib.parse import parse_qsl, unquote, unquote_to_bytes, urlencode, urljoin, urlsplit
+from urllib.request import url2pathname
+
+from selenium.common.exceptions import (
+    ElementNotInteractableException,
+    InvalidElementStateException,
+    InvalidSessionIdException,
+    JavascriptException,
+    MoveTargetOutOfBoundsException,
+    NoAlertPresentException,
+    NoSuchElementException,
+    NoSuchFrameException,
+    NoSuchWindowException,
+    StaleElementReferenceException,
+    WebDriverException,
+)
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.webelement import WebElement
+
+from config import config
+from utils import js_scripts
+from utils.fake_dom import BOOLEAN_ATTRIBUTES, NON_TEXT_INPUTS, Element, parse_document
+
+
+# Request passed to route handlers
+FakeRequest = namedtuple('FakeRequest', ['method', 'url', 'path', 'query', 'form', 'cookies'])
+
+# Route handlers can return a Redirect instead of HTML
+Redirect = namedtuple('Redirect', ['url'])
+
+MAX_REDIRECTS = 10
+WINDOW_HANDLE = 'fake-window-1'
+
+# Key used for elements in the W3C protocol, e.g. in the origin of pointer actions
+ELEMENT_KEY = 'element-6066-11e4-a52e-4f735466cecf'
+
+# WebDriver key codes (the Keys constants) are in this range of the Unicode private use area
+KEY_CODES = frozenset(chr(code) for code in range(0xE000, 0xE060))
+
+
+def _blank_png():
+    """
+    Build a 1x1 white PNG used as the screenshot of every page.
+    """
+    def chunk(kind, data):
+        checksum = zlib.crc32(kind + data) & 0xffffffff
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', checksum)
+    return (
+        b'\x89PNG\r\n\x1a\n'
+        + chunk(b'IHDR', struct.pack('>IIBBBBB', 1, 1, 8, 2, 0, 0, 0))
+        + chunk(b'IDAT', zlib.compress(b'\x00\xff\xff\xff'))
+        + chunk(b'IEND', b'')
+    )
+
+
+SCREENSHOT_PNG = _blank_png()
+
+
+def read_attribute(node, name, base_url=None):
+    """
+    Read an attribute the way WebElement.get_attribute does.
+    
+    Properties take precedence over attributes, boolean attributes are reported as
+    'true' or None, and URLs are resolved against the document URL.
+    
+    Args:
+        node: Element to read from
+        name: Attribute or property name
+        base_url: Optional URL relative links are resolved against
+        
+    Returns:
+        str: The value, or None if the element has no such attribute
+    """
+    if name == 'value' and node.tag in ('input', 'textarea', 'select', 'option', 'button'):
+        return node.value
+    if name == 'checked' and node.input_type in ('checkbox', 'radio'):
+        return 'true' if node.checked else None
+    if name == 'selected' and node.tag == 'option':
+        return 'true' if node.selected else None
+    if name in BOOLEAN_ATTRIBUTES:
+        return 'true' if name in node.attrs else None
+    if name in ('href', 'src', 'action') and name in node.attrs:
+        return urljoin(base_url or node.document.url, node.attrs[name])
+    if name in ('innerText', 'textContent', 'innerHTML', 'outerHTML', 'tagName', 'className'):
+        return read_property(node, name, base_url)
+    return node.attrs.get(name)
+
+
+def read_property(node, name, base_url=None):
+    """
+    Read a DOM property of an element.
+    
+    Args:
+        node: Element to read from
+        name: Property name
+        base_url: Optional URL relative links are resolved against
+        
+    Returns:
+        The property value, or the attribute of the same name
+    """
+    if name == 'value':
+        return node.value
+    if name == 'checked':
+        return node.checked if node.input_type in ('checkbox', 'radio') else False
+    if name == 'selected':
+        return node.selected if node.tag == 'option' else False
+    if name == 'disabled':
+        return 'disabled' in node.attrs
+    if name == 'tagName':
+        return node.tag.upper()
+    if name == 'className':
+        return node.attrs.get('class', '')
+    if name == 'innerText':
+        return node.rendered_text()
+    if name == 'textContent':
+        return node.text_content()
+    if name == 'innerHTML':
+        return node.inner_html()
+    if name == 'outerHTML':
+        return node.outer_html()
+    if name in ('href', 'src', 'action') and name in node.attrs:
+        return urljoin(base_url or node.document.url, node.attrs[name])
+    return node.attrs.get(name)
+
+
+def _js_string(value):
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return '' if value is None else str(value)
+
+
+# Handlers of the scripts run by page objects and utilities, called with the driver and
+# the script arguments. Scripts are looked up by value, the js_scripts constants by identity.
+SCRIPT_HANDLERS = {}
+
+# Handlers of common one-line scripts, matched with regular expressions
+SNIPPET_HANDLERS = []
+
+
+def script_handler(script):
+    """
+    Register the handler of a script.
+    
+    Args:
+        script: Script text, usually a constant from utils.js_scripts
+        
+    Returns:
+        callable: Decorator registering the handler
+    """
+    def register(handler):
+        SCRIPT_HANDLERS[script] = handler
+        return handler
+    return register
+
+
+def snippet_handler(pattern):
+    """
+    Register the handler of the one-line scripts matching a regular expression.
+    
+    The handler is called with the driver, the match and the script arguments.
+    
+    Args:
+        pattern: Regular expression the stripped script must fully match
+        
+    Returns:
+        callable: Decorator registering the handler
+    """
+    def register(handler):
+        SNIPPET_HANDLERS.append((re.compile(pattern), handler))
+        return handler
+    return register
+
+
+@script_handler(js_scripts.READ_ELEMENTS)
+def _read_elements(driver, locators, attributes=None):
+    states = []
+    for by, value in locators:
+        nodes = driver.find_nodes(by, value)
+        if not nodes:
+            states.append({
+                'found': False, 'text': None, 'visible': False, 'enabled': False, 'attributes': {},
+            })
+            continue
+        node = nodes[0]
+        visible = node.is_displayed()
+        states.append({
+            'found': True,
+            'text': node.rendered_text() if visible else '',
+            'visible': visible,
+            'enabled': 'disabled' not in node.attrs,
+            'attributes': {name: read_attribute(node, name) for name in attributes or []},
+        })
+    return states
+
+
+@script_handler(js_scripts.FIND_FIRST_ELEMENTS)
+def _find_first_elements(driver, locators):
+    return [next(iter(driver.find_nodes(by, value)), None) for by, value in locators]
+
+
+@script_handler(js_scripts.FILL_FORM)
+def _fill_form(driver, fields):
+    missing = []
+    for by, selector, value in fields:
+        nodes = driver.find_nodes(by, selector)
+        if not nodes:
+            missing.append(f"{by}={selector}")
+            continue
+        node = nodes[0]
+        if node.input_type in ('checkbox', 'radio'):
+            node.checked = value if isinstance(value, bool) else str(node.value) == _js_string(value)
+        else:
+            node.value = _js_string(value)
+    return missing
+
+
+@script_handler(js_scripts.CLEAR_STORAGE)
+def _clear_storage(driver):
+    origin = driver.origin
+    driver.storage['local', origin].clear()
+    driver.storage['session', origin].clear()
+
+
+@script_handler(js_scripts.READ_STORAGE)
+def _read_storage(driver):
+    origin = driver.origin
+    return {'local': dict(driver.storage['local', origin]), 'session': dict(driver.storage['session', origin])}
+
+
+@script_handler(js_scripts.WRITE_STORAGE)
+def _write_storage(driver, local_items, session_items):
+    origin = driver.origin
+    driver.storage['local', origin].update({key: str(value) for key, value in (local_items or {}).items()})
+    driver.storage['session', origin].update({key: str(value) for key, value in (session_items or {}).items()})
+
+
+@snippet_handler(r'(?:return\s+)?arguments\[0\]\.scrollIntoView\(.*\);?')
+@snippet_handler(r'window\.scroll(?:To|By)\(.*\);?')
+def _no_op(driver, match, *args):
+    return None
+
+
+@script_handler(js_scripts.NETWORK_IDLE_TIME)
+def _network_idle_time(driver):
+    # No request is ever in flight
+    return float('inf')
+
+
+@snippet_handler(r'return\s+document\.readyState;?')
+def _ready_state(driver, match, *args):
+    return 'complete'
+
+
+@snippet_handler(r'return\s+document\.title;?')
+def _document_title(driver, match, *args):
+    return driver.context_document().title
+
+
+@snippet_handler(r'arguments\[0\]\.click\(\);?')
+def _click(driver, match, node, *args):
+    driver.wrap(node).click()
+
+
+@snippet_handler(r'return\s+arguments\[0\]\.(innerText|textContent|innerHTML|outerHTML|value|tagName);?')
+def _read_property(driver, match, node, *args):
+    return read_property(node, match.group(1))
+
+
+class FakeWebElement(WebElement):
+    """
+    WebElement of a FakeDriver, wrapping an element of the parsed document.
+    """
+    
+    def __init__(self, driver, node):
+        """
+        Initialize the element.
+        
+        Args:
+            driver (FakeDriver): Driver the element was found with
+            node (Element): Element of the parsed document
+        """
+        super().__init__(driver, f"{driver.session_id}-{node.order}")
+        self._node = node
+    
+    def __repr__(self):
+        return f"<FakeWebElement {self._node!r}>"
+    
+    def __eq__(self, other):
+        return isinstance(other, FakeWebElement) and other._node is self._node
+    
+    def __hash__(self):
+        return hash(self._id)
+    
+    @property
+    def node(self):
+        """
+        Element of the parsed document.
+        
+        Raises:
+            StaleElementReferenceException: If the document was navigated away from
+        """
+        if not self._node.is_connected():
+            raise StaleElementReferenceException(
+                "stale element reference: element is not attached to the page document"
+            )
+        return self._node
+    
+    @property
+    def tag_name(self):
+        return self.node.tag
+    
+    @property
+    def text(self):
+        """
+        Rendered text of the element, without the text of hidden descendants.
+        """
+        return self.node.rendered_text()
+    
+    @property
+    def location(self):
+        """
+        Location of the element. Nothing is laid out, so it is always the origin.
+        """
+        return {'x': 0, 'y': 0}
+    
+    @property
+    def size(self):
+        """
+        Size of the element. Nothing is laid out, so it is always empty.
+        """
+        return {'height': 0, 'width': 0}
+    
+    @property
+    def rect(self):
+        """
+        Location and size of the element. Nothing is laid out, so it is always empty.
+        """
+        return {'x': 0, 'y': 0, 'height': 0, 'width': 0}
+    
+    @property
+    def screenshot_as_png(self):
+        """
+        Screenshot of the element as PNG bytes, a white 1x1 image.
+        """
+        return SCREENSHOT_PNG
+    
+    @property
+    def screenshot_as_base64(self):
+        """
+        Screenshot of the element as a base64 encoded PNG, a white 1x1 image.
+        """
+        return base64.b64encode(SCREENSHOT_PNG).decode('ascii')
+    
+    def screenshot(self, filename):
+        """
+        Save a screenshot of the element, a white 1x1 PNG.
+        """
+        with open(filename, 'wb') as screenshot_file:
+            screenshot_file.write(SCREENSHOT_PNG)
+        return True
+    
+    def get_attribute(self, name):
+        return read_attribute(self.node, name)
+    
+    def get_dom_attribute(self, name):
+        return self.node.attrs.get(name)
+    
+    def get_property(self, name):
+        return read_property(self.node, name)
+    
+    def value_of_css_property(self, property_name):
+        """
+        Read from the inline style. Stylesheets are not applied, except that hidden
+        elements have display 'none'.
+        """
+        node = self.node
+        if property_name == 'display' and not node.is_displayed():
+            return 'none'
+        declarations = dict(
+            (name.strip().lower(), value.strip())
+            for name, _, value in (
+                declaration.partition(':') for declaration in node.attrs.get('style', '').split(';')
+            ) if name.strip()
+        )
+        return declarations.get(property_name, '')
+    
+    def is_displayed(self):
+        """
+        Visibility follows the rules of utils/fake_dom.py, nothing is laid out.
+        """
+        return self.node.is_displayed()
+    
+    def is_enabled(self):
+        return self.node.is_enabled()
+    
+    def is_selected(self):
+        node = self.node
+        if node.tag == 'option':
+            return node.selected
+        return node.input_type in ('checkbox', 'radio') and node.checked
+    
+    def find_element(self, by=By.ID, value=None):
+        nodes = self._parent.find_nodes(by, value, self.node)
+        if not nodes:
+            raise NoSuchElementException(f"no such element: Unable to locate element: {by}={value}")
+        return self._parent.wrap(nodes[0])
+    
+    def find_elements(self, by=By.ID, value=None):
+        return [self._parent.wrap(node) for node in self._parent.find_nodes(by, value, self.node)]
+    
+    def click(self):
+        """
+        Click the element, running its default action: toggling checkboxes and radio
+        buttons, selecting options, following links and submitting forms.
+        """
+        node = self._interactable_node()
+        self._parent.focused = node
+        if not node.is_enabled() or not self._parent.run_click_handlers(node):
+            return
+        
+        if node.tag == 'label':
+            control = self._labelled_control(node)
+            if control is not None and control is not node:
+                self._parent.wrap(control).click()
+            return
+        if node.tag == 'option':
+            select = node.closest('select')
+            node.selected = not node.selected if select is not None and 'multiple' in select.attrs else True
+            return
+        if node.input_type == 'checkbox':
+            node.checked = not node.checked
+            return
+        if node.input_type == 'radio':
+            node.checked = True
+            return
+        
+        link = node.closest('a')
+        if link is not None and 'href' in link.attrs:
+            self._parent.follow_link(link)
+            return
+        
+        button_type = node.attrs.get('type', 'submit').lower()
+        if (node.tag == 'button' and button_type == 'submit') or node.input_type in ('submit', 'image'):
+            form = node.form()
+            if form is not None:
+                self._parent.submit_form(form)
+    
+    def send_keys(self, *value):
+        """
+        Type into the element. Enter submits the form of a text input.
+        """
+        node = self._interactable_node()
+        if not node.is_enabled():
+            raise ElementNotInteractableException("element not interactable: element is disabled")
+        text = ''.join(str(part) for part in value).replace(Keys.SPACE, ' ')
+        self._parent.focused = node
+        
+        if node.input_type == 'file':
+            node.value = text
+            return
+        if node.tag == 'select':
+            typed = ''.join(char for char in text if char not in KEY_CODES).lower()
+            match = next((option for option in node.options()
+                          if option.rendered_text().lower().startswith(typed)), None)
+            if typed and match is not None:
+                match.selected = True
+            return
+        
+        editable = node.tag == 'textarea' or (node.tag == 'input' and node.input_type not in NON_TEXT_INPUTS)
+        if not editable:
+            # Enter activates buttons and links, space activates buttons and toggles
+            button = node.tag == 'button' or node.input_type in ('submit', 'button', 'reset', 'image')
+            pressed_enter = Keys.ENTER in text or Keys.RETURN in text
+            if (pressed_enter and (button or node.tag == 'a')) or (' ' in text and (
+                    button or node.input_type in ('checkbox', 'radio'))):
+                self.click()
+            return
+        if 'readonly' in node.attrs:
+            return
+        
+        max_length = int(node.attrs['maxlength']) if node.attrs.get('maxlength', '').isdigit() else None
+        for char in text:
+            current = node.value
+            if char in (Keys.ENTER, Keys.RETURN):
+                if node.tag == 'textarea':
+                    node.value = current + '\n'
+                    continue
+                form = node.form()
+                if form is not None:
+                    self._parent.submit_form(form)
+                return
+            if char == Keys.BACKSPACE:
+                node.value = current[:-1]
+            elif char not in KEY_CODES and (max_length is None or len(current) < max_length):
+                node.value = current + char
+    
+    def clear(self):
+        """
+        Clear the value of a text input or textarea.
+        """
+        node = self._interactable_node()
+        if not node.is_enabled() or 'readonly' in node.attrs:
+            raise InvalidElementStateException("invalid element state: element must be user-editable")
+        if node.tag == 'textarea' or (node.tag == 'input' and node.input_type not in NON_TEXT_INPUTS):
+            node.value = ''
+    
+    def submit(self):
+        """
+        Submit the form the element belongs to.
+        """
+        node = self.node
+        form = node if node.tag == 'form' else node.form()
+        if form is None:
+            raise WebDriverException("To submit an element, it must be nested inside a form element")
+        self._parent.submit_form(form)
+    
+    def _interactable_node(self):
+        """
+        Get the element of the parsed document, if it can be interacted with.
+        
+        Raises:
+            ElementNotInteractableException: If the element is not displayed
+        """
+        node = self.node
+        if not node.is_displayed():
+            raise ElementNotInteractableException("element not interactable")
+        return node
+    
+    def _labelled_control(self, label):
+        """
+        Get the form control of a label, by its for attribute or as the first control
+        inside the label.
+        
+        Args:
+            label: Label element of the parsed document
+            
+        Returns:
+            Element: The control, or None if the label has none
+        """
+        control_id = label.attrs.get('for')
+        if control_id:
+            return next((element for element in label.document.iter_descendants()
+                         if element.attrs.get('id') == control_id), None)
+        return next((element for element in label.iter_descendants()
+                     if element.tag in ('input', 'select', 'textarea', 'button')), None)
+
+
+class FakeSwitchTo:
+    """
+    switch_to of a FakeDriver.
+    """
+    
+    def __init__(self, driver):
+        self._driver = driver
+    
+    @property
+    def active_element(self):
+        driver = self._driver
+        focused = driver.focused
+        if focused is None or not focused.is_connected():
+            focused = driver.context_document().body
+        return driver.wrap(focused)
+    
+    @property
+    def alert(self):
+        """
+        No alert ever opens, as page scripts are not run.
+        """
+        raise NoAlertPresentException("no such alert")
+    
+    def frame(self, frame_reference):
+        self._driver.enter_frame(frame_reference)
+    
+    def default_content(self):
+        self._driver.frames.clear()
+    
+    def parent_frame(self):
+        if self._driver.frames:
+            self._driver.frames.pop()
+    
+    def window(self, window_name):
+        """
+        Switch to a window. The fake driver has a single window.
+        """
+        if window_name not in self._driver.window_handles:
+            raise NoSuchWindowException(f"no such window: {window_name}")
+
+
+class FakeDriver:
+    """
+    In-process WebDriver working on parsed HTML documents instead of a browser.
+    
+    Routes map URLs or paths to HTML, or to callables taking a FakeRequest and
+    returning HTML or a Redirect. Routes registered with register_route() are shared
+    by every FakeDriver, e.g. the pages of a mocked application.
+    
+    Methods of the driver, its elements and its switch_to without a docstring behave
+    like their counterparts in Selenium.
+    """
+    
+    name = 'fake'
+    
+    # Routes shared by every driver, see register_route()
+    default_routes = {}
+    
+    def __init__(self, routes=None, root=None, allow_network=True):
+        """
+        Initialize the driver on a blank page.
+        
+        Args:
+            routes: Optional mapping of URL or path to HTML or handler
+            root: Optional directory of HTML files served for unrouted paths,
+                defaults to FAKE_DRIVER_ROOT from config
+            allow_network: Whether unrouted http(s) URLs are fetched over the network
+        """
+        self.routes = dict(FakeDriver.default_routes)
+        self.routes.update(routes or {})
+        self.root = root if root is not None else config.FAKE_DRIVER_ROOT
+        self.allow_network = allow_network
+        self.session_id = uuid.uuid4().hex
+        self.capabilities = {'browserName': self.name, 'browserVersion': '1.0', 'pageLoadStrategy': 'normal'}
+        self.switch_to = FakeSwitchTo(self)
+        self.frames = []
+        self.focused = None
+        self.storage = defaultdict(dict)
+        self.timeouts = {'implicit': 0, 'pageLoad': 300, 'script': 30}
+        self._document = parse_document('', 'about:blank')
+        self._history = []
+        self._history_index = -1
+        self._cookies = {}
+        self._click_handlers = []
+        self._window_rect = {'x': 0, 'y': 0, 'width': 1920, 'height': 1080}
+        self._pointer = None
+        self._pressed = None
+        self._quit = False
+    
+    # Routes
+    
+    @classmethod
+    def register_route(cls, pattern, response):
+        """
+        Register a route shared by every FakeDriver created afterwards.
+        
+        Args:
+            pattern: Full URL or path, e.g. '/login'
+            response: HTML, or a callable taking a FakeRequest and returning HTML or a Redirect
+        """
+        cls.default_routes[pattern] = response
+    
+    def route(self, pattern, response):
+        """
+        Register a route of this driver.
+        
+        Args:
+            pattern: Full URL or path, e.g. '/login'
+            response: HTML, or a callable taking a FakeRequest and returning HTML or a Redirect
+            
+        Returns:
+            FakeDriver: The driver
+        """
+        self.routes[pattern] = response
+        return self
+    
+    def on_click(self, locator, callback):
+        """
+        Run a callback when an element matching a locator is clicked, e.g. to reveal
+        content that the page would show with JavaScript.
+        
+        Args:
+            locator: Tuple of (By, selector)
+            callback: Callable taking the driver and the clicked FakeWebElement. If it
+                returns False, the default action of the click is skipped.
+                
+        Returns:
+            FakeDriver: The driver
+        """
+        self._click_handlers.append((tuple(locator), callback))
+        return self
+    
+    # Navigation
+    
+    @property
+    def current_url(self):
+        self._check_session()
+        return self._document.url
+    
+    @property
+    def title(self):
+        self._check_session()
+        return self._document.title
+    
+    @property
+    def page_source(self):
+        """
+        HTML of the document of the current browsing context.
+        """
+        self._check_session()
+        return self.context_document().inner_html()
+    
+    @property
+    def origin(self):
+        """
+        Origin of the current document, used to key web storage.
+        """
+        parts = urlsplit(self._document.url)
+        return f"{parts.scheme}://{parts.netloc}"
+    
+    def get(self, url):
+        """
+        Load a URL from the routes, FAKE_DRIVER_ROOT or the network.
+        """
+        self._check_session()
+        self._navigate(url)
+    
+    def refresh(self):
+        self._check_session()
+        self._navigate(self._document.url, push=False)
+    
+    def back(self):
+        self._check_session()
+        if self._history_index > 0:
+            self._history_index -= 1
+            self._navigate(self._history[self._history_index], push=False)
+    
+    def forward(self):
+        self._check_session()
+        if self._history_index < len(self._history) - 1:
+            self._history_index += 1
+            self._navigate(self._history[self._history_index], push=False)
+    
+    def follow_link(self, link):
+        """
+        Navigate to the target of a link element.
+        
+        Args:
+            link: Anchor element of the current document
+        """
+        href = link.attrs['href']
+        if href.startswith('javascript:'):
+            return
+        url = urljoin(link.document.url, href)
+        current = urlsplit(self._document.url)
+        target = urlsplit(url)
+        if target.fragment and target._replace(fragment='') == current._replace(fragment=''):
+            # In-page anchors only change the URL
+            self._document.url = url
+            self._push_history(url)
+            return
+        self._navigate(url)
+    
+    def submit_form(self, form):
+        """
+        Submit a form element to its action URL.
+        
+        Args:
+            form: Form element of the current document
+        """
+        action = urljoin(form.document.url, form.attrs.get('action', ''))
+        data = form.form_data()
+        if form.attrs.get('method', 'get').lower() == 'post':
+            self._navigate(action, 'POST', data)
+        else:
+            self._navigate(urlsplit(action)._replace(query=urlencode(data), fragment='').geturl())
+    
+    def _navigate(self, url, method='GET', form=None, push=True):
+        """
+        Load a URL into a new document, making the elements of the old one stale.
+        
+        Args:
+            url: URL to load
+            method: 'GET' or 'POST'
+            form: Optional form fields posted to the URL
+            push: Whether to add the URL to the history
+        """
+        html, url = self._fetch(url, method, form)
+        self._deactivate(self._document)
+        self._document = parse_document(html, url)
+        self.frames.clear()
+        self.focused = None
+        if push:
+            self._push_history(url)
+    
+    def _push_history(self, url):
+        """
+        Add a URL to the history, dropping the entries after the current one.
+        
+        Args:
+            url: URL to add
+        """
+        del self._history[self._history_index + 1:]
+        self._history.append(url)
+        self._history_index = len(self._history) - 1
+    
+    def _deactivate(self, document):
+        """
+        Detach a document and the documents of its frames, so their elements turn stale.
+        
+        Args:
+            document: Parsed document
+        """
+        document.active = False
+        for element in document.iter_descendants():
+            frame_document = getattr(element, 'content_document', None)
+            if frame_document is not None:
+                self._deactivate(frame_document)
+    
+    def _fetch(self, url, method='GET', form=None):
+        """
+        Get the HTML of a URL, following redirects.
+        
+        Returns:
+            tuple: (HTML, final URL)
+        """
+        for _ in range(MAX_REDIRECTS):
+            response = self._request(url, method, form)
+            if not isinstance(response, Redirect):
+                return response, url
+            url, method, form = urljoin(url, response.url), 'GET', None
+        raise WebDriverException(f"unknown error: net::ERR_TOO_MANY_REDIRECTS loading {url}")
+    
+    def _request(self, url, method, form):
+        """
+        Get the response to a request from the routes, the URL itself, FAKE_DRIVER_ROOT
+        or the network.
+        
+        Args:
+            url: URL to request
+            method: 'GET' or 'POST'
+            form: Optional form fields posted to the URL
+            
+        Returns:
+            str or Redirect: HTML, or a redirect to follow
+            
+        Raises:
+            WebDriverException: If nothing serves the URL
+        """
+        parts = urlsplit(url)
+        query = dict(parse_qsl(parts.query, keep_blank_values=True))
+        request = FakeRequest(
+            method, url, parts.path or '/', query, dict(form or {}),
+            {name: cookie['value'] for name, cookie in self._cookies.items()},
+        )
+        
+        response = self.routes.get(parts._replace(query='', fragment='').geturl())
+        if response is None and parts.scheme in ('http', 'https', ''):
+            response = self.routes.get(request.path)
+        if response is not None:
+            return response(request) if callable(response) else response
+        
+        if parts.scheme == 'about':
+            return ''
+        if parts.scheme == 'data':
+            header, _, data = url[len('data:'):].partition(',')
+            if header.endswith(';base64'):
+                return base64.b64decode(unquote_to_bytes(data)).decode('utf-8', 'replace')
+            return unquote(data)
+        if parts.scheme == 'file':
+            return self._read_file(url2pathname(parts.path), url)
+        if self.root:
+            html = self._read_root(request.path)
+            if html is not None:
+                return html
+        if parts.scheme in ('http', 'https') and self.allow_network:
+            return self._download(url, method, form)
+        raise WebDriverException(f"unknown error: net::ERR_NAME_NOT_RESOLVED, no route for {url}")
+    
+    def _read_root(self, path):
+        """
+        Read the HTML file of a path under the root directory: the path itself, its
+        index.html or the path with .html appended.
+        
+        Args:
+            path: URL path
+            
+        Returns:
+            str: HTML, or None if there is no such file
+        """
+        path = os.path.normpath(unquote(path).lstrip('/')) if path.strip('/') else ''
+        if path.startswith('..'):
+            return None
+        base = os.path.join(self.root, path)
+        for candidate in (os.path.join(base, 'index.html'), base, f"{base}.html"):
+            if os.path.isfile(candidate):
+                return self._read_file(candidate, path)
+        return None
+    
+    @staticmethod
+    def _read_file(path, url):
+        """
+        Read an HTML file.
+        
+        Args:
+            path: File path
+            url: URL of the file, for the error message
+            
+        Returns:
+            str: HTML
+            
+        Raises:
+            WebDriverException: If the file cannot be read
+        """
+        try:
+            with open(path, encoding='utf-8', errors='replace') as html_file:
+                return html_file.read()
+        except OSError:
+            raise WebDriverException(f"unknown error: net::ERR_FILE_NOT_FOUND loading {url}")
+    
+    def _download(self, url, method, form):
+        """
+        Fetch a URL over the network, sending the cookies of the driver.
+        
+        Args:
+            url: http(s) URL
+            method: 'GET' or 'POST'
+            form: Optional form fields posted to the URL
+            
+        Returns:
+            str: HTML, also for HTTP error responses
+            
+        Raises:
+            WebDriverException: If the server cannot be reached
+        """
+        data = urlencode(form or {}).encode() if method == 'POST' else None
+        request = urllib.request.Request(url, data=data, method=method)
+        if self._cookies:
+            cookies = '; '.join(f"{name}={cookie['value']}" for name, cookie in self._cookies.items())
+            request.add_header('Cookie', cookies)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeouts['pageLoad']) as response:
+                return response.read().decode(response.headers.get_content_charset() or 'utf-8', 'replace')
+        except urllib.error.HTTPError as error:
+            # Browsers render the error page of the server
+            return error.read().decode('utf-8', 'replace')
+        except (urllib.error.URLError, OSError) as error:
+            raise WebDriverException(f"unknown error: net::ERR_CONNECTION_FAILED loading {url}: {error}")
+    
+    # Elements
+    
+    def context_document(self):
+        """
+        Get the document of the current browsing context: the top-level document or a frame.
+        """
+        return self.frames[-1] if self.frames else self._document
+    
+    def find_nodes(self, by, value, root=None):
+        """
+        Find the parsed elements matching a locator in the current browsing context.
+        
+        Args:
+            by: Locator strategy, one of Selenium's By values
+            value: Selector
+            root: Optional element to search under
+            
+        Returns:
+            list: Matching Elements
+        """
+        self._check_session()
+        document = self.context_document()
+        if root is not None and by == By.XPATH and value.lstrip().startswith('/'):
+            root = None
+        return document.find_all(by, value, root)
+    
+    def wrap(self, node):
+        """
+        Wrap a parsed element in a FakeWebElement.
+        """
+        return FakeWebElement(self, node)
+    
+    def find_element(self, by=By.ID, value=None):
+        nodes = self.find_nodes(by, value)
+        if not nodes:
+            raise NoSuchElementException(f"no such element: Unable to locate element: {by}={value}")
+        return self.wrap(nodes[0])
+    
+    def find_elements(self, by=By.ID, value=None):
+        return [self.wrap(node) for node in self.find_nodes(by, value)]
+    
+    def run_click_handlers(self, node):
+        """
+        Run the on_click callbacks matching a clicked element.
+        
+        Returns:
+            bool: False if a callback cancelled the default action
+        """
+        run_default = True
+        for (by, value), callback in list(self._click_handlers):
+            if any(match is node for match in self.find_nodes(by, value)):
+                if callback(self, self.wrap(node)) is False:
+                    run_default = False
+        return run_default
+    
+    def enter_frame(self, frame_reference):
+        """
+        Switch to a frame by element, index, name or id.
+        """
+        self._check_session()
+        document = self.context_document()
+        frames = [element for element in document.iter_descendants() if element.tag in ('iframe', 'frame')]
+        if isinstance(frame_reference, FakeWebElement):
+            node = frame_reference.node
+        elif isinstance(frame_reference, int):
+            node = frames[frame_reference] if 0 <= frame_reference < len(frames) else None
+        else:
+            node = next((frame for frame in frames if frame_reference in
+                         (frame.attrs.get('name'), frame.attrs.get('id'))), None)
+        if node is None or node.tag not in ('iframe', 'frame'):
+            raise NoSuchFrameException(f"no such frame: {frame_reference}")
+        
+        if getattr(node, 'content_document', None) is None:
+            if 'srcdoc' in node.attrs:
+                html, url = node.attrs['srcdoc'], 'about:srcdoc'
+            else:
+                html, url = self._fetch(urljoin(document.url, node.attrs.get('src') or 'about:blank'))
+            node.content_document = parse_document(html, url)
+        self.frames.append(node.content_document)
+    
+    # Scripts
+    
+    def execute_script(self, script, *args):
+        """
+        Run a script known to the fake driver, see SCRIPT_HANDLERS and SNIPPET_HANDLERS.
+        
+        Raises:
+            JavascriptException: If the script is not supported
+        """
+        self._check_session()
+        args = [self._unwrap(arg) for arg in args]
+        handler = SCRIPT_HANDLERS.get(script)
+        if handler is not None:
+            return self._wrap_result(handler(self, *args))
+        
+        stripped = script.strip()
+        for pattern, snippet in SNIPPET_HANDLERS:
+            match = pattern.fullmatch(stripped)
+            if match:
+                return self._wrap_result(snippet(self, match, *args))
+        raise JavascriptException(
+            f"javascript error: script not supported by the fake driver: {stripped[:80]!r}"
+        )
+    
+    def execute_async_script(self, script, *args):
+        """
+        Run an asynchronous script. Not supported, so waits fall back to polling from
+        the client.
+        
+        Raises:
+            NotImplementedError: Always
+        """
+        raise NotImplementedError("The fake driver does not run async scripts")
+    
+    def execute(self, driver_command, params=None):
+        """
+        Execute a raw WebDriver command. Only the actions used by ActionChains are supported.
+        """
+        self._check_session()
+        if driver_command == Command.W3C_ACTIONS:
+            for source in (params or {}).get('actions', []):
+                for action in source.get('actions', []):
+                    self._perform_action(action)
+            return {'value': None}
+        if driver_command == Command.W3C_CLEAR_ACTIONS:
+            self._pressed = None
+            return {'value': None}
+        raise WebDriverException(f"unknown command: {driver_command} is not supported by the fake driver")
+    
+    def _perform_action(self, action):
+        """
+        Perform one action of an ActionChains sequence: pointer moves, presses and
+        releases (a press and release on the same element clicks it) and key presses.
+        
+        Args:
+            action: W3C action
+        """
+        kind = action.get('type')
+        if kind == 'pointerMove':
+            origin = action.get('origin')
+            if isinstance(origin, dict):
+                origin = next((element for element in self.context_document().iter_descendants()
+                               if f"{self.session_id}-{element.order}" == origin.get(ELEMENT_KEY)), None)
+                origin = self.wrap(origin) if origin is not None else None
+            if isinstance(origin, FakeWebElement) and not origin.is_displayed():
+                raise MoveTargetOutOfBoundsException("move target out of bounds")
+            if isinstance(origin, FakeWebElement):
+                self._pointer = origin
+        elif kind == 'pointerDown':
+            self._pressed = self._pointer
+        elif kind == 'pointerUp':
+            target, self._pressed = self._pressed, None
+            if target is not None and target == self._pointer:
+                target.click()
+        elif kind == 'keyDown' and self.focused is not None and action.get('value') not in KEY_CODES:
+            self.wrap(self.focused).send_keys(action['value'])
+    
+    def _unwrap(self, value):
+        """
+        Replace the FakeWebElements in script arguments by their parsed elements.
+        
+        Args:
+            value: Script argument
+            
+        Returns:
+            The argument with parsed elements
+        """
+        if isinstance(value, FakeWebElement):
+            return value.node
+        if isinstance(value, (list, tuple)):
+            return [self._unwrap(item) for item in value]
+        if isinstance(value, dict):
+            return {key: self._unwrap(item) for key, item in value.items()}
+        return value
+    
+    def _wrap_result(self, value):
+        """
+        Replace the parsed elements in a script result by FakeWebElements.
+        
+        Args:
+            value: Script result
+            
+        Returns:
+            The result with FakeWebElements
+        """
+        if isinstance(value, Element):
+            return self.wrap(value)
+        if isinstance(value, (list, tuple)):
+            return [self._wrap_result(item) for item in value]
+        if isinstance(value, dict):
+            return {key: self._wrap_result(item) for key, item in value.items()}
+        return value
+    
+    # Cookies
+    
+    def get_cookies(self):
+        self._check_session()
+        return [dict(cookie) for cookie in self._cookies.values()]
+    
+    def get_cookie(self, name):
+        self._check_session()
+        cookie = self._cookies.get(name)
+        return dict(cookie) if cookie else None
+    
+    def add_cookie(self, cookie_dict):
+        """
+        Add a cookie, defaulting its domain to the host of the current document.
+        """
+        self._check_session()
+        if 'name' not in cookie_dict or 'value' not in cookie_dict:
+            raise WebDriverException("invalid argument: cookies need a name and a value")
+        cookie = {
+            'path': '/', 'domain': urlsplit(self._document.url).hostname, 'secure': False, 'httpOnly': False,
+        }
+        cookie.update(cookie_dict)
+        self._cookies[cookie['name']] = cookie
+    
+    def delete_cookie(self, name):
+        self._check_session()
+        self._cookies.pop(name, None)
+    
+    def delete_all_cookies(self):
+        self._check_session()
+        self._cookies.clear()
+    
+    # Windows, timeouts and screenshots
+    
+    @property
+    def window_handles(self):
+        """
+        Handles of the open windows, always the single window of the fake driver.
+        """
+        self._check_session()
+        return [WINDOW_HANDLE]
+    
+    @property
+    def current_window_handle(self):
+        self._check_session()
+        return WINDOW_HANDLE
+    
+    def close(self):
+        """
+        Close the window, which quits the driver as it is the only window.
+        """
+        self.quit()
+    
+    def quit(self):
+        self._quit = True
+        self._deactivate(self._document)
+    
+    def implicitly_wait(self, time_to_wait):
+        """
+        Set the implicit wait timeout. It is only recorded: lookups never wait.
+        
+        Args:
+            time_to_wait: Timeout in seconds
+        """
+        self.timeouts['implicit'] = time_to_wait
+    
+    def set_page_load_timeout(self, time_to_wait):
+        """
+        Set the page load timeout, used as the timeout of network requests.
+        """
+        self.timeouts['pageLoad'] = time_to_wait
+    
+    def set_script_timeout(self, time_to_wait):
+        """
+        Only recorded, as scripts run synchronously.
+        """
+        self.timeouts['script'] = time_to_wait
+    
+    def set_window_size(self, width, height, windowHandle='current'):
+        """
+        Only recorded, as nothing is laid out.
+        """
+        self._window_rect.update(width=int(width), height=int(height))
+    
+    def get_window_size(self, windowHandle='current'):
+        return {'width': self._window_rect['width'], 'height': self._window_rect['height']}
+    
+    def set_window_rect(self, x=None, y=None, width=None, height=None):
+        """
+        Only recorded, as nothing is laid out.
+        """
+        rect = {'x': x, 'y': y, 'width': width, 'height': height}
+        self._window_rect.update({key: value for key, value in rect.items() if value is not None})
+        return dict(self._window_rect)
+    
+    def get_window_rect(self):
+        return dict(self._window_rect)
+    
+    def maximize_window(self):
+        """
+        Maximize the window. Nothing is laid out, so it does nothing.
+        """
+        pass
+    
+    def minimize_window(self):
+        """
+        Minimize the window. Nothing is laid out, so it does nothing.
+        """
+        pass
+    
+    def fullscreen_window(self):
+        """
+        Make the window full screen. Nothing is laid out, so it does nothing.
+        """
+        pass
+    
+    def get_screenshot_as_png(self):
+        """
+        Take a screenshot, a white 1x1 PNG.
+        """
+        self._check_session()
+        return SCREENSHOT_PNG
+    
+    def get_screenshot_as_base64(self):
+        """
+        Take a screenshot, a white 1x1 PNG, base64 encoded.
+        """
+        return base64.b64encode(self.get_screenshot_as_png()).decode('ascii')
+    
+    def get_screenshot_as_file(self, filename):
+        """
+        Save a screenshot, a white 1x1 PNG.
+        """
+        with open(filename, 'wb') as screenshot_file:
+            screenshot_file.write(self.get_screenshot_as_png())
+        return True
+    
+    def save_screenshot(self, filename):
+        """
+        Save a screenshot, a white 1x1 PNG.
+        """
+        return self.get_screenshot_as_file(filename)
+    
+    def _check_session(self):
+        """
+        Check that the driver has not quit.
+        
+        Raises:
+            InvalidSessionIdException: If the driver has quit
+        """
+        if self._quit:
+            raise InvalidSessionIdException("invalid session id: the fake driver has quit")
@@ -1,28 +1,33 @@
 """
 Helper functions for the test framework.
 """
-import os
-import time
-import random
-import string
 from datetime import datetime
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
-from config import config
+from utils.artifact_store import artifact_store
+from utils.data_factory import data_factory
+from utils.screenshot_pipeline import screenshot_pipeline
+from utils.test_data_registry import TestDataKeyError, test_data_registry
+from utils.waits import WaitEngine
+
+
+# Default of get_nested_value() telling a missing path from a None value
+_MISSING = object()
 
 
 def take_screenshot(driver, name=None):
     """
     Take a screenshot and save it to the screenshots directory.
     
+    The screenshot is encoded and written in the background by the screenshot pipeline,
+    call screenshot_pipeline.flush() before reading the file.
+    
     Args:
         driver: WebDriver instance
         name: Optional name for the screenshot
         
     Returns:
-        str: Path to the saved screenshot
+        str: Path to the saved screenshot, or to an identical earlier screenshot
     """
     if name is None:
         name = f"screenshot_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
@@ -32,15 +37,11 @@ def take_screenshot(driver, name=None):
     
     # Add timestamp to prevent overwriting
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    filename = f"{name}_{timestamp}.png"
-    
-    screenshot_path = os.path.join(config.SCREENSHOT_DIR, filename)
-    driver.save_screenshot(screenshot_path)
-    
-    return screenshot_path
+    on_written = artifact_store.recorder('screenshot')
+    return screenshot_pipeline.capture(driver, f"{name}_{timestamp}", on_written=on_written)
 
 
-def wait_for_element(driver, locator, timeout=None):
+def wait_for_element(driver, locator, timeout=None, backend=None):
     """
     Wait for an element to be present and visible.
     
@@ -48,6 +49,7 @@ def wait_for_element(driver, locator, timeout=None):
         driver: WebDriver instance
         locator: Tuple of (By, selector)
         timeout: Optional timeout in seconds
+        backend: Optional wait backend, 'polling' or 'observer', defaults to WAIT_BACKEND from config
         
     Returns:
         WebElement: The found element
@@ -55,12 +57,10 @@ def wait_for_element(driver, locator, timeout=None):
     Raises:
         TimeoutException: If the element is not found within the timeout
     """
-    timeout = timeout or config.IMPLICIT_WAIT
-    wait = WebDriverWait(driver, timeout)
-    return wait.until(EC.visibility_of_element_located(locator))
+    return WaitEngine.for_driver(driver).wait_for_locator(locator, 'visible', timeout, backend)
 
 
-def wait_for_element_clickable(driver, locator, timeout=None):
+def wait_for_element_clickable(driver, locator, timeout=None, backend=None):
     """
     Wait for an element to be clickable.
     
@@ -68,6 +68,7 @@ def wait_for_element_clickable(driver, locator, timeout=None):
         driver: WebDriver instance
         locator: Tuple of (By, selector)
         timeout: Optional timeout in seconds
+        backend: Optional wait backend, 'polling' or 'observer', defaults to WAIT_BACKEND from config
         
     Returns:
         WebElement: The found element
@@ -75,9 +76,7 @@ def wait_for_element_clickable(driver, locator, timeout=None):
     Raises:
         TimeoutException: If the element is not clickable within the timeout
     """
-    timeout = timeout or config.IMPLICIT_WAIT
-    wait = WebDriverWait(driver, timeout)
-    return wait.until(EC.element_to_be_clickable(locator))
+    return WaitEngine.for_driver(driver).wait_for_locator(locator, 'clickable', timeout, backend)
 
 
 def is_element_present(driver, locator, timeout=5):
@@ -101,61 +100,57 @@ def is_element_present(driver, locator, timeout=5):
 
 def generate_random_string(length=10):
     """
-    Generate a random string of fixed length.
+    Generate a random string of fixed length, reproducible from the data factory seed
+    of the scenario, see utils/data_factory.py.
     
     Args:
         length: Length of the string
         
     Returns:
-        str: Random string
+        str: Random string of letters and digits
     """
-    letters = string.ascii_letters + string.digits
-    return ''.join(random.choice(letters) for _ in range(length))
+    return data_factory.text(length)
 
 
 def parse_test_data(data_key, data_dict=None):
     """
-    Parse test data from the test_data module or a provided dictionary.
+    Get test data from the test data registry or a provided dictionary.
     
     Args:
-        data_key: Key to look up in the data dictionary
+        data_key: Namespaced key such as 'user.minor_user' or 'form.registration', or a key
+            only one namespace has, or 'feed.<name>' for the worker's shard of a data feed,
+            see utils/test_data_registry.py. With data_dict, a key or a field path such as
+            'address.city', e.g. of context.feed_record
         data_dict: Optional dictionary to look up the key in
         
     Returns:
         The value associated with the key
+        
+    Raises:
+        TestDataKeyError: If the key is not found
     """
     if data_dict is None:
-        from config import test_data
-        # Try to get the data from different dictionaries in test_data
-        for dict_name in ['USER_DATA', 'PRODUCT_DATA', 'FORM_DATA', 'SCENARIOS', 'ENVIRONMENTS']:
-            data_dict = getattr(test_data, dict_name, {})
-            if data_key in data_dict:
-                return data_dict[data_key]
-        
-        # If not found in any dictionary, try to call a getter function
-        for func_name in ['get_user_data', 'get_scenario_data', 'get_environment_data']:
-            func = getattr(test_data, func_name, None)
-            if func:
-                try:
-                    return func(data_key)
-                except:
-                    pass
-        
-        return None
-    else:
-        return data_dict.get(data_key)
+        return test_data_registry.get(data_key)
+    if data_key in data_dict:
+        return data_dict[data_key]
+    value = get_nested_value(data_dict, data_key, default=_MISSING)
+    if value is _MISSING:
+        raise TestDataKeyError(f"Unknown test data key: {data_key}")
+    return value
 
 
-def get_nested_value(data_dict, key_path):
+def get_nested_value(data_dict, key_path, default=None):
     """
-    Get a nested value from a dictionary using a dot-separated key path.
+    Get a nested value from a dictionary using a dot-separated key path. Lists are
+    indexed by position (e.g., 'orders.0.id').
     
     Args:
         data_dict: Dictionary to get the value from
         key_path: Dot-separated key path (e.g., 'user.profile.name')
+        default: Value returned if the path is not found
         
     Returns:
-        The value at the specified key path, or None if not found
+        The value at the specified key path, or default if not found
     """
     keys = key_path.split('.')
     value = data_dict
@@ -163,7 +158,9 @@ def get_nested_value(data_dict, key_path):
     for key in keys:
         if isinstance(value, dict) and key in value:
             value = value[key]
+        elif isinstance(value, list) and key.isdigit() and int(key) < len(value):
+            value = value[int(key)]
         else:
-            return None
+            return default
     
     return value
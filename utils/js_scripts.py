@@ -0,0 +1,262 @@
+"""
+JavaScript snippets executed in the browser by page objects and utilities.
+
+Locators are passed to the scripts as [by, value] pairs using Selenium's By strategy
+names, and resolved in the page by the shared FIND_ELEMENTS function.
+"""
+
+# Resolves a Selenium locator in the page: findElements(by, value[, root]) -> Array of elements
+FIND_ELEMENTS = """
+function findElements(by, value, root) {
+    root = root || document;
+    var quote = function (text) { return '"' + String(text).replace(/(["\\\\])/g, '\\\\$1') + '"'; };
+    var toArray = function (list) { return Array.prototype.slice.call(list); };
+    var byLinkText = function (partial) {
+        return toArray(root.querySelectorAll('a')).filter(function (link) {
+            var text = (link.innerText || link.textContent || '').trim();
+            return partial ? text.indexOf(value) !== -1 : text === value;
+        });
+    };
+    switch (by) {
+        case 'id': return toArray(root.querySelectorAll('[id=' + quote(value) + ']'));
+        case 'name': return toArray(root.querySelectorAll('[name=' + quote(value) + ']'));
+        case 'class name': return toArray(root.querySelectorAll('.' + CSS.escape(value)));
+        case 'tag name': return toArray(root.querySelectorAll(value));
+        case 'css selector': return toArray(root.querySelectorAll(value));
+        case 'link text': return byLinkText(false);
+        case 'partial link text': return byLinkText(true);
+        case 'xpath':
+            var snapshot = document.evaluate(value, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            var nodes = [];
+            for (var i = 0; i < snapshot.snapshotLength; i++) { nodes.push(snapshot.snapshotItem(i)); }
+            return nodes;
+        default: throw new Error('Unsupported locator strategy: ' + by);
+    }
+}
+function isVisible(element) {
+    if (!element.isConnected) { return false; }
+    for (var node = element; node && node.nodeType === 1; node = node.parentElement) {
+        var style = window.getComputedStyle(node);
+        if (style.display === 'none' || style.opacity === '0') { return false; }
+    }
+    if (window.getComputedStyle(element).visibility !== 'visible') { return false; }
+    return element.getClientRects().length > 0;
+}
+"""
+
+# Reads several elements at once.
+# arguments: [[by, value], ...], [attribute names] -> [{found, text, visible, enabled, attributes}, ...]
+READ_ELEMENTS = FIND_ELEMENTS + """
+var locators = arguments[0], attributes = arguments[1] || [];
+var readAttribute = function (element, name) {
+    var property = element[name === 'class' ? 'className' : name];
+    if (typeof property === 'boolean') { return property ? 'true' : null; }
+    if (typeof property === 'string' || typeof property === 'number') { return String(property); }
+    return element.getAttribute(name);
+};
+return locators.map(function (locator) {
+    var element = findElements(locator[0], locator[1])[0];
+    if (!element) {
+        return {found: false, text: null, visible: false, enabled: false, attributes: {}};
+    }
+    var visible = isVisible(element);
+    var values = {};
+    attributes.forEach(function (name) { values[name] = readAttribute(element, name); });
+    return {
+        found: true,
+        text: visible ? (element.innerText || '').trim() : '',
+        visible: visible,
+        enabled: !element.disabled,
+        attributes: values
+    };
+});
+"""
+
+# Finds the first element of each locator.
+# arguments: [[by, value], ...] -> [element or null, ...]
+FIND_FIRST_ELEMENTS = FIND_ELEMENTS + """
+return arguments[0].map(function (locator) {
+    return findElements(locator[0], locator[1])[0] || null;
+});
+"""
+
+# Sets form field values in the page and fires input/change events, without keystrokes.
+# The native value setter is used so frameworks tracking the value (e.g. React) see the change.
+# arguments: [[by, value, field value], ...] -> [locators that matched no element]
+FILL_FORM = FIND_ELEMENTS + """
+var missing = [];
+arguments[0].forEach(function (field) {
+    var element = findElements(field[0], field[1])[0];
+    if (!element) {
+        missing.push(field[0] + '=' + field[1]);
+        return;
+    }
+    var value = field[2];
+    if (element.type === 'checkbox' || element.type === 'radio') {
+        element.checked = typeof value === 'boolean' ? value : String(element.value) === String(value);
+    } else {
+        var prototypes = {TEXTAREA: HTMLTextAreaElement, SELECT: HTMLSelectElement};
+        var prototype = (prototypes[element.tagName] || HTMLInputElement).prototype;
+        Object.getOwnPropertyDescriptor(prototype, 'value').set.call(element, value === null ? '' : String(value));
+    }
+    element.dispatchEvent(new Event('input', {bubbles: true}));
+    element.dispatchEvent(new Event('change', {bubbles: true}));
+});
+return missing;
+"""
+
+# Calls done() with the first truthy result of check(), or with null after the timeout (ms).
+# check() runs again after DOM mutations and on every animation frame instead of being polled
+# from the client.
+WAIT_FOR = """
+function waitFor(check, timeout, done) {
+    var result = check();
+    if (result) { done(result); return; }
+    var finished = false, scheduled = false, observer, frame, interval, timer;
+    var finish = function (value) {
+        if (finished) { return; }
+        finished = true;
+        observer.disconnect();
+        cancelAnimationFrame(frame);
+        clearInterval(interval);
+        clearTimeout(timer);
+        done(value);
+    };
+    var recheck = function () {
+        scheduled = false;
+        if (finished) { return; }
+        var value = check();
+        if (value) { finish(value); }
+    };
+    // Coalesce bursts of mutations into a single check
+    observer = new MutationObserver(function () {
+        if (!scheduled) { scheduled = true; Promise.resolve().then(recheck); }
+    });
+    observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+    // Visibility can also change without DOM mutations (stylesheets, layout, animations)
+    var onFrame = function () { recheck(); if (!finished) { frame = requestAnimationFrame(onFrame); } };
+    frame = requestAnimationFrame(onFrame);
+    // requestAnimationFrame is paused in background windows
+    interval = setInterval(recheck, 100);
+    timer = setTimeout(function () { finish(null); }, timeout);
+}
+"""
+
+# Async script waiting for an element to reach a state.
+# arguments: by, value, state ('present', 'visible' or 'clickable'), timeout in ms -> element or null
+WAIT_FOR_ELEMENT = FIND_ELEMENTS + WAIT_FOR + """
+var by = arguments[0], value = arguments[1], state = arguments[2], timeout = arguments[3];
+var done = arguments[arguments.length - 1];
+waitFor(function () {
+    var element = findElements(by, value)[0];
+    if (!element) { return null; }
+    if (state === 'present') { return element; }
+    if (!isVisible(element)) { return null; }
+    if (state === 'clickable' && element.disabled) { return null; }
+    return element;
+}, timeout, done);
+"""
+
+# Async script waiting for the URL to contain a text (history API and hash navigations).
+# arguments: text, timeout in ms -> true or null
+WAIT_FOR_URL_CONTAINS = WAIT_FOR + """
+var text = arguments[0], timeout = arguments[1];
+var done = arguments[arguments.length - 1];
+waitFor(function () { return window.location.href.indexOf(text) !== -1 || null; }, timeout, done);
+"""
+
+# Clears local and session storage of the currently loaded origin
+CLEAR_STORAGE = """
+try { window.localStorage.clear(); } catch (e) {}
+try { window.sessionStorage.clear(); } catch (e) {}
+"""
+
+# Reads local and session storage of the currently loaded origin.
+# -> {local: {key: value}, session: {key: value}}
+READ_STORAGE = """
+var read = function (storage) {
+    var items = {};
+    for (var i = 0; i < storage.length; i++) { items[storage.key(i)] = storage.getItem(storage.key(i)); }
+    return items;
+};
+return {local: read(window.localStorage), session: read(window.sessionStorage)};
+"""
+
+# Writes items to local and session storage of the currently loaded origin.
+# arguments: {key: value} for local storage, {key: value} for session storage
+WRITE_STORAGE = """
+var write = function (storage, items) {
+    Object.keys(items || {}).forEach(function (key) { storage.setItem(key, items[key]); });
+};
+write(window.localStorage, arguments[0]);
+write(window.sessionStorage, arguments[1]);
+"""
+
+# Counts in-flight fetch and XMLHttpRequest calls in window.__networkTracker. Installed
+# before page scripts run where the browser allows it, otherwise on the first idle check.
+NETWORK_TRACKER = """
+(function () {
+    if (window.__networkTracker) { return; }
+    var tracker = window.__networkTracker = {inflight: 0, lastActivity: 0};
+    var start = function () { tracker.inflight++; tracker.lastActivity = performance.now(); };
+    var end = function () {
+        tracker.inflight = Math.max(0, tracker.inflight - 1);
+        tracker.lastActivity = performance.now();
+    };
+    if (window.fetch) {
+        var fetch = window.fetch;
+        window.fetch = function () {
+            start();
+            return fetch.apply(this, arguments).then(
+                function (response) { end(); return response; },
+                function (error) { end(); throw error; }
+            );
+        };
+    }
+    var send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        start();
+        this.addEventListener('loadend', end);
+        return send.apply(this, arguments);
+    };
+}());
+"""
+
+# networkIdleTime() -> ms since the last request finished, 0 while the document is
+# parsing or fetch/XHR calls are in flight. Finished subresources come from the
+# Performance API, so requests made before the tracker was installed count too.
+NETWORK_IDLE = NETWORK_TRACKER + """
+function networkIdleTime() {
+    var tracker = window.__networkTracker;
+    if (document.readyState === 'loading' || tracker.inflight > 0) { return 0; }
+    var last = tracker.lastActivity;
+    performance.getEntriesByType('resource').forEach(function (entry) {
+        last = Math.max(last, entry.responseEnd);
+    });
+    return performance.now() - last;
+}
+"""
+
+# -> ms the network has been idle
+NETWORK_IDLE_TIME = NETWORK_IDLE + """
+return networkIdleTime();
+"""
+
+# Async script waiting for the network to be idle for a quiet period.
+# arguments: quiet period in ms, timeout in ms -> true or null
+WAIT_FOR_NETWORK_IDLE = NETWORK_IDLE + """
+var quiet = arguments[0], timeout = arguments[1];
+var done = arguments[arguments.length - 1];
+var deadline = performance.now() + timeout;
+(function check() {
+    var idle = networkIdleTime();
+    if (idle >= quiet) { done(true); return; }
+    if (performance.now() >= deadline) { done(null); return; }
+    setTimeout(check, Math.max(10, Math.min(50, quiet - idle)));
+}());
+"""
+
+# -> document.readyState
+READY_STATE = """
+return document.readyState;
+"""
@@ -0,0 +1,292 @@
+"""
+Request blocking and cache control for Chromium browsers through the DevTools protocol.
+
+The policy comes from the network profile selected with NETWORK_PROFILE (see
+config/network_profiles.py), extended with NETWORK_BLOCK_URLS and NETWORK_CACHE.
+DriverFactory enables the performance log in the browser options and applies the
+policy to every new Chrome or Edge session. Firefox and the fake driver are left
+untouched.
+
+Per scenario, the performance log is drained into request counts: requests made,
+bytes transferred and requests blocked. With NETWORK_DRY_RUN, nothing is blocked
+and the requests and bytes the policy would have avoided are counted instead, which
+measures the saving before turning blocking on.
+"""
+import functools
+import json
+import os
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+
+from selenium.common.exceptions import WebDriverException
+
+from config import config
+from config.network_profiles import NETWORK_PROFILES
+
+
+# File extensions of the resource types that can be blocked
+RESOURCE_TYPE_EXTENSIONS = {
+    'image': ('png', 'jpg', 'jpeg', 'gif', 'webp', 'avif', 'svg', 'ico', 'bmp'),
+    'font': ('woff', 'woff2', 'ttf', 'otf', 'eot'),
+    'media': ('mp4', 'webm', 'ogg', 'ogv', 'mp3', 'wav', 'm4a', 'flac'),
+    'stylesheet': ('css',),
+}
+
+# Capability enabling the performance log, per browser
+LOGGING_CAPABILITIES = {
+    'chrome': 'goog:loggingPrefs',
+    'edge': 'ms:loggingPrefs',
+}
+
+
+def get_network_profile(name=None):
+    """
+    Get the settings of a network profile.
+    
+    Args:
+        name: Profile name, defaults to NETWORK_PROFILE from config
+        
+    Returns:
+        dict: Network profile settings
+    """
+    name = (name or config.NETWORK_PROFILE).lower()
+    if name not in NETWORK_PROFILES:
+        raise ValueError(f"Unknown network profile: {name}")
+    return NETWORK_PROFILES[name]
+
+
+def resource_type_patterns(resource_type):
+    """
+    Get the URL patterns blocking a resource type, with and without a query string.
+    
+    Args:
+        resource_type: One of RESOURCE_TYPE_EXTENSIONS
+        
+    Returns:
+        list: URL patterns
+    """
+    if resource_type not in RESOURCE_TYPE_EXTENSIONS:
+        raise ValueError(f"Unknown resource type: {resource_type}")
+    patterns = []
+    for extension in RESOURCE_TYPE_EXTENSIONS[resource_type]:
+        patterns.extend([f"*.{extension}", f"*.{extension}?*"])
+    return patterns
+
+
+class NetworkPolicy:
+    """
+    Blocked URL patterns and cache setting applied to Chromium sessions.
+    """
+    
+    def __init__(self, profile=None, block_urls=None, cache=None, dry_run=None):
+        """
+        Initialize the policy. Settings that are not given are read from config each
+        time the policy is used, so reloaded or overridden settings apply.
+        
+        Args:
+            profile: Network profile name, defaults to NETWORK_PROFILE from config
+            block_urls: Extra URL patterns to block, defaults to NETWORK_BLOCK_URLS from config
+            cache: True or False to force the browser cache on or off, defaults to
+                NETWORK_CACHE from config and then to the profile
+            dry_run: Count instead of blocking, defaults to NETWORK_DRY_RUN from config
+        """
+        self._profile = profile
+        self._block_urls = block_urls
+        self._cache = cache
+        self._dry_run = dry_run
+        self._lock = threading.Lock()
+    
+    @property
+    def patterns(self):
+        """
+        URL patterns blocked by the profile, the extra patterns and the blocked resource types.
+        """
+        settings = get_network_profile(self._profile)
+        block_urls = self._block_urls
+        if block_urls is None:
+            block_urls = [pattern.strip() for pattern in config.NETWORK_BLOCK_URLS.split(',')]
+        patterns = list(settings['block_urls']) + [pattern for pattern in block_urls if pattern]
+        for resource_type in settings['block_resource_types']:
+            patterns.extend(resource_type_patterns(resource_type))
+        return patterns
+    
+    @property
+    def cache(self):
+        """
+        True or False if the browser cache is forced on or off, None to leave it alone.
+        """
+        if self._cache is not None:
+            return self._cache
+        if config.NETWORK_CACHE:
+            return config.NETWORK_CACHE.lower() in ('on', 'true')
+        return get_network_profile(self._profile)['cache']
+    
+    @property
+    def dry_run(self):
+        """
+        Whether requests are counted instead of blocked.
+        """
+        return config.NETWORK_DRY_RUN if self._dry_run is None else self._dry_run
+    
+    @property
+    def active(self):
+        """
+        Whether the policy changes anything in the browser.
+        """
+        return bool(self.patterns) or self.cache is not None
+    
+    def configure_options(self, options, browser):
+        """
+        Enable the performance log the request counts are read from.
+        
+        Args:
+            options: ChromeOptions or EdgeOptions instance
+            browser: 'chrome' or 'edge'
+        """
+        if self.active:
+            options.set_capability(LOGGING_CAPABILITIES[browser], {'performance': 'ALL'})
+    
+    def apply(self, driver):
+        """
+        Apply the policy to a session.
+        
+        Args:
+            driver (WebDriver): WebDriver instance
+            
+        Returns:
+            bool: True if the policy was applied, False if the driver has no DevTools access
+        """
+        patterns, cache = self.patterns, self.cache
+        if not (patterns or cache is not None) or not hasattr(driver, 'execute_cdp_cmd'):
+            return False
+        
+        driver.execute_cdp_cmd('Network.enable', {})
+        if patterns and not self.dry_run:
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+        if cache is not None:
+            driver.execute_cdp_cmd('Network.setCacheDisabled', {'cacheDisabled': not cache})
+        return True
+    
+    def matches(self, url):
+        """
+        Check if the policy blocks a URL.
+        
+        Args:
+            url: Request URL
+            
+        Returns:
+            bool: True if a blocked pattern matches the URL
+        """
+        regex = self._compile(tuple(self.patterns))
+        return regex is not None and regex.match(url) is not None
+    
+    def collect(self, driver):
+        """
+        Drain the performance log of a session into request counts.
+        
+        Args:
+            driver (WebDriver): WebDriver instance the policy was applied to
+            
+        Returns:
+            dict: requests, bytes, requests_avoided and bytes_avoided (None when blocking,
+                since blocked requests never report a size), or None if the driver has no
+                performance log
+        """
+        if not self.active or not hasattr(driver, 'execute_cdp_cmd'):
+            return None
+        try:
+            entries = driver.get_log('performance')
+        except WebDriverException:
+            return None
+        
+        dry_run = self.dry_run
+        regex = self._compile(tuple(self.patterns)) if dry_run else None
+        urls = {}
+        stats = {
+            'requests': 0,
+            'bytes': 0,
+            'requests_avoided': 0,
+            'bytes_avoided': 0 if dry_run else None,
+        }
+        for entry in entries:
+            message = json.loads(entry['message'])['message']
+            method, params = message.get('method'), message.get('params', {})
+            if method == 'Network.requestWillBeSent':
+                url = params['request']['url']
+                if urlsplit(url).scheme in ('http', 'https') and params['requestId'] not in urls:
+                    stats['requests'] += 1
+                urls[params['requestId']] = url
+            elif method == 'Network.loadingFinished':
+                size = int(params.get('encodedDataLength', 0))
+                stats['bytes'] += size
+                if regex is not None and regex.match(urls.get(params['requestId'], '')):
+                    stats['requests_avoided'] += 1
+                    stats['bytes_avoided'] += size
+            elif method == 'Network.loadingFailed' and params.get('blockedReason'):
+                stats['requests_avoided'] += 1
+        return stats
+    
+    def write_scenario_stats(self, feature, scenario, stats, path=None):
+        """
+        Append the request counts of a scenario to the run's network log.
+        
+        Args:
+            feature: Feature name
+            scenario: Scenario name
+            stats (dict): Counts returned by collect()
+            path: Optional output path, defaults to REPORT_DIR/network/<RUN_ID>.jsonl
+            
+        Returns:
+            str: Path of the network log
+        """
+        path = path or os.path.join(config.REPORT_DIR, 'network', f"{config.RUN_ID}.jsonl")
+        record = dict(
+            stats,
+            run_id=config.RUN_ID,
+            timestamp=time.time(),
+            feature=feature,
+            scenario=scenario,
+            dry_run=self.dry_run,
+        )
+        with self._lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'a') as log_file:
+                log_file.write(json.dumps(record) + '\n')
+        return path
+    
+    @staticmethod
+    def format_stats(stats):
+        """
+        Format request counts for the console.
+        
+        Args:
+            stats (dict): Counts returned by collect()
+            
+        Returns:
+            str: One line summary
+        """
+        line = f"{stats['requests']} requests, {stats['bytes'] / 1024:.1f} KB"
+        if stats['bytes_avoided'] is None:
+            return f"{line}, {stats['requests_avoided']} blocked"
+        avoidable_kb = stats['bytes_avoided'] / 1024
+        return f"{line}, {stats['requests_avoided']} requests and {avoidable_kb:.1f} KB avoidable"
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=8)
+    def _compile(patterns):
+        """
+        Compile URL patterns with '*' wildcards into one regex matching whole URLs.
+        
+        Args:
+            patterns (tuple): URL patterns
+            
+        Returns:
+            re.Pattern: The regex, or None if there are no patterns
+        """
+        if not patterns:
+            return None
+        alternatives = ('.*'.join(re.escape(part) for part in pattern.split('*')) for pattern in patterns)
+        return re.compile(f"(?:{'|'.join(alternatives)})\\Z")
+
@@ -0,0 +1,305 @@
+"""
+Parallel runner that splits behave features or scenarios over worker processes.
+
+Usage:
+    python -m utils.parallel_runner features/ --workers 16 --split scenario [behave options]
+
+Each worker is a separate behave process with its own WORKER_ID, so it gets its own
+driver and writes screenshots and reports into reports/worker_<id>/. The per-worker
+JSON results are merged into reports/results.json when all workers have finished.
+
+Features with Scenario Outlines tagged @data_feed:<name> run on every worker, each
+on its own shard of the feeds and its share of the other scenarios (see
+utils/data_feeds.py).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from config import config
+
+# Same as utils.data_feeds.FEED_TAG_PREFIX, without importing behave up front
+FEED_TAG_PREFIX = 'data_feed:'
+
+
+def find_feature_files(paths):
+    """
+    Find the feature files in paths.
+    
+    Args:
+        paths: Feature files or directories containing feature files
+        
+    Returns:
+        list: Sorted feature file paths
+    """
+    feature_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                feature_files.extend(os.path.join(root, name) for name in files if name.endswith('.feature'))
+        else:
+            feature_files.append(path)
+    return sorted(feature_files)
+
+
+def has_data_feeds(filename):
+    """
+    Check whether a feature file may contain @data_feed outlines, without parsing it.
+    
+    Args:
+        filename: Feature file path
+        
+    Returns:
+        bool: True if the file mentions a @data_feed tag
+    """
+    with open(filename, encoding='utf-8') as feature_file:
+        return '@' + FEED_TAG_PREFIX in feature_file.read()
+
+
+def is_feed_outline(scenario):
+    """
+    Check whether a scenario is a Scenario Outline tagged @data_feed:<name>.
+    """
+    return hasattr(scenario, 'examples') and any(tag.startswith(FEED_TAG_PREFIX) for tag in scenario.tags)
+
+
+def has_feed_outlines(filename):
+    """
+    Check whether a feature file contains @data_feed outlines.
+    
+    Args:
+        filename: Feature file path
+        
+    Returns:
+        bool: True if any scenario of the feature is a @data_feed outline
+    """
+    if not has_data_feeds(filename):
+        return False
+    feature = _parse_feature(filename)
+    return feature is not None and any(is_feed_outline(scenario) for scenario in feature.scenarios)
+
+
+def collect_work_items(paths, split='feature'):
+    """
+    Collect the feature files or scenario locations to distribute over workers.
+    
+    Features with @data_feed outlines are left out, see collect_feed_features().
+    
+    Args:
+        paths: Feature files or directories containing feature files
+        split: 'feature' to distribute whole feature files, 'scenario' to distribute
+            individual scenarios as file:line locations
+            
+    Returns:
+        list: Work items that can be passed to behave as paths
+    """
+    items = []
+    for filename in find_feature_files(paths):
+        if has_feed_outlines(filename):
+            continue
+        if split == 'feature':
+            items.append(filename)
+            continue
+        
+        feature = _parse_feature(filename)
+        if feature is None:
+            continue
+        items.extend(f"{filename}:{scenario.line}" for scenario in feature.scenarios)
+    return items
+
+
+def collect_feed_features(paths):
+    """
+    Collect the feature files with @data_feed outlines, which every worker runs whole.
+    
+    behave cannot select an outline by file:line before its Examples are filled, so
+    each worker gets the whole feature and keeps its own part of it when the feature
+    starts: its shard of every feed, and its round-robin share of the other scenarios
+    (see utils.data_feeds.expand_feature()).
+    
+    Args:
+        paths: Feature files or directories containing feature files
+        
+    Returns:
+        list: Feature file paths
+    """
+    return [filename for filename in find_feature_files(paths) if has_feed_outlines(filename)]
+
+
+def _parse_feature(filename):
+    from behave.parser import parse_file
+    
+    return parse_file(filename)
+
+
+def shard_items(items, workers):
+    """
+    Distribute work items round-robin over a number of workers.
+    
+    Args:
+        items: Work items to distribute
+        workers: Number of workers
+        
+    Returns:
+        list: One list of work items per worker, without empty shards
+    """
+    shards = [items[index::workers] for index in range(workers)]
+    return [shard for shard in shards if shard]
+
+
+def get_worker_report_dir(worker_id):
+    """
+    Get the report directory of a worker.
+    
+    Args:
+        worker_id: Worker index
+        
+    Returns:
+        str: Path to the worker's report directory
+    """
+    return os.path.join(config.BASE_REPORT_DIR, f'worker_{worker_id}')
+
+
+def run_worker(worker_id, items, worker_count, behave_args=None):
+    """
+    Run behave in a separate process for one shard of work items.
+    
+    Args:
+        worker_id: Worker index
+        items: Work items for this worker
+        worker_count: Total number of workers
+        behave_args: Extra command line arguments passed to behave
+        
+    Returns:
+        dict: Worker id, exit code, and paths of the JSON results and console log
+    """
+    report_dir = get_worker_report_dir(worker_id)
+    os.makedirs(report_dir, exist_ok=True)
+    results_path = os.path.join(report_dir, 'results.json')
+    log_path = os.path.join(report_dir, 'behave.log')
+    
+    env = dict(os.environ, WORKER_ID=str(worker_id), WORKER_COUNT=str(worker_count), RUN_ID=config.RUN_ID)
+    command = [
+        sys.executable, '-m', 'behave',
+        '--format', 'json', '--outfile', results_path,
+        '--format', 'pretty',
+        *(behave_args or []),
+        *items,
+    ]
+    
+    with open(log_path, 'w') as log_file:
+        process = subprocess.run(command, env=env, stdout=log_file, stderr=subprocess.STDOUT)
+    
+    return {
+        'worker_id': worker_id,
+        'returncode': process.returncode,
+        'results': results_path,
+        'log': log_path,
+    }
+
+
+def merge_results(worker_results, output_path=None):
+    """
+    Merge the behave JSON results of all workers into a single report.
+    
+    Scenarios of the same feature that ran on different workers are combined
+    under one feature entry.
+    
+    Args:
+        worker_results: Results returned by run_worker
+        output_path: Optional path for the merged report, defaults to results.json in BASE_REPORT_DIR
+        
+    Returns:
+        dict: Summary with scenario counts per status and the merged report path
+    """
+    output_path = output_path or os.path.join(config.BASE_REPORT_DIR, 'results.json')
+    features = {}
+    
+    for result in worker_results:
+        if not os.path.exists(result['results']):
+            continue
+        with open(result['results']) as results_file:
+            try:
+                worker_features = json.load(results_file)
+            except ValueError:
+                continue
+        for feature in worker_features:
+            key = feature.get('location', '').split(':')[0] or feature.get('name')
+            if key in features:
+                features[key].setdefault('elements', []).extend(feature.get('elements', []))
+            else:
+                features[key] = feature
+    
+    merged = list(features.values())
+    with open(output_path, 'w') as output_file:
+        json.dump(merged, output_file, indent=2)
+    
+    summary = {'passed': 0, 'failed': 0, 'skipped': 0, 'untested': 0}
+    for feature in merged:
+        for element in feature.get('elements', []):
+            if element.get('type') == 'background':
+                continue
+            status = element.get('status', 'untested')
+            summary[status] = summary.get(status, 0) + 1
+    
+    summary['report'] = output_path
+    return summary
+
+
+def main(argv=None):
+    """
+    Command line entry point of the parallel runner.
+    
+    Args:
+        argv: Optional command line arguments, defaults to sys.argv
+        
+    Returns:
+        int: Exit code, non-zero if any worker failed
+    """
+    parser = argparse.ArgumentParser(description='Run behave features in parallel worker processes.')
+    parser.add_argument('paths', nargs='*', default=['features'], help='Feature files or directories')
+    parser.add_argument('-w', '--workers', type=int, default=config.PARALLEL_WORKERS,
+                        help='Number of worker processes (default: PARALLEL_WORKERS from config)')
+    parser.add_argument('--split', choices=['feature', 'scenario'], default='feature',
+                        help='Distribute whole feature files or individual scenarios')
+    args, behave_args = parser.parse_known_args(argv)
+    
+    items = collect_work_items(args.paths, args.split)
+    feed_features = collect_feed_features(args.paths)
+    if not items and not feed_features:
+        print("No features found")
+        return 1
+    
+    workers = max(1, args.workers)
+    if feed_features:
+        # Every worker runs the data feed features, each its own part of them
+        shards = [items[index::workers] + feed_features for index in range(workers)]
+        print(f"Running {len(items)} {args.split}(s) and {len(feed_features)} data feed feature(s) "
+              f"on {len(shards)} worker(s)")
+    else:
+        shards = shard_items(items, workers)
+        print(f"Running {len(items)} {args.split}(s) on {len(shards)} worker(s)")
+    
+    with ThreadPoolExecutor(max_workers=len(shards)) as executor:
+        futures = [
+            executor.submit(run_worker, worker_id, shard, len(shards), behave_args)
+            for worker_id, shard in enumerate(shards)
+        ]
+        worker_results = [future.result() for future in futures]
+    
+    for result in worker_results:
+        status = 'ok' if result['returncode'] == 0 else f"failed (exit code {result['returncode']})"
+        print(f"Worker {result['worker_id']}: {status}, log: {result['log']}")
+    
+    summary = merge_results(worker_results)
+    print(f"Scenarios passed: {summary['passed']}, failed: {summary['failed']}, skipped: {summary['skipped']}")
+    print(f"Merged report: {summary['report']}")
+    
+    return 0 if all(result['returncode'] == 0 for result in worker_results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
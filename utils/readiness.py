@@ -0,0 +1,123 @@
+"""
+Page readiness checks run by BasePage.open() once the browser returns from the navigation.
+
+The check is selected with PAGE_READINESS in config, or per call with
+BasePage.open(url, readiness=...):
+
+    load          driver.get() is enough, as defined by the page load strategy
+    dom-ready     the document finished parsing
+    network-idle  the document finished parsing and no request finished and no
+                  fetch/XHR call was in flight for NETWORK_IDLE_MS
+    page-defined  the page object's READY_LOCATOR is visible (dom-ready without one)
+
+With any check other than 'load', sessions use the 'eager' page load strategy unless
+the launch profile sets one, so driver.get() returns at DOMContentLoaded and the
+check decides when the page is usable. More checks can be added with
+register_readiness().
+"""
+from config import config
+from utils import js_scripts
+
+
+# Readiness name to callable taking the page object and a timeout in seconds
+READINESS_CHECKS = {}
+
+
+def register_readiness(name, check):
+    """
+    Register a readiness check.
+    
+    Args:
+        name: Name used in PAGE_READINESS and BasePage.open()
+        check: Callable taking the page object and a timeout in seconds, raising
+            TimeoutException if the page does not get ready in time
+    """
+    READINESS_CHECKS[name] = check
+
+
+def readiness_check(name):
+    """
+    Decorator registering a readiness check.
+    
+    Args:
+        name: Name used in PAGE_READINESS and BasePage.open()
+        
+    Returns:
+        callable: Decorator registering the check
+    """
+    def register(check):
+        register_readiness(name, check)
+        return check
+    return register
+
+
+def wait_until_ready(page, readiness=None, timeout=None):
+    """
+    Wait until the page loaded in the browser is ready to be used.
+    
+    Args:
+        page: Page object that opened the page
+        readiness: Optional readiness name, defaults to PAGE_READINESS from config
+        timeout: Optional timeout in seconds, defaults to PAGE_LOAD_TIMEOUT from config
+        
+    Raises:
+        TimeoutException: If the page does not get ready within the timeout
+    """
+    readiness = readiness or config.PAGE_READINESS
+    if readiness not in READINESS_CHECKS:
+        raise ValueError(f"Unknown page readiness: {readiness}")
+    READINESS_CHECKS[readiness](page, timeout or config.PAGE_LOAD_TIMEOUT)
+
+
+def get_page_load_strategy(readiness=None):
+    """
+    Get the page load strategy a readiness check needs.
+    
+    Args:
+        readiness: Optional readiness name, defaults to PAGE_READINESS from config
+        
+    Returns:
+        str: 'eager' if readiness is decided by a check, None to keep the browser default
+    """
+    return None if (readiness or config.PAGE_READINESS) == 'load' else 'eager'
+
+
+def prepare_driver(driver):
+    """
+    Install the request tracker before page scripts run, so 'network-idle' also sees
+    the fetch/XHR calls made while the page loads. Only Chromium browsers allow this;
+    elsewhere the tracker is installed by the first check.
+    
+    Args:
+        driver (WebDriver): WebDriver instance
+    """
+    if config.PAGE_READINESS == 'network-idle' and hasattr(driver, 'execute_cdp_cmd'):
+        driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': js_scripts.NETWORK_TRACKER})
+
+
+@readiness_check('load')
+def _load(page, timeout):
+    # driver.get() already waited as long as the page load strategy requires
+    pass
+
+
+@readiness_check('dom-ready')
+def _dom_ready(page, timeout):
+    page.waits.until(
+        lambda driver: driver.execute_script(js_scripts.READY_STATE) != 'loading',
+        timeout,
+        f"Document still loading after {timeout} seconds",
+    )
+
+
+@readiness_check('network-idle')
+def _network_idle(page, timeout):
+    page.waits.wait_for_network_idle(config.NETWORK_IDLE_MS, timeout)
+
+
+@readiness_check('page-defined')
+def _page_defined(page, timeout):
+    if page.READY_LOCATOR is None:
+        _dom_ready(page, timeout)
+    else:
+        page.waits.wait_for_locator(page.READY_LOCATOR, 'visible', timeout)
@@ -0,0 +1,47 @@
+"""
+Tracks the feature, scenario and step currently being executed.
+
+The behave hooks in features/environment/environment.py keep it up to date, so
+utilities that have no access to the behave context can tag what they record.
+Only the thread running the hooks sees the context: work done on other threads,
+e.g. by the driver prelauncher or teardown threads, belongs to no scenario or step.
+"""
+import threading
+
+
+_current = {
+    'feature': None,
+    'scenario': None,
+    'step': None,
+}
+
+# Thread running the behave hooks, set by update()
+_owner = None
+
+
+def update(**fields):
+    """
+    Update the current execution context.
+    
+    Args:
+        **fields: Any of feature, scenario and step
+    """
+    global _owner
+    unknown = set(fields) - set(_current)
+    if unknown:
+        raise KeyError(f"Unknown run context fields: {', '.join(sorted(unknown))}")
+    _owner = threading.get_ident()
+    _current.update(fields)
+
+
+def current():
+    """
+    Get the current execution context.
+    
+    Returns:
+        dict: The current feature, scenario and step names, all None on threads other
+            than the one running the hooks
+    """
+    if _owner is not None and threading.get_ident() != _owner:
+        return dict.fromkeys(_current)
+    return dict(_current)
@@ -0,0 +1,301 @@
+"""
+Screenshot pipeline capturing on the caller's thread and writing on background threads.
+
+Only the WebDriver call happens in the step: the PNG bytes are hashed, and the
+decoding, optional downscaling, re-encoding (SCREENSHOT_FORMAT: png, webp or jpeg) and
+the disk write run on a pool of SCREENSHOT_WORKERS threads. Identical frames are stored
+once: a duplicate returns the path of the first file, which it writes itself if that
+write failed or the file was deleted since, e.g. by the artifact store. Every
+screenshot, duplicates included, is listed with its name in index.jsonl in the
+screenshot directory.
+
+Re-encoding and downscaling need Pillow. Without it, screenshots are written as the
+PNG the browser returned.
+"""
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from config import config
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+# File extension and Pillow format of each output format
+FORMATS = {
+    'png': ('png', 'PNG'),
+    'webp': ('webp', 'WEBP'),
+    'jpeg': ('jpg', 'JPEG'),
+}
+
+# Screenshots remembered for deduplication, the least recently repeated are forgotten
+MAX_STORED = 1024
+
+
+class ScreenshotPipeline:
+    """
+    Asynchronous, deduplicating screenshot writer.
+    """
+    
+    def __init__(self, image_format=None, quality=None, max_width=None, workers=None):
+        """
+        Initialize the pipeline.
+        
+        Args:
+            image_format: 'png', 'webp' or 'jpeg', defaults to SCREENSHOT_FORMAT from config
+            quality: WebP/JPEG quality from 1 to 100, defaults to SCREENSHOT_QUALITY from config
+            max_width: Width in pixels screenshots are downscaled to, 0 keeps the original,
+                defaults to SCREENSHOT_MAX_WIDTH from config
+            workers: Number of writer threads, defaults to SCREENSHOT_WORKERS from config
+        """
+        if image_format and image_format.lower() not in FORMATS:
+            raise ValueError(f"Unsupported screenshot format: {image_format}")
+        self._image_format = image_format
+        self._quality = quality
+        self._max_width = max_width
+        self._workers = workers
+        self._pillow_warned = False
+        
+        self.errors = []
+        # (directory, digest, format) -> (path, future of the write), least recently used first
+        self._stored = OrderedDict()
+        self._pending = set()
+        self._executor = None
+        self._lock = threading.Lock()
+        # Separate lock for index writes, so capture() never waits for the disk
+        self._index_lock = threading.Lock()
+    
+    @property
+    def image_format(self):
+        """
+        Output format, 'png' when Pillow is not installed.
+        """
+        image_format = (self._image_format or config.SCREENSHOT_FORMAT).lower()
+        if image_format not in FORMATS:
+            raise ValueError(f"Unsupported screenshot format: {image_format}")
+        if Image is None and image_format != 'png':
+            self._warn_without_pillow()
+            return 'png'
+        return image_format
+    
+    @property
+    def quality(self):
+        """
+        WebP/JPEG quality from 1 to 100.
+        """
+        return self._quality or config.SCREENSHOT_QUALITY
+    
+    @property
+    def max_width(self):
+        """
+        Width in pixels screenshots are downscaled to, 0 when they keep the original.
+        """
+        max_width = config.SCREENSHOT_MAX_WIDTH if self._max_width is None else self._max_width
+        if Image is None and max_width:
+            self._warn_without_pillow()
+            return 0
+        return max_width
+    
+    @property
+    def workers(self):
+        """
+        Number of writer threads, used when the first screenshot starts them.
+        """
+        return self._workers or config.SCREENSHOT_WORKERS
+    
+    def _warn_without_pillow(self):
+        """
+        Tell once that screenshots are not re-encoded.
+        """
+        if not self._pillow_warned:
+            self._pillow_warned = True
+            print("Pillow is not installed, screenshots are saved as PNG without re-encoding")
+    
+    def capture(self, driver, name, directory=None, on_written=None):
+        """
+        Take a screenshot and queue it for writing.
+        
+        Args:
+            driver (WebDriver): WebDriver instance
+            name: File name without extension
+            directory: Optional directory, defaults to SCREENSHOT_DIR from config
+            on_written: Optional callable taking the path, the size in bytes and whether
+                the screenshot was a duplicate, called on the writer thread once written
+            
+        Returns:
+            str: Path the screenshot is written to, or the path of an identical earlier
+                screenshot. The file may not exist until flush() returns.
+        """
+        png = driver.get_screenshot_as_png()
+        return self.submit(png, name, directory, on_written)
+    
+    def submit(self, png, name, directory=None, on_written=None):
+        """
+        Queue PNG bytes for writing.
+        
+        Args:
+            png (bytes): Screenshot as returned by get_screenshot_as_png()
+            name: File name without extension
+            directory: Optional directory, defaults to SCREENSHOT_DIR from config
+            on_written: Optional callable taking the path, the size in bytes and whether
+                the screenshot was a duplicate, called on the writer thread once written
+            
+        Returns:
+            str: Path the screenshot is written to, or the path of an identical earlier screenshot
+        """
+        directory = directory or config.SCREENSHOT_DIR
+        digest = hashlib.blake2b(png, digest_size=16).hexdigest()
+        image_format = self.image_format
+        extension = FORMATS[image_format][0]
+        
+        key = (directory, digest, image_format)
+        
+        with self._lock:
+            original = self._stored.get(key)
+            if original is not None and original[1].done() and \
+                    (original[1].exception() is not None or not os.path.exists(original[0])):
+                # The first write failed or its file was deleted, this screenshot is stored anew
+                original = None
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='screenshot')
+            if original is None:
+                path = os.path.join(directory, f"{name}.{extension}")
+                future = self._executor.submit(self._write, png, path, name, digest, image_format, on_written)
+                self._stored[key] = (path, future)
+                if len(self._stored) > MAX_STORED:
+                    self._stored.popitem(last=False)
+            else:
+                path = original[0]
+                future = self._executor.submit(
+                    self._write, png, path, name, digest, image_format, on_written, original[1]
+                )
+            self._stored.move_to_end(key)
+            self._pending.add(future)
+        future.add_done_callback(self._done)
+        return path
+    
+    def flush(self, timeout=None):
+        """
+        Wait until the queued screenshots are written.
+        
+        Args:
+            timeout: Optional timeout in seconds
+            
+        Returns:
+            bool: True if nothing is left in the queue
+        """
+        with self._lock:
+            pending = list(self._pending)
+        return not wait(pending, timeout).not_done
+    
+    def close(self):
+        """
+        Write the queued screenshots and stop the writer threads.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=True)
+    
+    def _done(self, future):
+        """
+        Forget a finished write and keep its error. Identical screenshots are not sent
+        to the file of a failed write.
+        
+        Args:
+            future: Future of the write
+        """
+        error = future.exception()
+        with self._lock:
+            self._pending.discard(future)
+            if error is not None:
+                for key in [key for key, (_, write) in self._stored.items() if write is future]:
+                    del self._stored[key]
+        if error is not None:
+            self.errors.append(error)
+            print(f"Failed to save screenshot: {error}")
+    
+    def _write(self, png, path, name, digest, image_format, on_written=None, original=None):
+        """
+        Encode and write a screenshot, then list it in the index. Runs on a writer thread.
+        
+        Args:
+            png (bytes): Screenshot
+            path: Output path
+            name: Name the screenshot was taken with
+            digest: Hash of the PNG bytes
+            image_format: Output format, the one the extension of the path was chosen for
+            on_written: Optional callable taking the path, the size and whether it was a duplicate
+            original: Future of the write of an identical screenshot to the same path, whose
+                file this one only indexes if the write succeeded and the file still exists
+        """
+        # The original was submitted first, so it runs on another thread or already ran
+        duplicate = original is not None and original.exception() is None and os.path.exists(path)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        size = None
+        if not duplicate:
+            data = self._encode(png, image_format)
+            # Write under a temporary name so a report never links a partial file
+            fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as image_file:
+                image_file.write(data)
+            os.replace(temp_path, path)
+            size = len(data)
+        
+        record = {
+            'timestamp': time.time(),
+            'name': name,
+            'path': os.path.basename(path),
+            'digest': digest,
+            'duplicate': duplicate,
+            'bytes': size,
+        }
+        with self._index_lock:
+            with open(os.path.join(directory, 'index.jsonl'), 'a') as index_file:
+                index_file.write(json.dumps(record) + '\n')
+        
+        if on_written is not None:
+            on_written(path, size or 0, duplicate)
+    
+    def _encode(self, png, image_format):
+        """
+        Downscale and re-encode a screenshot.
+        
+        Args:
+            png (bytes): Screenshot as PNG
+            image_format: Output format
+            
+        Returns:
+            bytes: Image in the configured format
+        """
+        max_width = self.max_width
+        if Image is None or (image_format == 'png' and not max_width):
+            return png
+        
+        image = Image.open(io.BytesIO(png))
+        if max_width and image.width > max_width:
+            height = round(image.height * max_width / image.width)
+            image = image.resize((max_width, height), Image.LANCZOS)
+        
+        output = io.BytesIO()
+        pillow_format = FORMATS[image_format][1]
+        if pillow_format == 'JPEG':
+            image.convert('RGB').save(output, pillow_format, quality=self.quality, optimize=True)
+        elif pillow_format == 'WEBP':
+            image.save(output, pillow_format, quality=self.quality, method=4)
+        else:
+            image.save(output, pillow_format, optimize=True)
+        return output.getvalue()
+
+
+screenshot_pipeline = ScreenshotPipeline()
@@ -0,0 +1,252 @@
+"""
+Cache of authenticated browser sessions, so scenarios can skip the UI login.
+
+After a real login, the cookies and the local and session storage of the logged-in
+origin are captured into a snapshot. Later sessions (new or pooled) restore the
+snapshot instead of driving the login form again. Snapshots are keyed by user type,
+username and base URL, expire after SESSION_CACHE_TTL seconds, and are stored as JSON
+files under SESSION_CACHE_DIR so parallel workers share them.
+
+Usage:
+    session_cache.restore_or_login(driver, 'default_user', base_url,
+                                   login=lambda: page.login(username, password),
+                                   validate=lambda driver: page.is_logged_in())
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+from selenium.common.exceptions import WebDriverException
+
+from config import config
+from utils import js_scripts
+from utils.element_cache import ElementCache
+
+
+# Cookie fields accepted by add_cookie()
+COOKIE_FIELDS = ('name', 'value', 'path', 'domain', 'secure', 'httpOnly', 'expiry', 'sameSite')
+
+
+class SessionCache:
+    """
+    File-backed store of session snapshots.
+    """
+    
+    def __init__(self, directory=None, ttl=None):
+        """
+        Initialize the session cache.
+        
+        Args:
+            directory: Directory of the snapshot files, defaults to SESSION_CACHE_DIR from config
+            ttl: Seconds before a snapshot expires, defaults to SESSION_CACHE_TTL from config
+        """
+        self._directory = directory
+        self._ttl = ttl
+    
+    @property
+    def directory(self):
+        """
+        Directory of the snapshot files.
+        """
+        return self._directory or config.SESSION_CACHE_DIR
+    
+    @property
+    def ttl(self):
+        """
+        Seconds before a snapshot expires.
+        """
+        return self._ttl if self._ttl is not None else config.SESSION_CACHE_TTL
+    
+    def restore_or_login(self, driver, user_type, base_url, login, validate, username=None):
+        """
+        Restore the cached session of a user, or log in and cache the new session.
+        
+        A snapshot that fails to restore or to validate is discarded, and the user
+        logs in for real.
+        
+        Args:
+            driver (WebDriver): WebDriver instance
+            user_type: User type from test_data
+            base_url: Base URL of the application under test
+            login: Callable performing the real login
+            validate: Callable taking the driver and returning True if the session is logged in
+            username: Optional username, so a change of the test data invalidates the snapshot
+            
+        Returns:
+            bool: True if a cached session was restored, False if the user logged in
+        """
+        snapshot = self.load(user_type, base_url, username)
+        if snapshot is not None:
+            if self.restore(driver, snapshot) and validate(driver):
+                return True
+            self.invalidate(user_type, base_url, username)
+        
+        login()
+        if validate(driver):
+            self.save(self.capture(driver, user_type, base_url, username))
+        return False
+    
+    def load(self, user_type, base_url, username=None):
+        """
+        Load the snapshot of a user.
+        
+        Args:
+            user_type: User type from test_data
+            base_url: Base URL of the application under test
+            username: Optional username the snapshot was captured for
+            
+        Returns:
+            dict: The snapshot, or None if there is none or it expired
+        """
+        path = self._path(user_type, base_url, username)
+        try:
+            with open(path) as snapshot_file:
+                snapshot = json.load(snapshot_file)
+        except (OSError, ValueError):
+            return None
+        
+        if not isinstance(snapshot, dict) or self._is_expired(snapshot):
+            return None
+        return snapshot
+    
+    def save(self, snapshot):
+        """
+        Write a snapshot atomically, so parallel workers never read a partial file.
+        
+        Args:
+            snapshot (dict): Snapshot returned by capture()
+        """
+        path = self._path(snapshot['user_type'], snapshot['base_url'], snapshot['username'])
+        try:
+            # The cookies are credentials: the directory is private to the owner, and mkstemp
+            # creates the file readable and writable by the owner only (0600)
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w') as snapshot_file:
+                json.dump(snapshot, snapshot_file, indent=2)
+            os.replace(temp_path, path)
+        except OSError as error:
+            print(f"Failed to write session snapshot: {error}")
+    
+    def invalidate(self, user_type, base_url, username=None):
+        """
+        Delete the snapshot of a user.
+        
+        Args:
+            user_type: User type from test_data
+            base_url: Base URL of the application under test
+            username: Optional username the snapshot was captured for
+        """
+        try:
+            os.remove(self._path(user_type, base_url, username))
+        except OSError:
+            pass
+    
+    def clear(self):
+        """
+        Delete all snapshots.
+        """
+        if not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            if name.endswith('.json'):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+    
+    @staticmethod
+    def capture(driver, user_type, base_url, username=None):
+        """
+        Capture the session of the logged-in page.
+        
+        Args:
+            driver (WebDriver): WebDriver instance on a page of the logged-in application
+            user_type: User type from test_data
+            base_url: Base URL of the application under test
+            username: Optional username the session belongs to
+            
+        Returns:
+            dict: The snapshot
+        """
+        storage = driver.execute_script(js_scripts.READ_STORAGE) or {}
+        return {
+            'user_type': user_type,
+            'base_url': base_url,
+            'username': username,
+            'url': driver.current_url,
+            'captured_at': time.time(),
+            'cookies': [
+                {field: cookie[field] for field in COOKIE_FIELDS if field in cookie}
+                for cookie in driver.get_cookies()
+            ],
+            'local_storage': storage.get('local') or {},
+            'session_storage': storage.get('session') or {},
+        }
+    
+    @staticmethod
+    def restore(driver, snapshot):
+        """
+        Restore a snapshot into a session and open the page it was captured on.
+        
+        Cookies and storage can only be set for the loaded origin, so the origin's root
+        page is loaded first.
+        
+        Args:
+            driver (WebDriver): WebDriver instance
+            snapshot (dict): Snapshot returned by capture()
+            
+        Returns:
+            bool: True if the snapshot was restored, False if the browser rejected it
+        """
+        parts = urlsplit(snapshot['url'])
+        try:
+            driver.get(f"{parts.scheme}://{parts.netloc}/")
+            for cookie in snapshot['cookies']:
+                driver.add_cookie(cookie)
+            driver.execute_script(js_scripts.WRITE_STORAGE, snapshot['local_storage'], snapshot['session_storage'])
+            driver.get(snapshot['url'])
+        except WebDriverException as error:
+            print(f"Failed to restore the session of {snapshot['user_type']}: {error.msg}")
+            return False
+        finally:
+            ElementCache.for_driver(driver).clear()
+        return True
+    
+    def _is_expired(self, snapshot):
+        """
+        Check if a snapshot is older than the TTL or holds a cookie that expired.
+        
+        Args:
+            snapshot (dict): Snapshot returned by capture()
+            
+        Returns:
+            bool: True if the snapshot should not be used
+        """
+        now = time.time()
+        if now - snapshot.get('captured_at', 0) >= self.ttl:
+            return True
+        return any(cookie.get('expiry', now + 1) <= now for cookie in snapshot.get('cookies', []))
+    
+    def _path(self, user_type, base_url, username=None):
+        """
+        Get the snapshot file of a user.
+        
+        Args:
+            user_type: User type from test_data
+            base_url: Base URL of the application under test
+            username: Optional username the snapshot was captured for
+            
+        Returns:
+            str: Path of the snapshot file
+        """
+        digest = hashlib.sha256(f"{base_url}\n{user_type}\n{username}".encode()).hexdigest()[:16]
+        safe_user_type = re.sub(r'[^\w-]', '_', user_type)
+        return os.path.join(self.directory, f"{safe_user_type}_{digest}.json")
+
+
+session_cache = SessionCache()
@@ -0,0 +1,47 @@
+"""
+Small statistics helpers used by the timing and profiling reports.
+"""
+
+
+def percentile(values, pct):
+    """
+    Get a percentile of a list of values using linear interpolation.
+    
+    Args:
+        values: List of numbers
+        pct: Percentile between 0 and 100
+        
+    Returns:
+        float: The percentile, or None if there are no values
+    """
+    if not values:
+        return None
+    
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def summarize(values, digits=3):
+    """
+    Summarize a list of values.
+    
+    Args:
+        values: List of numbers
+        digits: Number of decimals to round to
+        
+    Returns:
+        dict: count, mean, p50, p95 and max of the values
+    """
+    if not values:
+        return {'count': 0, 'mean': None, 'p50': None, 'p95': None, 'max': None}
+    
+    return {
+        'count': len(values),
+        'mean': round(sum(values) / len(values), digits),
+        'p50': round(percentile(values, 50), digits),
+        'p95': round(percentile(values, 95), digits),
+        'max': round(max(values), digits),
+    }
@@ -0,0 +1,98 @@
+"""
+Per-step timing collection for behave runs.
+
+Step timings are appended to REPORT_DIR/step_timings/<RUN_ID>.jsonl, one JSON object
+per step, so every run leaves a durable record that utils.step_report can compare
+with earlier runs.
+"""
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from config import config
+
+
+class StepProfiler:
+    """
+    Times behave steps and appends the timings to the run's JSONL file.
+    
+    Call start() from the before_step hook and stop() from the after_step hook.
+    """
+    
+    def __init__(self, path=None):
+        """
+        Initialize the profiler.
+        
+        Args:
+            path: Optional output path, defaults to step_timings/<RUN_ID>.jsonl in REPORT_DIR
+        """
+        self.path = path or os.path.join(config.REPORT_DIR, 'step_timings', f"{config.RUN_ID}.jsonl")
+        self._started = None
+        self._file = None
+        self._lock = threading.Lock()
+    
+    def start(self, step):
+        """
+        Start timing a step.
+        
+        Args:
+            step: behave Step about to run
+        """
+        self._started = time.perf_counter()
+    
+    def stop(self, step, feature=None, scenario=None):
+        """
+        Stop timing a step and append its timing.
+        
+        Args:
+            step: behave Step that has run
+            feature: Optional name of the feature the step belongs to
+            scenario: Optional name of the scenario the step belongs to
+            
+        Returns:
+            dict: The recorded timing, or None if the step was not started
+        """
+        if self._started is None:
+            return None
+        duration = time.perf_counter() - self._started
+        self._started = None
+        
+        record = {
+            'run_id': config.RUN_ID,
+            'worker_id': config.WORKER_ID,
+            'timestamp': datetime.now().isoformat(),
+            'feature': feature,
+            'scenario': scenario,
+            'step': step.name,
+            'keyword': step.keyword,
+            'location': str(step.location),
+            'status': step.status.name,
+            'duration_ms': round(duration * 1000, 3),
+        }
+        self._write(record)
+        return record
+    
+    def close(self):
+        """
+        Close the timings file.
+        """
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+    
+    def _write(self, record):
+        """
+        Append a record to the timings file, flushing it so a crashed run keeps its timings.
+        
+        Args:
+            record: Timing record
+        """
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                self._file = open(self.path, 'a')
+            self._file.write(json.dumps(record) + '\n')
+            self._file.flush()
@@ -0,0 +1,162 @@
+"""
+Slow-step report built from the step timings recorded by utils.step_profiler.
+
+Usage:
+    python -m utils.step_report [--run RUN_ID] [--baseline RUN_ID] [--threshold 1.2]
+
+Shows p50/p95/max per step text for a run (the latest by default), and flags steps
+whose p95 got slower than in a baseline run (the previous run by default). The
+timings of all parallel workers of a run are combined.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+from collections import defaultdict
+
+from config import config
+from utils.stats import summarize
+
+
+def load_runs(report_dir=None):
+    """
+    Load the step timings of every recorded run.
+    
+    Args:
+        report_dir: Optional reports directory, defaults to BASE_REPORT_DIR from config
+        
+    Returns:
+        dict: {run_id: {step text: [durations in ms]}}
+    """
+    report_dir = report_dir or config.BASE_REPORT_DIR
+    patterns = [
+        os.path.join(report_dir, 'step_timings', '*.jsonl'),
+        os.path.join(report_dir, 'worker_*', 'step_timings', '*.jsonl'),
+    ]
+    
+    runs = defaultdict(lambda: defaultdict(list))
+    for pattern in patterns:
+        for path in glob.glob(pattern):
+            with open(path) as timings_file:
+                for line in timings_file:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A run that was killed can leave a truncated last line
+                        continue
+                    if record.get('status') == 'skipped':
+                        continue
+                    runs[record['run_id']][record['step']].append(record['duration_ms'])
+    return runs
+
+
+def compare_runs(current, baseline=None, threshold=1.2, min_delta_ms=50):
+    """
+    Summarize the step timings of a run and compare them with a baseline run.
+    
+    Args:
+        current: {step text: [durations in ms]} of the run to report
+        baseline: Optional {step text: [durations in ms]} of the baseline run
+        threshold: Ratio of the p95s above which a step is flagged as slower
+        min_delta_ms: Minimum p95 increase in ms for a step to be flagged, to ignore noise on fast steps
+        
+    Returns:
+        list: One row per step, slowest p95 first, with the current summary, the
+            baseline p95 and whether the step regressed
+    """
+    baseline = baseline or {}
+    rows = []
+    for step, durations in current.items():
+        stats = summarize(durations)
+        baseline_p95 = summarize(baseline[step])['p95'] if step in baseline else None
+        regressed = (
+            baseline_p95 is not None
+            and stats['p95'] > baseline_p95 * threshold
+            and stats['p95'] - baseline_p95 >= min_delta_ms
+        )
+        rows.append(dict(stats, step=step, baseline_p95=baseline_p95, regressed=regressed))
+    
+    rows.sort(key=lambda row: row['p95'], reverse=True)
+    return rows
+
+
+def format_report(rows, run_id, baseline_id=None):
+    """
+    Format report rows as a text table.
+    
+    Args:
+        rows: Rows returned by compare_runs()
+        run_id: Reported run
+        baseline_id: Optional baseline run
+        
+    Returns:
+        str: The report
+    """
+    lines = [f"Run {run_id}" + (f" compared with {baseline_id}" if baseline_id else "")]
+    lines.append(f"{'count':>6} {'p50 ms':>10} {'p95 ms':>10} {'max ms':>10} {'base p95':>10}  step")
+    for row in rows:
+        baseline_p95 = f"{row['baseline_p95']:.1f}" if row['baseline_p95'] is not None else '-'
+        flag = '  SLOWER' if row['regressed'] else ''
+        lines.append(
+            f"{row['count']:>6} {row['p50']:>10.1f} {row['p95']:>10.1f} {row['max']:>10.1f} "
+            f"{baseline_p95:>10}  {row['step']}{flag}"
+        )
+    
+    regressions = sum(1 for row in rows if row['regressed'])
+    lines.append(f"{len(rows)} step(s), {regressions} slower than the baseline")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    """
+    Command line entry point of the step report.
+    
+    Args:
+        argv: Optional command line arguments, defaults to sys.argv
+        
+    Returns:
+        int: Exit code, 2 if --fail-on-regression is set and a step got slower
+    """
+    parser = argparse.ArgumentParser(description='Report slow behave steps and regressions between runs.')
+    parser.add_argument('--run', help='Run to report (default: the latest run)')
+    parser.add_argument('--baseline', help='Run to compare with (default: the run before --run)')
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help='p95 ratio above which a step is flagged as slower (default: 1.2)')
+    parser.add_argument('--min-delta', type=float, default=50,
+                        help='Minimum p95 increase in ms for a step to be flagged (default: 50)')
+    parser.add_argument('--report-dir', help='Reports directory (default: BASE_REPORT_DIR from config)')
+    parser.add_argument('--fail-on-regression', action='store_true',
+                        help='Exit with code 2 if any step got slower')
+    args = parser.parse_args(argv)
+    
+    runs = load_runs(args.report_dir)
+    if not runs:
+        print("No step timings found, run behave with STEP_PROFILING_ENABLED=true first")
+        return 1
+    
+    # Run ids default to timestamps, so they sort chronologically
+    run_ids = sorted(runs)
+    run_id = args.run or run_ids[-1]
+    if run_id not in runs:
+        print(f"Unknown run: {run_id}")
+        return 1
+    
+    baseline_id = args.baseline
+    if baseline_id is None:
+        earlier = [other for other in run_ids if other < run_id]
+        baseline_id = earlier[-1] if earlier else None
+    elif baseline_id not in runs:
+        print(f"Unknown baseline run: {baseline_id}")
+        return 1
+    
+    rows = compare_runs(runs[run_id], runs.get(baseline_id), args.threshold, args.min_delta)
+    print(format_report(rows, run_id, baseline_id))
+    
+    if args.fail_on_regression and any(row['regressed'] for row in rows):
+        return 2
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,334 @@
+"""
+Registry of the test data, indexed once by namespaced key.
+
+Records come from the dictionaries in config/test_data.py and from JSON or YAML files
+in TEST_DATA_DIR, and are looked up by '<namespace>.<key>':
+
+    user.minor_user         USER_DATA['minor_user'] in config/test_data.py
+    form.registration       FORM_DATA['registration']
+    product.product1        PRODUCT_DATA['product1']
+    user.bulk_user_0042     'bulk_user_0042' in TEST_DATA_DIR/user.json or in any
+                            file under TEST_DATA_DIR/user/
+
+    feed.adult_users        the worker's shard of the data feed 'adult_users', see
+                            utils/data_feeds.py
+
+Each data file holds a mapping of keys to records; its namespace is the file name, or
+the directory directly under TEST_DATA_DIR it is in. The 'feed' namespace is reserved
+for data feeds, which are streamed instead of indexed. A key without a namespace
+(e.g. 'minor_user') is accepted when only one namespace has it. Unknown, ambiguous and
+duplicate keys raise errors instead of falling back to another record.
+
+Parsed data files are kept in a compiled cache (TEST_DATA_CACHE) that is rebuilt
+only when a file is added, removed or modified. YAML files need PyYAML.
+"""
+import json
+import os
+import pickle
+import tempfile
+import threading
+
+from config import config
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+
+# Dictionary in config/test_data.py to namespace
+MODULE_NAMESPACES = {
+    'USER_DATA': 'user',
+    'PRODUCT_DATA': 'product',
+    'FORM_DATA': 'form',
+    'SCENARIOS': 'scenario',
+    'ENVIRONMENTS': 'environment',
+}
+
+DATA_FILE_EXTENSIONS = ('.json', '.yaml', '.yml')
+
+# Namespace of the data feeds, streamed by utils/data_feeds.py instead of indexed
+FEED_NAMESPACE = 'feed'
+
+# Bumped when the layout of the compiled cache changes
+CACHE_VERSION = 1
+
+
+class TestDataError(ValueError):
+    """
+    Raised when a data file is invalid or two sources define the same key.
+    """
+
+
+class TestDataKeyError(KeyError):
+    """
+    Raised when a test data key is unknown or matches records in several namespaces.
+    """
+    
+    def __str__(self):
+        # KeyError would show the repr of the message
+        return str(self.args[0])
+
+
+class TestDataRegistry:
+    """
+    Index of all test data records by namespaced key.
+    """
+    
+    def __init__(self, directory=None, cache_path=None):
+        """
+        Initialize the registry. The data is loaded on first lookup.
+        
+        Args:
+            directory: Optional directory of data files, defaults to TEST_DATA_DIR from config
+            cache_path: Optional path of the compiled cache, defaults to TEST_DATA_CACHE from config
+            
+        The index is built again when the configured data directory changes.
+        """
+        self._directory = directory
+        self._cache_path = cache_path
+        self._indexed_directory = None
+        self._index = None
+        self._aliases = None
+        self._namespaces = None
+        self._lock = threading.Lock()
+    
+    @property
+    def directory(self):
+        """
+        Directory of the data files.
+        """
+        return self._directory or config.TEST_DATA_DIR
+    
+    @property
+    def cache_path(self):
+        """
+        Path of the compiled cache.
+        """
+        return self._cache_path or config.TEST_DATA_CACHE
+    
+    def get(self, key):
+        """
+        Get a test data record.
+        
+        Args:
+            key: '<namespace>.<key>', or a key only one namespace has, or 'feed.<name>'
+            
+        Returns:
+            The record, or a DataFeed of the worker's shard for 'feed.<name>'
+            
+        Raises:
+            TestDataKeyError: If the key is unknown or ambiguous
+        """
+        namespace, _, name = key.partition('.')
+        if namespace == FEED_NAMESPACE and name:
+            # Imported here, the data feeds import behave
+            from utils.data_feeds import get_feed
+            return get_feed(name)
+        
+        self.load()
+        try:
+            return self._index[key]
+        except KeyError:
+            pass
+        
+        qualified = self._aliases.get(key)
+        if qualified is None:
+            raise TestDataKeyError(f"Unknown test data key: {key}")
+        if len(qualified) > 1:
+            raise TestDataKeyError(
+                f"Ambiguous test data key {key}, use one of: {', '.join(sorted(qualified))}"
+            )
+        return self._index[qualified[0]]
+    
+    def __contains__(self, key):
+        self.load()
+        return key in self._index or len(self._aliases.get(key, ())) == 1
+    
+    def namespace(self, name):
+        """
+        Get all records of a namespace.
+        
+        Args:
+            name: Namespace, e.g. 'user'
+            
+        Returns:
+            dict: Keys without the namespace to records
+            
+        Raises:
+            TestDataKeyError: If there is no such namespace
+        """
+        self.load()
+        if name not in self._namespaces:
+            raise TestDataKeyError(f"Unknown test data namespace: {name}")
+        return self._namespaces[name]
+    
+    def keys(self):
+        """
+        Get the namespaced keys of all records.
+        
+        Returns:
+            list: Sorted keys
+        """
+        self.load()
+        return sorted(self._index)
+    
+    def load(self):
+        """
+        Build the index if it is not built yet.
+        """
+        if self._index is not None and self._indexed_directory == self.directory:
+            return
+        with self._lock:
+            if self._index is None or self._indexed_directory != self.directory:
+                self._build()
+    
+    def reload(self):
+        """
+        Build the index again, e.g. after config/test_data.py or a data file changed.
+        """
+        with self._lock:
+            self._build()
+    
+    def _build(self):
+        """
+        Index the records of config/test_data.py and the data files.
+        """
+        from config import test_data
+        
+        directory = self.directory
+        sources = {}
+        for dict_name, namespace in MODULE_NAMESPACES.items():
+            for key, record in getattr(test_data, dict_name, {}).items():
+                sources[f"{namespace}.{key}"] = (record, f"config/test_data.py {dict_name}")
+        
+        for qualified, (record, source) in self._load_files().items():
+            if qualified.startswith(FEED_NAMESPACE + '.'):
+                raise TestDataError(f"The '{FEED_NAMESPACE}' namespace of {source} is reserved for data feeds")
+            if qualified in sources:
+                raise TestDataError(
+                    f"Duplicate test data key {qualified} in {source} and {sources[qualified][1]}"
+                )
+            sources[qualified] = (record, source)
+        
+        index, aliases, namespaces = {}, {}, {}
+        for qualified, (record, _) in sources.items():
+            namespace, key = qualified.split('.', 1)
+            index[qualified] = record
+            aliases.setdefault(key, []).append(qualified)
+            namespaces.setdefault(namespace, {})[key] = record
+        self._index, self._aliases, self._namespaces = index, aliases, namespaces
+        self._indexed_directory = directory
+    
+    def _load_files(self):
+        """
+        Get the records of the data files, from the compiled cache if no file changed.
+        
+        Returns:
+            dict: Namespaced key to a tuple of the record and the file it came from
+        """
+        files = self._find_files()
+        if not files:
+            return {}
+        signature = [(path, stat.st_mtime_ns, stat.st_size) for path, stat in files]
+        
+        cached = self._read_cache()
+        if cached and cached.get('version') == CACHE_VERSION and cached.get('signature') == signature:
+            return cached['records']
+        
+        records = {}
+        for path, _ in files:
+            relative = os.path.relpath(path, self.directory)
+            parts = relative.split(os.sep)
+            namespace = parts[0] if len(parts) > 1 else os.path.splitext(parts[0])[0]
+            for key, record in self._parse_file(path).items():
+                qualified = f"{namespace}.{key}"
+                if qualified in records:
+                    raise TestDataError(
+                        f"Duplicate test data key {qualified} in {relative} and {records[qualified][1]}"
+                    )
+                records[qualified] = (record, relative)
+        
+        self._write_cache({'version': CACHE_VERSION, 'signature': signature, 'records': records})
+        return records
+    
+    def _find_files(self):
+        """
+        List the data files.
+        
+        Returns:
+            list: Sorted tuples of the path and the os.stat_result of every data file
+        """
+        files = []
+        for root, directories, names in os.walk(self.directory):
+            directories.sort()
+            for name in sorted(names):
+                if name.lower().endswith(DATA_FILE_EXTENSIONS):
+                    path = os.path.join(root, name)
+                    files.append((path, os.stat(path)))
+        return files
+    
+    @staticmethod
+    def _parse_file(path):
+        """
+        Parse a data file.
+        
+        Args:
+            path: Path to a JSON or YAML file
+            
+        Returns:
+            dict: Keys to records
+            
+        Raises:
+            TestDataError: If the file cannot be parsed or does not hold a mapping
+        """
+        if path.lower().endswith('.json'):
+            parse, errors = json.load, (ValueError,)
+        elif yaml is None:
+            raise TestDataError(f"PyYAML is not installed, cannot load {path}")
+        else:
+            parse, errors = yaml.safe_load, (yaml.YAMLError,)
+        
+        with open(path, encoding='utf-8') as data_file:
+            try:
+                data = parse(data_file)
+            except errors as error:
+                raise TestDataError(f"Invalid test data file {path}: {error}") from None
+        if data is None:
+            return {}
+        if not isinstance(data, dict):
+            raise TestDataError(f"Test data file {path} must hold a mapping of keys to records")
+        return {str(key): record for key, record in data.items()}
+    
+    def _read_cache(self):
+        """
+        Read the compiled cache.
+        
+        Returns:
+            dict: Cache contents, or None if it is missing or unreadable
+        """
+        try:
+            with open(self.cache_path, 'rb') as cache_file:
+                return pickle.load(cache_file)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+            return None
+    
+    def _write_cache(self, cache):
+        """
+        Write the compiled cache atomically, so parallel workers never read a partial file.
+        
+        Args:
+            cache (dict): Cache contents
+        """
+        directory = os.path.dirname(self.cache_path)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as cache_file:
+                pickle.dump(cache, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self.cache_path)
+        except OSError as error:
+            print(f"Failed to write test data cache: {error}")
+
+
+test_data_registry = TestDataRegistry()
@@ -0,0 +1,333 @@
+"""
+Explicit wait engine shared by page objects and helpers.
+
+Implicit waits are disabled by DriverFactory, so every wait goes through this engine
+and negative checks finish within their own timeout instead of the implicit one.
+"""
+import time
+
+from selenium.common.exceptions import NoSuchElementException, TimeoutException, WebDriverException
+from selenium.webdriver.support import expected_conditions as EC
+
+from config import config
+from utils import js_scripts
+
+
+# Expected conditions used by the polling backend for each element state
+ELEMENT_CONDITIONS = {
+    'present': EC.presence_of_element_located,
+    'visible': EC.visibility_of_element_located,
+    'clickable': EC.element_to_be_clickable,
+}
+
+# Selenium's default script timeout in seconds
+DEFAULT_SCRIPT_TIMEOUT = 30
+
+
+class AdaptiveWait:
+    """
+    Explicit wait with an adaptive poll interval.
+    
+    Works like WebDriverWait, but polls quickly at first and backs off towards a
+    maximum interval, so conditions that hold almost immediately return sooner.
+    """
+    
+    def __init__(self, driver, timeout, min_poll=None, max_poll=None, backoff=None,
+                 ignored_exceptions=(NoSuchElementException,)):
+        """
+        Initialize the wait.
+        
+        Args:
+            driver: WebDriver instance
+            timeout: Timeout in seconds
+            min_poll: First poll interval in seconds, defaults to WAIT_POLL_MIN from config
+            max_poll: Maximum poll interval in seconds, defaults to WAIT_POLL_MAX from config
+            backoff: Factor the interval grows by after each poll, defaults to WAIT_POLL_BACKOFF from config
+            ignored_exceptions: Exceptions treated as "condition not met yet"
+        """
+        self.driver = driver
+        self.timeout = timeout
+        self.min_poll = min_poll or config.WAIT_POLL_MIN
+        self.max_poll = max_poll or config.WAIT_POLL_MAX
+        self.backoff = backoff or config.WAIT_POLL_BACKOFF
+        self.ignored_exceptions = tuple(ignored_exceptions)
+    
+    def until(self, method, message='', deadline=None):
+        """
+        Wait until a condition returns a truthy value.
+        
+        Args:
+            method: Callable taking the driver
+            message: Optional message for the TimeoutException
+            deadline: Optional time.monotonic() time to wait until instead of the timeout,
+                e.g. what is left of the timeout of a wait that started earlier
+            
+        Returns:
+            The value returned by the condition
+            
+        Raises:
+            TimeoutException: If the condition does not hold within the timeout
+        """
+        end_time = time.monotonic() + self.timeout if deadline is None else deadline
+        interval = self.min_poll
+        
+        while True:
+            try:
+                value = method(self.driver)
+                if value:
+                    return value
+            except self.ignored_exceptions:
+                pass
+            
+            remaining = end_time - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(interval, remaining))
+            interval = min(interval * self.backoff, self.max_poll)
+        
+        raise TimeoutException(message or f"Condition not met within {self.timeout} seconds")
+    
+    def until_not(self, method, message='', deadline=None):
+        """
+        Wait until a condition returns a falsy value.
+        
+        Args:
+            method: Callable taking the driver
+            message: Optional message for the TimeoutException
+            deadline: Optional time.monotonic() time to wait until instead of the timeout
+            
+        Returns:
+            bool: True once the condition no longer holds
+            
+        Raises:
+            TimeoutException: If the condition still holds after the timeout
+        """
+        end_time = time.monotonic() + self.timeout if deadline is None else deadline
+        interval = self.min_poll
+        
+        while True:
+            try:
+                if not method(self.driver):
+                    return True
+            except self.ignored_exceptions:
+                return True
+            
+            remaining = end_time - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(interval, remaining))
+            interval = min(interval * self.backoff, self.max_poll)
+        
+        raise TimeoutException(message or f"Condition still met after {self.timeout} seconds")
+
+
+class WaitEngine:
+    """
+    Per-driver wait engine caching one AdaptiveWait per timeout.
+    
+    Locator and URL waits can run on two backends: 'polling' checks the condition
+    from the client with adaptive polling, 'observer' runs the check inside the page
+    with MutationObserver and requestAnimationFrame and returns as soon as the DOM
+    satisfies it. The observer backend falls back to polling when async scripts fail.
+    """
+    
+    def __init__(self, driver):
+        """
+        Initialize the wait engine.
+        
+        Args:
+            driver: WebDriver instance
+        """
+        self.driver = driver
+        self._waits = {}
+        self._script_timeout = DEFAULT_SCRIPT_TIMEOUT
+        self._async_supported = True
+    
+    @staticmethod
+    def for_driver(driver):
+        """
+        Get the wait engine of a driver, creating it on first use.
+        
+        Args:
+            driver: WebDriver instance
+            
+        Returns:
+            WaitEngine: The driver's wait engine
+        """
+        engine = getattr(driver, 'wait_engine', None)
+        if engine is None:
+            engine = WaitEngine(driver)
+            driver.wait_engine = engine
+        return engine
+    
+    def get_wait(self, timeout=None):
+        """
+        Get the cached wait for a timeout.
+        
+        Args:
+            timeout: Optional timeout in seconds, defaults to IMPLICIT_WAIT from config
+            
+        Returns:
+            AdaptiveWait: The wait object
+        """
+        timeout = timeout or config.IMPLICIT_WAIT
+        wait = self._waits.get(timeout)
+        if wait is None:
+            wait = AdaptiveWait(self.driver, timeout)
+            self._waits[timeout] = wait
+        return wait
+    
+    def until(self, condition, timeout=None, message=''):
+        """
+        Wait until a condition returns a truthy value.
+        
+        Args:
+            condition: Callable taking the driver, e.g. an expected condition
+            timeout: Optional timeout in seconds
+            message: Optional message for the TimeoutException
+            
+        Returns:
+            The value returned by the condition
+        """
+        return self.get_wait(timeout).until(condition, message)
+    
+    def until_not(self, condition, timeout=None, message=''):
+        """
+        Wait until a condition returns a falsy value.
+        
+        Args:
+            condition: Callable taking the driver, e.g. an expected condition
+            timeout: Optional timeout in seconds
+            message: Optional message for the TimeoutException
+            
+        Returns:
+            bool: True once the condition no longer holds
+        """
+        return self.get_wait(timeout).until_not(condition, message)
+    
+    def wait_for_locator(self, locator, state='visible', timeout=None, backend=None):
+        """
+        Wait for an element to be present, visible or clickable.
+        
+        Args:
+            locator: Tuple of (By, selector)
+            state: 'present', 'visible' or 'clickable'
+            timeout: Optional timeout in seconds
+            backend: Optional wait backend, 'polling' or 'observer', defaults to WAIT_BACKEND from config
+            
+        Returns:
+            WebElement: The found element
+            
+        Raises:
+            TimeoutException: If the element does not reach the state within the timeout
+        """
+        timeout = timeout or config.IMPLICIT_WAIT
+        deadline = time.monotonic() + timeout
+        
+        if (backend or config.WAIT_BACKEND) == 'observer':
+            by, value = locator
+            try:
+                element = self._execute_async(js_scripts.WAIT_FOR_ELEMENT, timeout, by, value, state)
+            except WebDriverException:
+                pass
+            else:
+                if element:
+                    return element
+                raise TimeoutException(f"Element {by}={value} not {state} within {timeout} seconds")
+        
+        # Poll for what is left of the timeout, with the wait cached for the timeout
+        return self.get_wait(timeout).until(ELEMENT_CONDITIONS[state](locator), deadline=deadline)
+    
+    def wait_for_url_contains(self, text, timeout=None, backend=None):
+        """
+        Wait for the URL to contain specific text.
+        
+        Args:
+            text: Text to wait for in the URL
+            timeout: Optional timeout in seconds
+            backend: Optional wait backend, 'polling' or 'observer', defaults to WAIT_BACKEND from config
+            
+        Returns:
+            bool: True once the URL contains the text
+            
+        Raises:
+            TimeoutException: If the URL does not contain the text within the timeout
+        """
+        timeout = timeout or config.IMPLICIT_WAIT
+        deadline = time.monotonic() + timeout
+        
+        if (backend or config.WAIT_BACKEND) == 'observer':
+            try:
+                if self._execute_async(js_scripts.WAIT_FOR_URL_CONTAINS, timeout, text):
+                    return True
+            except WebDriverException:
+                # A full page load unloads the script; the new URL is picked up by polling
+                pass
+            else:
+                raise TimeoutException(f"URL did not contain '{text}' within {timeout} seconds")
+        
+        return self.get_wait(timeout).until(EC.url_contains(text), deadline=deadline)
+    
+    def wait_for_network_idle(self, quiet_ms, timeout=None, backend=None):
+        """
+        Wait until the document is parsed and the network has been idle for a quiet period.
+        
+        Args:
+            quiet_ms: Quiet period in ms without finished requests or fetch/XHR calls in flight
+            timeout: Optional timeout in seconds
+            backend: Optional wait backend, 'polling' or 'observer', defaults to WAIT_BACKEND from config
+            
+        Returns:
+            bool: True once the network is idle
+            
+        Raises:
+            TimeoutException: If the network does not become idle within the timeout
+        """
+        timeout = timeout or config.IMPLICIT_WAIT
+        deadline = time.monotonic() + timeout
+        message = f"Network not idle for {quiet_ms} ms within {timeout} seconds"
+        
+        if (backend or config.WAIT_BACKEND) == 'observer':
+            try:
+                if self._execute_async(js_scripts.WAIT_FOR_NETWORK_IDLE, timeout, quiet_ms):
+                    return True
+            except WebDriverException:
+                # A redirect unloads the script; the new page is checked by polling
+                pass
+            else:
+                raise TimeoutException(message)
+        
+        return self.get_wait(timeout).until(
+            lambda driver: driver.execute_script(js_scripts.NETWORK_IDLE_TIME) >= quiet_ms, message, deadline
+        )
+    
+    def _execute_async(self, script, timeout, *args):
+        """
+        Run a waiting script in the page, which resolves by itself once `timeout` has passed.
+        
+        Args:
+            script: Async script taking *args followed by the timeout in milliseconds
+            timeout: Timeout in seconds
+            *args: Arguments passed to the script
+            
+        Returns:
+            The value the script resolved with
+            
+        Raises:
+            WebDriverException: If the script could not run, e.g. because async scripts
+                are not supported or the page navigated away
+        """
+        if not self._async_supported:
+            raise WebDriverException("Async scripts are not supported by this driver")
+        
+        # Leave the driver's script timeout some headroom over the in-page timeout
+        if self._script_timeout < timeout + 1:
+            self._script_timeout = timeout + 5
+            self.driver.set_script_timeout(self._script_timeout)
+        
+        try:
+            return self.driver.execute_async_script(script, *args, int(timeout * 1000))
+        except (AttributeError, NotImplementedError) as error:
+            # Drivers without async script support fall back to polling from now on
+            self._async_supported = False
+            raise WebDriverException(f"Async scripts are not supported by this driver: {error}")